@@ -1,4 +1,5 @@
 from engine import PlacementEngine
 from models import Cell, Net, PlacementParams
+from netlist import Netlist
 
 __version__ = "1.0.0"
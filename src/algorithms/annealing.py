@@ -1,45 +1,198 @@
-import math
 import random
-from typing import List, Tuple, Dict
-from models import Cell, Net, PlacementParams
-from algorithms.cost import total_wirelength, density_overflow, blockage_penalty
-
-def anneal(nets: List[Net], cells_dict: Dict[str, Cell], params: PlacementParams, rng: random.Random):
-    cells = [c for c in cells_dict.values() if not c.fixed]
-    if not cells: return 0.0, 0.0
-    
-    current_wl = total_wirelength(nets, cells_dict)
-    current_dens = density_overflow(cells_dict, params.chip_w, params.chip_h)[0]
-    current_blk = blockage_penalty(cells_dict, params.blockages)
-    current_cost = current_wl + current_dens * 1000 + current_blk
-    
-    T = 100.0
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from models import PlacementParams
+from netlist import Netlist
+from algorithms.incremental import IncrementalCost
+from algorithms.moves import MoveGenerator
+from algorithms.batched import BatchMoves
+from utils.shared import SharedArrays, derive_seeds, resolve_workers, shared_netlist, worker_netlist
+from utils.timing import expired
+
+T_START = 100.0
+T_FLOOR = 0.01
+COLD_ACCEPT = 0.15
+DEADLINE_CHECK = 256
+
+Moves = Union[MoveGenerator, BatchMoves]
+
+def anneal(nl: Netlist, params: PlacementParams, rng: random.Random,
+           deadline: Optional[float] = None) -> Tuple[float, float, Dict[str, Any]]:
+    """
+    Simulated annealing refinement with the schedule chosen by
+    `params.anneal_schedule`, stopping early once `deadline` passes. Moves
+    are evaluated one at a time with the move set `params.anneal_moves`
+    (see MoveGenerator), or in vectorized batches of `params.anneal_batch`
+    displacements (see BatchMoves), which requires `anneal_moves="random"`.
+    Returns (cost, accept ratio, info), where info holds the iterations run,
+    the stop reason and the acceptance statistics per move type.
+    """
+    cells = nl.movable().tolist()
+    if not cells: return 0.0, 0.0, {"iterations": 0, "stop_reason": "no_movable_cells"}
+
+    if params.anneal_schedule not in ("geometric", "adaptive"):
+        raise ValueError(f"Unknown annealing schedule: {params.anneal_schedule}")
+    if params.anneal_batch > 0 and params.anneal_moves != "random":
+        raise ValueError(f"Batched annealing evaluates displacements only; anneal_moves must be 'random', "
+                         f"not {params.anneal_moves!r}")
+    if params.anneal_batch > 0:
+        moves = BatchMoves(nl, cells, params, rng, params.anneal_batch)
+    else:
+        moves = MoveGenerator(IncrementalCost(nl, params), cells, params, rng)
+    if params.anneal_schedule == "geometric":
+        cost, acc, info = _anneal_geometric(moves, params, deadline)
+    else:
+        cost, acc, info = _anneal_adaptive(moves, params, deadline)
+    info["move_stats"] = moves.stats()
+    return cost, acc, info
+
+def _anneal_geometric(moves: Moves, params: PlacementParams,
+                      deadline: Optional[float]) -> Tuple[float, float, Dict[str, Any]]:
+    """
+    Fixed schedule: T starts at 100 and decays by 0.995 per move (per batch
+    of `moves.chunk` moves, as a whole); the move window follows T.
+    """
+    T = T_START
     alpha = 0.995
-    accepted = 0
-    
-    for i in range(params.anneal_iters):
-        c = rng.choice(cells)
-        old_x, old_y = c.x, c.y
-        
-        dx = rng.uniform(-50, 50) * (T / 100.0)
-        dy = rng.uniform(-50, 50) * (T / 100.0)
-        
-        c.x = max(0, min(params.chip_w - c.w, c.x + dx))
-        c.y = max(0, min(params.chip_h - c.h, c.y + dy))
-        
-        new_wl = total_wirelength(nets, cells_dict)
-        new_dens = density_overflow(cells_dict, params.chip_w, params.chip_h)[0]
-        new_blk = blockage_penalty(cells_dict, params.blockages)
-        new_cost = new_wl + new_dens * 1000 + new_blk
-        
-        delta = new_cost - current_cost
-        if delta < 0 or (T > 0 and rng.random() < math.exp(-delta / T)):
-            current_cost = new_cost
-            accepted += 1
+    accepted = iters = 0
+    stop_reason = "iteration_budget"
+
+    while iters < params.anneal_iters:
+        if iters % DEADLINE_CHECK < moves.chunk and expired(deadline):
+            stop_reason = "time_budget"
+            break
+        n = min(moves.chunk, params.anneal_iters - iters)
+        accepted += moves.run(T, 50.0 * T / 100.0, n)
+        iters += n
+
+        T *= alpha ** n
+        if T < T_FLOOR: T = T_FLOOR
+
+    info = {"iterations": iters, "stop_reason": stop_reason}
+    return moves.cost, accepted / max(1, iters), info
+
+def _next_temperature(T: float, acc: float) -> float:
+    """VPR cooling: cool slowly while the acceptance ratio is in the productive range."""
+    if acc > 0.96: return T * 0.5
+    if acc > 0.8: return T * 0.9
+    if acc > 0.15: return T * 0.95
+    return T * 0.8
+
+def _anneal_adaptive(moves: Moves, params: PlacementParams,
+                     deadline: Optional[float]) -> Tuple[float, float, Dict[str, Any]]:
+    """
+    VPR-style schedule. The starting temperature is the spread of cost deltas
+    of probe moves. Each temperature step runs about one move per movable
+    cell. The move window is rescaled by (1 - target + acceptance) toward
+    `anneal_target_accept`, and T is cooled according to the acceptance
+    ratio. Once acceptance drops below COLD_ACCEPT the run stops when the
+    best cost improved by less than `anneal_stop_tol` (relative) over the
+    last `anneal_stop_window` steps; it also stops when the window and T
+    are frozen, when `anneal_iters` is used up or when `deadline` passes.
+    The best placement seen at a step boundary is the one returned.
+    """
+    nl, cells = moves.nl, moves.cells
+    budget = params.anneal_iters
+    span = max(params.chip_w, params.chip_h)
+    min_window = float(np.mean(nl.w[cells] + nl.h[cells])) / 20.0
+    window = span / 10.0
+
+    # Starting temperature: std. deviation of probe deltas, all rolled back
+    deltas = moves.probe(window, min(len(cells), 100, budget))
+    probes = len(deltas)
+    T = float(np.std(deltas)) if deltas else 0.0
+    T = max(T, 1e-9)
+
+    moves_per_temp = max(10, len(cells))
+    iters, accepted = probes, 0
+    best_history = [moves.cost]
+    best_x, best_y = nl.x.copy(), nl.y.copy()
+    stop_reason = "iteration_budget"
+    temperatures = 0
+
+    while iters < budget:
+        if expired(deadline):
+            stop_reason = "time_budget"
+            break
+        n = min(moves_per_temp, budget - iters)
+        acc = moves.run(T, window, n)
+        iters += n
+        accepted += acc
+        temperatures += 1
+
+        ratio = acc / n
+        window = min(span, max(min_window, window * (1.0 - params.anneal_target_accept + ratio)))
+        T = _next_temperature(T, ratio)
+        if moves.cost < best_history[-1]:
+            best_x[:], best_y[:] = nl.x, nl.y
+        best_history.append(min(best_history[-1], moves.cost))
+
+        k = params.anneal_stop_window
+        if ratio < COLD_ACCEPT and len(best_history) > k:
+            ref = best_history[-k - 1]
+            if ref - best_history[-1] <= params.anneal_stop_tol * abs(ref):
+                stop_reason = "converged"
+                break
+        if window <= min_window and ratio == 0.0:
+            stop_reason = "frozen"
+            break
+
+    cost = moves.cost
+    if best_history[-1] < cost:
+        nl.x[:], nl.y[:] = best_x, best_y
+        cost = best_history[-1]
+    info = {"iterations": iters, "stop_reason": stop_reason, "temperature_steps": temperatures,
+            "final_temperature": T, "final_window": window}
+    return cost, accepted / max(1, iters - probes), info
+
+# --- Multi-start annealing -------------------------------------------------
+
+_worker: Dict[str, Any] = {}
+
+def _init_worker(spec, params: PlacementParams, deadline: Optional[float]):
+    shm, arrays = SharedArrays.attach(spec)
+    _worker.update(shm=shm, arrays=arrays, params=params, deadline=deadline)
+
+def _anneal_run(arrays: Dict[str, np.ndarray], params: PlacementParams, k: int, seed: int,
+                deadline: Optional[float] = None) -> Dict[str, Any]:
+    start = time.perf_counter()
+    nl = worker_netlist(arrays)
+    cost, acc, info = anneal(nl, params, random.Random(seed), deadline)
+    arrays["out_x"][k], arrays["out_y"][k] = nl.x, nl.y
+    return {"run": k, "seed": seed, "cost": cost, "accept_ratio": acc,
+            "seconds": time.perf_counter() - start, **info}
+
+def _pool_run(k: int, seed: int) -> Dict[str, Any]:
+    return _anneal_run(_worker["arrays"], _worker["params"], k, seed, _worker["deadline"])
+
+def multi_start_anneal(nl: Netlist, params: PlacementParams, runs: int, workers: int = 0,
+                       seed: int = 0, deadline: Optional[float] = None) -> Tuple[float, float, List[Dict[str, Any]]]:
+    """
+    Runs `runs` independent annealing walks from the current placement, with
+    seeds derived from `seed`, and keeps the best one (lowest cost, then
+    lowest run index) in `nl`. The netlist arrays are shared with the worker
+    processes through shared memory; each run writes its final coordinates
+    to its own shared slot. The result depends only on `seed` and `runs`
+    (unless `deadline`, shared by all runs, cuts them short).
+
+    Returns (best cost, best accept ratio, per-run statistics).
+    """
+    seeds = derive_seeds(seed, runs)
+    workers = resolve_workers(workers, runs)
+    arrays = shared_netlist(nl)
+    arrays["out_x"] = np.zeros((runs, nl.num_cells))
+    arrays["out_y"] = np.zeros((runs, nl.num_cells))
+
+    with SharedArrays(arrays) as shared:
+        if workers == 1:
+            stats = [_anneal_run(shared.arrays, params, k, s, deadline) for k, s in enumerate(seeds)]
         else:
-            c.x, c.y = old_x, old_y
-            
-        T *= alpha
-        if T < 0.01: T = 0.01
-        
-    return current_cost, accepted / max(1, params.anneal_iters)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.spec, params, deadline)) as pool:
+                stats = list(pool.map(_pool_run, range(runs), seeds))
+        best = min(stats, key=lambda s: (s["cost"], s["run"]))
+        nl.x[:] = shared["out_x"][best["run"]]
+        nl.y[:] = shared["out_y"][best["run"]]
+    return best["cost"], best["accept_ratio"], stats
@@ -0,0 +1,175 @@
+import random
+from typing import Dict, List, Tuple
+import numpy as np
+from models import PlacementParams
+from netlist import Netlist
+from algorithms.cost import net_bboxes, bin_overlaps, bin_utilization, blockage_hits, BLOCKAGE_PENALTY, TARGET_UTIL
+from algorithms.fm import csr_rows, csr_positions
+from algorithms.incremental import DENSITY_WEIGHT
+from algorithms.moves import move_stats
+
+# Nets with more pins do not keep two cells out of the same batch
+CONFLICT_DEGREE = 64
+# Candidates drawn per requested batch slot before the independence test
+OVERSAMPLE = 4
+
+class BatchMoves:
+    """
+    Batched annealing moves with the cost model of IncrementalCost (HPWL
+    with pin offsets + density overflow + blockage penalty), held in arrays.
+
+    Each batch picks up to `batch` movable cells of which no two share a net
+    of at most CONFLICT_DEGREE pins (one Luby round over random priorities),
+    proposes a random displacement for each, computes all cost deltas in one
+    vectorized pass against the current state and then applies the
+    Metropolis test per move. HPWL deltas are exact for cells without a
+    shared net; the density term of cells in the same bins is evaluated
+    independently. Accepted moves are applied together and the touched nets
+    and bins are updated exactly.
+
+    The interface matches MoveGenerator, so both run under the same schedules.
+    """
+    def __init__(self, nl: Netlist, cells: List[int], params: PlacementParams, rng: random.Random,
+                 batch: int, grid_size: int = 20, target_util: float = TARGET_UTIL):
+        self.nl, self.params = nl, params
+        self.cells = cells
+        self.batch = self.chunk = max(1, batch)
+        self.rng = np.random.default_rng(rng.getrandbits(64))
+        self._cells = np.asarray(cells, dtype=np.int64)
+        self.grid_size, self.target_util = grid_size, target_util
+        self.bin_area = (params.chip_w / grid_size) * (params.chip_h / grid_size)
+        self.blockages = list(params.blockages)
+
+        self.cn_off, self.cn_ids = nl.cell_nets()
+        self.conflict = nl.net_degree() <= CONFLICT_DEGREE
+        px, py = nl.pin_coords()
+        self.xmin, self.xmax, self.ymin, self.ymax, _ = net_bboxes(px, py, nl.net_offsets)
+        self.util = bin_utilization(nl.x, nl.y, nl.w, nl.h, params.chip_w, params.chip_h, grid_size).ravel()
+
+        self.wl = float(np.sum(self.xmax - self.xmin) + np.sum(self.ymax - self.ymin))
+        self.overflow = float(np.sum(np.maximum(0, self.util - target_util)))
+        hits = blockage_hits(nl.x + nl.w / 2, nl.y + nl.h / 2, self.blockages)
+        self.blk = float(hits[~nl.fixed].sum()) * BLOCKAGE_PENALTY
+        self.counts = {"displace": [0, 0]}
+
+    @property
+    def cost(self) -> float:
+        return self.wl + self.overflow * DENSITY_WEIGHT + self.blk
+
+    def select(self, k: int) -> np.ndarray:
+        """Up to `k` random movable cells, no two of which share a net of at most CONFLICT_DEGREE pins."""
+        n = len(self._cells)
+        cand = self._cells[np.unique(self.rng.integers(0, n, min(n, OVERSAMPLE * k)))]
+        prio = self.rng.random(len(cand))
+        off, nets = csr_rows(self.cn_off, self.cn_ids, cand)
+        owner = np.repeat(np.arange(len(cand)), np.diff(off))
+        keep = self.conflict[nets]
+        nets, owner = nets[keep], owner[keep]
+        # A candidate survives if it has the lowest priority on every one of its nets
+        order = np.lexsort((prio[owner], nets))
+        s = nets[order]
+        first = np.concatenate([[True], s[1:] != s[:-1]])
+        ok = np.ones(len(cand), dtype=bool)
+        ok[owner[order][~first]] = False
+        winners = np.flatnonzero(ok)
+        return cand[winners[np.argsort(prio[winners])][:k]]
+
+    def _net_pins(self, nets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Sub-CSR of the pins of `nets`: (offsets, cells, pin x offsets, pin y offsets); offsets are 0 when unknown."""
+        nl = self.nl
+        poff, pos = csr_positions(nl.net_offsets, nets)
+        if nl.pin_dx is None:
+            return poff, nl.net_pins[pos], 0.0, 0.0
+        return poff, nl.net_pins[pos], nl.pin_dx[pos], nl.pin_dy[pos]
+
+    def propose(self, cells: np.ndarray, window: float) -> Tuple[np.ndarray, np.ndarray]:
+        nl, p = self.nl, self.params
+        d = self.rng.uniform(-window, window, (2, len(cells)))
+        nx = np.clip(nl.x[cells] + d[0], 0, np.maximum(0, p.chip_w - nl.w[cells]))
+        ny = np.clip(nl.y[cells] + d[1], 0, np.maximum(0, p.chip_h - nl.h[cells]))
+        return nx, ny
+
+    def deltas(self, cells: np.ndarray, nx: np.ndarray, ny: np.ndarray) -> Tuple[np.ndarray, tuple]:
+        """
+        Cost delta of moving each of `cells` to (nx, ny) alone. Also returns
+        the density update of every move, as (move, bin, utilization change).
+        """
+        nl, p = self.nl, self.params
+        k = len(cells)
+
+        # HPWL: recompute the boxes of each mover's nets with its new position
+        off, nets = csr_rows(self.cn_off, self.cn_ids, cells)
+        mover = np.repeat(np.arange(k), np.diff(off))
+        poff, pins, dx, dy = self._net_pins(nets)
+        seg = np.repeat(np.arange(len(nets)), np.diff(poff))
+        own = mover[seg]
+        is_self = pins == cells[own]
+        px = np.where(is_self, nx[own], nl.x[pins]) + nl.w[pins] / 2 + dx
+        py = np.where(is_self, ny[own], nl.y[pins]) + nl.h[pins] / 2 + dy
+        xmin, xmax, ymin, ymax, _ = net_bboxes(px, py, poff)
+        dwl = (xmax - xmin + ymax - ymin) - (self.xmax[nets] - self.xmin[nets] + self.ymax[nets] - self.ymin[nets])
+        delta = np.bincount(mover, weights=dwl, minlength=k)
+
+        # Density: old footprint out, new footprint in, per (move, bin)
+        w, h = nl.w[cells], nl.h[cells]
+        oc, ob, oa = bin_overlaps(nl.x[cells], nl.y[cells], w, h, p.chip_w, p.chip_h, self.grid_size)
+        nc, nb, na = bin_overlaps(nx, ny, w, h, p.chip_w, p.chip_h, self.grid_size)
+        nbins = len(self.util)
+        key, inv = np.unique(np.concatenate([oc, nc]) * nbins + np.concatenate([ob, nb]), return_inverse=True)
+        du = np.bincount(inv, weights=np.concatenate([-oa, na])) / self.bin_area
+        dmove, dbin = np.divmod(key, nbins)
+        u = self.util[dbin]
+        dov = np.maximum(0, u + du - self.target_util) - np.maximum(0, u - self.target_util)
+        delta += DENSITY_WEIGHT * np.bincount(dmove, weights=dov, minlength=k)
+
+        # Blockages: hits of the new center minus hits of the old one
+        dblk = BLOCKAGE_PENALTY * (blockage_hits(nx + w / 2, ny + h / 2, self.blockages)
+                                   - blockage_hits(nl.x[cells] + w / 2, nl.y[cells] + h / 2, self.blockages))
+        return delta + dblk, (dmove, dbin, du, dblk)
+
+    def apply(self, cells: np.ndarray, nx: np.ndarray, ny: np.ndarray, accept: np.ndarray, update: tuple):
+        """Applies the accepted moves and updates the cached boxes, bins and totals."""
+        nl = self.nl
+        dmove, dbin, du, dblk = update
+        moved = cells[accept]
+        nl.x[moved], nl.y[moved] = nx[accept], ny[accept]
+
+        _, nets = csr_rows(self.cn_off, self.cn_ids, moved)
+        nets = np.unique(nets)
+        poff, pins, dx, dy = self._net_pins(nets)
+        xmin, xmax, ymin, ymax, _ = net_bboxes(nl.x[pins] + nl.w[pins] / 2 + dx, nl.y[pins] + nl.h[pins] / 2 + dy, poff)
+        self.wl += float(np.sum(xmax - xmin + ymax - ymin)
+                         - np.sum(self.xmax[nets] - self.xmin[nets] + self.ymax[nets] - self.ymin[nets]))
+        self.xmin[nets], self.xmax[nets], self.ymin[nets], self.ymax[nets] = xmin, xmax, ymin, ymax
+
+        take = accept[dmove]
+        np.add.at(self.util, dbin[take], du[take])
+        self.overflow = float(np.sum(np.maximum(0, self.util - self.target_util)))
+        self.blk += float(dblk[accept].sum())
+
+    def run(self, T: float, window: float, n: int) -> int:
+        """Runs `n` moves in batches at temperature T; returns how many were accepted."""
+        done = accepted = 0
+        while done < n:
+            cells = self.select(min(self.batch, n - done))
+            nx, ny = self.propose(cells, window)
+            delta, update = self.deltas(cells, nx, ny)
+            accept = delta < 0
+            if T > 0:
+                accept |= self.rng.random(len(cells)) < np.exp(-np.maximum(delta, 0) / T)
+            if accept.any():
+                self.apply(cells, nx, ny, accept, update)
+            done += len(cells)
+            accepted += int(accept.sum())
+        self.counts["displace"][0] += done
+        self.counts["displace"][1] += accepted
+        return accepted
+
+    def probe(self, window: float, n: int) -> List[float]:
+        """Cost deltas of up to `n` random moves, none of them applied."""
+        cells = self.select(n)
+        nx, ny = self.propose(cells, window)
+        return self.deltas(cells, nx, ny)[0].tolist()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return move_stats(self.counts)
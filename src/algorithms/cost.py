@@ -1,49 +1,192 @@
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 from models import Cell, Net
+from netlist import Netlist, as_netlist
 
-def total_wirelength(nets: List[Net], cells: Dict[str, Cell]) -> float:
-    wl = 0.0
-    for net in nets:
-        xs = [cells[p].x + cells[p].w / 2 for p in net.pins if p in cells]
-        ys = [cells[p].y + cells[p].h / 2 for p in net.pins if p in cells]
-        if xs:
-            wl += (max(xs) - min(xs)) + (max(ys) - min(ys))
-    return wl
+TARGET_UTIL = 0.7
+BLOCKAGE_PENALTY = 1000.0
+# Pins / cells per block in the netlist-level terms, bounding temporaries on
+# memory-mapped designs (smaller netlists are processed in one block)
+PIN_CHUNK = 1 << 18
+CELL_CHUNK = 1 << 18
 
-def density_overflow(cells: Dict[str, Cell], chip_w: float, chip_h: float, grid_size: int = 20) -> Tuple[float, np.ndarray]:
-    util = np.zeros((grid_size, grid_size))
+# --- Array kernels ---------------------------------------------------------
+
+def net_bboxes(px: np.ndarray, py: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Per-net pin bounding boxes via segmented min/max reductions over the CSR
+    pin arrays. Returns (xmin, xmax, ymin, ymax, nonempty); empty nets get a
+    zero-size box.
+    """
+    n = len(offsets) - 1
+    nonempty = offsets[1:] > offsets[:-1]
+    xmin, xmax, ymin, ymax = (np.zeros(n) for _ in range(4))
+    if len(px):
+        starts = offsets[:-1][nonempty]
+        xmin[nonempty] = np.minimum.reduceat(px, starts)
+        xmax[nonempty] = np.maximum.reduceat(px, starts)
+        ymin[nonempty] = np.minimum.reduceat(py, starts)
+        ymax[nonempty] = np.maximum.reduceat(py, starts)
+    return xmin, xmax, ymin, ymax, nonempty
+
+def bin_span(lo: np.ndarray, hi: np.ndarray, pitch: float, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """First and one-past-last bin index overlapped by [lo, hi) on a grid of n bins."""
+    first = np.clip(np.floor(lo / pitch), 0, n).astype(np.int64)
+    last = np.clip(np.ceil(hi / pitch), 0, n).astype(np.int64)
+    return first, np.maximum(first, last)
+
+def bin_overlaps(x: np.ndarray, y: np.ndarray, w: np.ndarray, h: np.ndarray,
+                 chip_w: float, chip_h: float, grid_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every (cell, bin) pair a cell overlaps, as (cell index, flat bin index
+    j * grid_size + i, overlap area). Cell area outside the die is ignored.
+    """
     gx, gy = chip_w / grid_size, chip_h / grid_size
-    target_util = 0.7
-    for c in cells.values():
-        ix0, iy0 = int(c.x / gx), int(c.y / gy)
-        ix1, iy1 = int((c.x + c.w) / gx), int((c.y + c.h) / gy)
-        for i in range(max(0, ix0), min(grid_size, ix1 + 1)):
-            for j in range(max(0, iy0), min(grid_size, iy1 + 1)):
-                util[j, i] += (c.w * c.h) / (gx * gy)
-    overflow = np.sum(np.maximum(0, util - target_util))
+    x0, x1 = np.clip(x, 0, chip_w), np.clip(x + w, 0, chip_w)
+    y0, y1 = np.clip(y, 0, chip_h), np.clip(y + h, 0, chip_h)
+    i0, i1 = bin_span(x0, x1, gx, grid_size)
+    j0, j1 = bin_span(y0, y1, gy, grid_size)
+    nx, ny = i1 - i0, j1 - j0
+    count = nx * ny
+
+    cell = np.repeat(np.arange(len(x)), count)
+    local = np.arange(len(cell)) - np.repeat(np.cumsum(count) - count, count)
+    i = i0[cell] + local % np.maximum(1, nx[cell])
+    j = j0[cell] + local // np.maximum(1, nx[cell])
+    ox = np.minimum(x1[cell], (i + 1) * gx) - np.maximum(x0[cell], i * gx)
+    oy = np.minimum(y1[cell], (j + 1) * gy) - np.maximum(y0[cell], j * gy)
+    return cell, j * grid_size + i, np.maximum(0, ox) * np.maximum(0, oy)
+
+def bin_utilization(x: np.ndarray, y: np.ndarray, w: np.ndarray, h: np.ndarray,
+                    chip_w: float, chip_h: float, grid_size: int) -> np.ndarray:
+    """
+    Fraction of every bin covered by cells, from exact cell/bin overlap areas
+    accumulated with a scatter-add. Cell area outside the die is ignored.
+    """
+    _, bins, area = bin_overlaps(x, y, w, h, chip_w, chip_h, grid_size)
+    util = np.bincount(bins, weights=area, minlength=grid_size * grid_size)
+    return util.reshape(grid_size, grid_size) / ((chip_w / grid_size) * (chip_h / grid_size))
+
+def rect_coverage(x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray, weight: np.ndarray,
+                  chip_w: float, chip_h: float, grid_x: int, grid_y: int) -> np.ndarray:
+    """
+    Sum over rectangles of `weight * (fraction of each bin the rectangle covers)`,
+    computed in O(rects + bins) with 2D difference arrays.
+
+    Each rectangle corner is stamped into four histograms (with its sub-bin
+    offsets as weights); cumulative sums along rows and columns turn the
+    stamps into exact fractional coverage.
+    """
+    gx, gy = chip_w / grid_x, chip_h / grid_y
+    n = len(x0)
+    a = np.clip(np.concatenate([x0, x1]) / gx, 0, grid_x)
+    b = np.clip(np.concatenate([y0, y1]) / gy, 0, grid_y)
+    ia = np.minimum(a.astype(np.int64), grid_x - 1)
+    ib = np.minimum(b.astype(np.int64), grid_y - 1)
+    da, db = ia - a, ib - b
+
+    # Corners (x0, y0, +), (x1, y0, -), (x0, y1, -), (x1, y1, +)
+    ci, cj = np.tile(ia, 2), np.repeat(ib.reshape(2, n), 2, axis=0).ravel()
+    du, dv = np.tile(da, 2), np.repeat(db.reshape(2, n), 2, axis=0).ravel()
+    s = np.tile(np.asarray(weight, dtype=np.float64), 4)
+    s[n:3 * n] *= -1
+
+    idx = cj * grid_x + ci
+    hist = lambda wt: np.bincount(idx, weights=wt, minlength=grid_x * grid_y).reshape(grid_y, grid_x)
+    su = s * du
+    cover = hist(su * dv)
+    cover += np.cumsum(hist(su), axis=0)
+    cover += np.cumsum(hist(s * dv), axis=1)
+    cover += np.cumsum(np.cumsum(hist(s), axis=0), axis=1)
+    return cover
+
+def rudy_map(xmin: np.ndarray, xmax: np.ndarray, ymin: np.ndarray, ymax: np.ndarray,
+             chip_w: float, chip_h: float, grid_size: int) -> np.ndarray:
+    """
+    RUDY routing demand: every net spreads its HPWL uniformly over its
+    bounding box, i.e. a demand density of (w + h) / (w * h). Boxes are
+    widened to at least one bin pitch so point-like nets stay finite.
+    The result is the estimated wire length in each bin.
+    """
+    gx, gy = chip_w / grid_size, chip_h / grid_size
+    cx, cy = (xmin + xmax) / 2, (ymin + ymax) / 2
+    w, h = np.maximum(xmax - xmin, gx), np.maximum(ymax - ymin, gy)
+    demand = (w + h) / (w * h)
+    # rect_coverage returns bin fractions; scale by bin area to get wire length
+    return rect_coverage(cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2, demand * gx * gy,
+                         chip_w, chip_h, grid_size, grid_size)
+
+def blockage_hits(cx: np.ndarray, cy: np.ndarray, blockages: List[Tuple[float, float, float, float]]) -> np.ndarray:
+    """Number of blockages strictly containing each point (broadcasted rectangle test)."""
+    if not blockages or not len(cx):
+        return np.zeros(len(cx), dtype=np.int64)
+    b = np.asarray(blockages, dtype=np.float64)[:, :, None]
+    inside = (b[:, 0] < cx) & (cx < b[:, 2]) & (b[:, 1] < cy) & (cy < b[:, 3])
+    return np.count_nonzero(inside, axis=0)
+
+# --- Netlist-level cost terms ----------------------------------------------
+
+def net_blocks(offsets: np.ndarray, chunk: int = PIN_CHUNK) -> Iterator[Tuple[int, int]]:
+    """Consecutive net ranges [a, b) of about `chunk` pins each (at least one net per range)."""
+    n = len(offsets) - 1
+    a = 0
+    while a < n:
+        b = int(np.searchsorted(offsets, offsets[a] + chunk, side="right")) - 1
+        b = min(n, max(b, a + 1))
+        yield a, b
+        a = b
+
+def _block_bboxes(nl: Netlist, a: int, b: int) -> Tuple[np.ndarray, ...]:
+    """`net_bboxes` of nets [a, b), plus their degrees. Pin offsets are applied when known."""
+    off = np.asarray(nl.net_offsets[a:b + 1])
+    p = nl.net_pins[off[0]:off[-1]]
+    px, py = nl.x[p] + nl.w[p] / 2, nl.y[p] + nl.h[p] / 2
+    if nl.pin_dx is not None:
+        px += nl.pin_dx[off[0]:off[-1]]
+        py += nl.pin_dy[off[0]:off[-1]]
+    return net_bboxes(px, py, off - off[0]) + (np.diff(off),)
+
+def netlist_wirelength(nl: Netlist) -> float:
+    total = 0.0
+    for a, b in net_blocks(nl.net_offsets):
+        xmin, xmax, ymin, ymax, _, _ = _block_bboxes(nl, a, b)
+        total += float(np.sum(xmax - xmin) + np.sum(ymax - ymin))
+    return total
+
+def netlist_density(nl: Netlist, chip_w: float, chip_h: float, grid_size: int = 20) -> Tuple[float, np.ndarray]:
+    util = np.zeros((grid_size, grid_size))
+    for s in range(0, nl.num_cells, CELL_CHUNK):
+        c = slice(s, s + CELL_CHUNK)
+        util += bin_utilization(nl.x[c], nl.y[c], nl.w[c], nl.h[c], chip_w, chip_h, grid_size)
+    overflow = np.sum(np.maximum(0, util - TARGET_UTIL))
     return float(overflow), util
 
+def netlist_blockage_penalty(nl: Netlist, blockages: List[Tuple[float, float, float, float]]) -> float:
+    hits = 0
+    for s in range(0, nl.num_cells, CELL_CHUNK):
+        m = s + np.flatnonzero(~nl.fixed[s:s + CELL_CHUNK])
+        hits += int(blockage_hits(nl.x[m] + nl.w[m] / 2, nl.y[m] + nl.h[m] / 2, blockages).sum())
+    return float(hits) * BLOCKAGE_PENALTY
+
+def netlist_congestion(nl: Netlist, chip_w: float, chip_h: float, grid_size: int = 25) -> np.ndarray:
+    demand = np.zeros((grid_size, grid_size))
+    for a, b in net_blocks(nl.net_offsets):
+        xmin, xmax, ymin, ymax, nonempty, deg = _block_bboxes(nl, a, b)
+        nonempty &= deg > 1
+        demand += rudy_map(xmin[nonempty], xmax[nonempty], ymin[nonempty], ymax[nonempty], chip_w, chip_h, grid_size)
+    return demand
+
+# Legacy Dict[str, Cell] / List[Net] entry points. Netlist views are used
+# directly; plain containers are converted to a Netlist first.
+
+def total_wirelength(nets: List[Net], cells: Dict[str, Cell]) -> float:
+    return netlist_wirelength(as_netlist(cells, nets))
+
+def density_overflow(cells: Dict[str, Cell], chip_w: float, chip_h: float, grid_size: int = 20) -> Tuple[float, np.ndarray]:
+    return netlist_density(as_netlist(cells), chip_w, chip_h, grid_size)
+
 def blockage_penalty(cells: Dict[str, Cell], blockages: List[Tuple[float, float, float, float]]) -> float:
-    penalty = 0.0
-    for c in cells.values():
-        if c.fixed: continue
-        cx, cy = c.x + c.w/2, c.y + c.h/2
-        for bx0, by0, bx1, by1 in blockages:
-            if bx0 < cx < bx1 and by0 < cy < by1:
-                penalty += 1000.0
-    return penalty
+    return netlist_blockage_penalty(as_netlist(cells), blockages)
 
 def congestion_estimate(nets: List[Net], cells: Dict[str, Cell], chip_w: float, chip_h: float, grid_size: int = 25) -> np.ndarray:
-    heat = np.zeros((grid_size, grid_size))
-    gx, gy = chip_w / grid_size, chip_h / grid_size
-    for net in nets:
-        pts = [(cells[p].x + cells[p].w/2, cells[p].y + cells[p].h/2) for p in net.pins if p in cells]
-        if not pts: continue
-        xs, ys = zip(*pts)
-        ix0, ix1 = int(min(xs)/gx), int(max(xs)/gx)
-        iy0, iy1 = int(min(ys)/gy), int(max(ys)/gy)
-        for i in range(max(0, ix0), min(grid_size, ix1 + 1)):
-            for j in range(max(0, iy0), min(grid_size, iy1 + 1)):
-                heat[j, i] += 1.0
-    return heat
+    return netlist_congestion(as_netlist(cells, nets), chip_w, chip_h, grid_size)
@@ -0,0 +1,259 @@
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from models import PlacementParams
+from netlist import Netlist, NameTable
+from algorithms.cost import net_bboxes, netlist_wirelength, netlist_density, netlist_blockage_penalty
+from algorithms.fm import csr_positions, csr_rows
+from algorithms.incremental import IncrementalCost, DENSITY_WEIGHT
+from utils.shared import SharedArrays, resolve_workers, shared_netlist, worker_netlist
+from utils.timing import expired
+
+MOVES_PER_CELL = 10
+SWAP_PROB = 0.5
+DEADLINE_CHECK = 256
+# Bins per side of the global density grid (as in IncrementalCost)
+DENSITY_GRID = 20
+# Tiling origin per round, as a fraction of the window size
+OFFSETS = ((0.0, 0.0), (0.5, 0.5), (0.5, 0.0), (0.0, 0.5))
+
+# (x0, y0, x1, y1, cells, obstacles, seed)
+Window = Tuple[float, float, float, float, np.ndarray, np.ndarray, int]
+
+def placement_cost(nl: Netlist, params: PlacementParams) -> float:
+    """The annealing cost (see IncrementalCost) of the whole placement."""
+    overflow, _ = netlist_density(nl, params.chip_w, params.chip_h, DENSITY_GRID)
+    return netlist_wirelength(nl) + overflow * DENSITY_WEIGHT + netlist_blockage_penalty(nl, params.blockages)
+
+def tile_windows(nl: Netlist, params: PlacementParams, size: Tuple[float, float],
+                 offset: Tuple[float, float], seeds: np.random.SeedSequence) -> List[List[Window]]:
+    """
+    Tiles the die into windows of `size`, shifted by `offset`, and groups
+    them into four checkerboard phases: windows of one phase share neither
+    an edge nor a corner. A window owns the movable cells whose center lies
+    in it; every other cell overlapping it is an obstacle.
+    """
+    tw, th = size
+    ox, oy = offset
+    nx = int(math.ceil((params.chip_w + ox) / tw - 1e-9))
+    ny = int(math.ceil((params.chip_h + oy) / th - 1e-9))
+    tile = lambda v, o, t, n: np.clip(np.floor((v + o) / t), 0, n - 1).astype(np.int64)
+
+    # Owner window of every movable cell
+    cells = nl.movable()
+    ti = tile(nl.x[cells] + nl.w[cells] / 2, ox, tw, nx)
+    tj = tile(nl.y[cells] + nl.h[cells] / 2, oy, th, ny)
+    owner = np.full(nl.num_cells, -1, dtype=np.int64)
+    owner[cells] = tj * nx + ti
+    order = np.argsort(owner[cells], kind="stable")
+    own_off = np.searchsorted(owner[cells][order], np.arange(nx * ny + 1))
+    owned = cells[order]
+
+    # Every (window, cell) overlap, minus ownership
+    i0, i1 = tile(nl.x, ox, tw, nx), tile(nl.x + nl.w, ox, tw, nx)
+    j0, j1 = tile(nl.y, oy, th, ny), tile(nl.y + nl.h, oy, th, ny)
+    cw, ch = i1 - i0 + 1, j1 - j0 + 1
+    cnt = cw * ch
+    cell = np.repeat(np.arange(nl.num_cells), cnt)
+    k = np.arange(len(cell)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+    win = (j0[cell] + k // cw[cell]) * nx + i0[cell] + k % cw[cell]
+    other = win != owner[cell]
+    cell, win = cell[other], win[other]
+    order = np.argsort(win, kind="stable")
+    obs_off = np.searchsorted(win[order], np.arange(nx * ny + 1))
+    obstacles = cell[order]
+
+    phases: List[List[Window]] = [[], [], [], []]
+    for w in range(nx * ny):
+        a, b = own_off[w], own_off[w + 1]
+        if a == b: continue
+        i, j = w % nx, w // nx
+        x0, y0 = max(0.0, i * tw - ox), max(0.0, j * th - oy)
+        x1, y1 = min(params.chip_w, (i + 1) * tw - ox), min(params.chip_h, (j + 1) * th - oy)
+        seed = int(np.random.SeedSequence(seeds.entropy, spawn_key=seeds.spawn_key + (w,)).generate_state(1)[0])
+        phases[(j % 2) * 2 + i % 2].append(
+            (x0, y0, x1, y1, owned[a:b], obstacles[obs_off[w]:obs_off[w + 1]], seed))
+    return phases
+
+def _window_netlist(nl: Netlist, win: Window, max_fanout: int) -> Netlist:
+    """
+    The window as a standalone netlist in window coordinates: its cells,
+    the obstacles as fixed cells, and for every net the bounding box of its
+    pins outside the window as two fixed zero-size terminals.
+    """
+    x0, y0, _, _, cells, obstacles, _ = win
+    n, m = len(cells), len(obstacles)
+    cn_off, cn_ids = nl.cell_nets()
+    _, touched = csr_rows(cn_off, cn_ids, cells)
+    nets = np.unique(touched)
+    deg = nl.net_degree()[nets]
+    nets = nets[(deg >= 2) & (deg <= max_fanout)]
+    off, pin_pos = csr_positions(nl.net_offsets, nets)
+    pins = nl.net_pins[pin_pos]
+    owner = np.repeat(np.arange(len(nets)), np.diff(off))
+
+    pos = np.minimum(np.searchsorted(cells, pins), n - 1)
+    inside = cells[pos] == pins
+    ext = ~inside
+    ext_off = np.zeros(len(nets) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owner[ext], minlength=len(nets)), out=ext_off[1:])
+    ep = pins[ext]
+    ex, ey = nl.x[ep] + nl.w[ep] / 2 - x0, nl.y[ep] + nl.h[ep] / 2 - y0
+    if nl.pin_dx is not None:
+        ex += nl.pin_dx[pin_pos[ext]]
+        ey += nl.pin_dy[pin_pos[ext]]
+    xmin, xmax, ymin, ymax, has_ext = net_bboxes(ex, ey, ext_off)
+    tnet = np.flatnonzero(has_ext)
+    t = len(tnet)
+
+    ids = np.concatenate([cells, obstacles])
+    w = np.concatenate([nl.w[ids], np.zeros(2 * t)])
+    h = np.concatenate([nl.h[ids], np.zeros(2 * t)])
+    x = np.concatenate([nl.x[ids] - x0, xmin[tnet], xmax[tnet]])
+    y = np.concatenate([nl.y[ids] - y0, ymin[tnet], ymax[tnet]])
+    fixed = np.ones(n + m + 2 * t, dtype=bool)
+    fixed[:n] = False
+
+    pin_net = np.concatenate([owner[inside], tnet, tnet])
+    pin_cell = np.concatenate([pos[inside], n + m + np.arange(2 * t)])
+    order = np.argsort(pin_net, kind="stable")
+    net_offsets = np.zeros(len(nets) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pin_net, minlength=len(nets)), out=net_offsets[1:])
+    # Pins inside keep their offsets; the terminals sit exactly on the bounding box
+    pin_dx = pin_dy = None
+    if nl.pin_dx is not None:
+        zero = np.zeros(2 * t)
+        pin_dx = np.concatenate([nl.pin_dx[pin_pos[inside]], zero])[order]
+        pin_dy = np.concatenate([nl.pin_dy[pin_pos[inside]], zero])[order]
+    return Netlist(NameTable.empty(), w, h, fixed, x, y, NameTable.empty(),
+                   net_offsets, pin_cell[order].astype(np.int32), pin_dx=pin_dx, pin_dy=pin_dy)
+
+def optimize_window(nl: Netlist, params: PlacementParams, win: Window, moves_per_cell: int = MOVES_PER_CELL,
+                    deadline: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+    """
+    Greedy local search inside one window: swaps of two cells (see
+    `IncrementalCost.swap`) and random displacements, each kept only if it
+    lowers the window's cost. Cells stay inside the window; cells larger than the
+    window do not move. Returns the new coordinates of the window's cells
+    and move counters.
+    """
+    x0, y0, x1, y1, cells, _, seed = win
+    ww, wh = x1 - x0, y1 - y0
+    local = _window_netlist(nl, win, params.max_net_fanout)
+    n = len(cells)
+    local.fixed[:n] |= (local.w[:n] > ww) | (local.h[:n] > wh)
+    blk = [(bx0 - x0, by0 - y0, bx1 - x0, by1 - y0) for bx0, by0, bx1, by1 in params.blockages
+           if bx0 < x1 and bx1 > x0 and by0 < y1 and by1 > y0]
+    grid = max(1, round(DENSITY_GRID * max(ww / params.chip_w, wh / params.chip_h)))
+    model = IncrementalCost(local, PlacementParams(chip_w=ww, chip_h=wh, blockages=blk), grid_size=grid)
+
+    rng = random.Random(seed)
+    movable = np.flatnonzero(~local.fixed[:n]).tolist()
+    w, h = local.w.tolist(), local.h.tolist()
+    lx, ly = local.x, local.y
+    radius = 0.25 * min(ww, wh)
+    stats = {"moves": 0, "accepted": 0, "swaps": 0, "swaps_accepted": 0}
+    clamp = lambda v, size, limit: max(0.0, min(limit - size, v))
+
+    for it in range(moves_per_cell * len(movable)):
+        if it % DEADLINE_CHECK == 0 and expired(deadline):
+            break
+        stats["moves"] += 1
+        if len(movable) >= 2 and rng.random() < SWAP_PROB:
+            stats["swaps"] += 1
+            if model.swap(*rng.sample(movable, 2)) < 0:
+                model.commit()
+                stats["accepted"] += 1
+                stats["swaps_accepted"] += 1
+            else:
+                model.rollback()
+        else:
+            c = rng.choice(movable)
+            nx_ = clamp(float(lx[c]) + rng.uniform(-radius, radius), w[c], ww)
+            ny_ = clamp(float(ly[c]) + rng.uniform(-radius, radius), h[c], wh)
+            if model.move(c, nx_, ny_) < 0:
+                model.commit()
+                stats["accepted"] += 1
+            else:
+                model.rollback()
+    return lx[:n] + x0, ly[:n] + y0, stats
+
+_worker: Dict[str, Any] = {}
+
+def _init_worker(spec, params: PlacementParams, moves_per_cell: int, deadline: Optional[float]):
+    shm, arrays = SharedArrays.attach(spec)
+    nl = worker_netlist(arrays, copy_coords=False)
+    nl._cell_nets = (arrays["cell_net_offsets"], arrays["cell_nets"])
+    _worker.update(shm=shm, nl=nl, params=params, moves_per_cell=moves_per_cell, deadline=deadline)
+
+def _pool_window(win: Window):
+    return optimize_window(_worker["nl"], _worker["params"], win, _worker["moves_per_cell"], _worker["deadline"])
+
+def window_detailed_placement(nl: Netlist, params: PlacementParams, rounds: int = 2, window_cells: int = 200,
+                              workers: int = 0, seed: int = 0, moves_per_cell: int = MOVES_PER_CELL,
+                              deadline: Optional[float] = None) -> Tuple[float, Dict[str, Any]]:
+    """
+    Window-parallel detailed placement. The die is tiled into windows of
+    about `window_cells` movable cells each, and the windows of each of the
+    four checkerboard phases are optimized concurrently by `workers`
+    processes (see `optimize_window`). Windows of a phase share no edge, and
+    each works against the placement as it was when the phase started, so
+    the result does not depend on `workers`. Every round shifts the tiling
+    so cells can cross the previous window boundaries.
+
+    The local costs only approximate the global one, so a round that
+    increases the cost of the whole placement is undone and ends the stage.
+    Returns (cost, info).
+    """
+    cells = nl.movable()
+    cost = placement_cost(nl, params)
+    info = {"rounds": 0, "windows": 0, "moves": 0, "accepted": 0, "swaps": 0, "swaps_accepted": 0,
+            "parallel_windows": 0, "initial_cost": cost, "stop_reason": "rounds"}
+    if not len(cells) or rounds <= 0:
+        return cost, info
+
+    per_side = max(1, math.ceil(math.sqrt(len(cells) / max(1, window_cells))))
+    size = (params.chip_w / per_side, params.chip_h / per_side)
+    root = np.random.SeedSequence(seed)
+    shared = pool = None
+    try:
+        for r in range(rounds):
+            if expired(deadline):
+                info["stop_reason"] = "time_budget"
+                break
+            start_x, start_y = nl.x.copy(), nl.y.copy()
+            offset = (OFFSETS[r % len(OFFSETS)][0] * size[0], OFFSETS[r % len(OFFSETS)][1] * size[1])
+            phases = tile_windows(nl, params, size, offset, root.spawn(1)[0])
+            for windows in phases:
+                if not windows or expired(deadline): continue
+                if len(windows) > 1 and resolve_workers(workers, len(windows)) > 1:
+                    if pool is None:
+                        cn_off, cn_ids = nl.cell_nets()
+                        shared = SharedArrays({**shared_netlist(nl), "cell_net_offsets": cn_off, "cell_nets": cn_ids})
+                        pool = ProcessPoolExecutor(max_workers=resolve_workers(workers, 1 << 30), initializer=_init_worker,
+                                                   initargs=(shared.spec, params, moves_per_cell, deadline))
+                    shared["x"][:], shared["y"][:] = nl.x, nl.y
+                    results = list(pool.map(_pool_window, windows))
+                    info["parallel_windows"] += len(windows)
+                else:
+                    results = [optimize_window(nl, params, win, moves_per_cell, deadline) for win in windows]
+                for win, (x, y, stats) in zip(windows, results):
+                    nl.x[win[4]], nl.y[win[4]] = x, y
+                    for key, value in stats.items():
+                        info[key] += value
+                info["windows"] += len(windows)
+
+            new_cost = placement_cost(nl, params)
+            if new_cost > cost:
+                nl.x[:], nl.y[:] = start_x, start_y
+                info["stop_reason"] = "no_improvement"
+                break
+            cost = new_cost
+            info["rounds"] += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            shared.close()
+    return cost, info
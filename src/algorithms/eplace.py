@@ -0,0 +1,230 @@
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from scipy import fft
+from netlist import Netlist
+from algorithms.cost import bin_utilization, rect_coverage, TARGET_UTIL
+from utils.timing import expired
+
+# Multiplier applied to the density weight every iteration
+LAMBDA_GROWTH = 1.05
+# Density grid bins per side
+MIN_GRID, MAX_GRID = 16, 512
+
+def density_grid_size(num_cells: int) -> int:
+    """Power of two near sqrt(num_cells), so a bin holds a few cells."""
+    return int(min(MAX_GRID, max(MIN_GRID, 2 ** round(math.log2(math.sqrt(max(1, num_cells)))))))
+
+class Electrostatics:
+    """
+    Poisson solver on an M x M bin grid with Neumann boundaries. The charge
+    density is expanded in cosine modes with a DCT, so the potential and the
+    field follow from the mode coefficients with inverse DCTs and DSTs.
+    Coordinates are in bin units, with bin (j, i) centered at (i + 0.5, j + 0.5).
+    """
+    def __init__(self, m: int):
+        self.m = m
+        w = np.pi * np.arange(m) / m
+        self.wu, self.wv = w[None, :], w[:, None]
+        denom = self.wu ** 2 + self.wv ** 2
+        denom[0, 0] = 1.0
+        self.inv = 1.0 / denom
+        self.inv[0, 0] = 0.0
+
+    @staticmethod
+    def _cos_sum(c: np.ndarray, axis: int) -> np.ndarray:
+        # sum_u c_u cos(pi u (2i + 1) / 2M), via an unnormalized DCT-III
+        x = c.copy()
+        idx = [slice(None)] * c.ndim
+        idx[axis] = slice(1, None)
+        x[tuple(idx)] /= 2
+        return fft.dct(x, type=3, axis=axis)
+
+    @staticmethod
+    def _sin_sum(c: np.ndarray, axis: int) -> np.ndarray:
+        # sum_{u >= 1} c_u sin(pi u (2i + 1) / 2M), via an unnormalized DST-III
+        x = np.roll(c, -1, axis=axis) / 2
+        idx = [slice(None)] * c.ndim
+        idx[axis] = -1
+        x[tuple(idx)] = 0.0
+        return fft.dst(x, type=3, axis=axis)
+
+    def solve(self, rho: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Potential and field (psi, ex, ey) of the charge map `rho[j, i]`; the mean charge is ignored."""
+        m = self.m
+        a = fft.dctn(rho, type=2) / (m * m)
+        a[0, :] /= 2
+        a[:, 0] /= 2
+        c = a * self.inv
+        psi = self._cos_sum(self._cos_sum(c, 0), 1)
+        ex = self._cos_sum(self._sin_sum(c * self.wu, 1), 0)
+        ey = self._sin_sum(self._cos_sum(c * self.wv, 1), 0)
+        return psi, ex, ey
+
+def _sample(field: np.ndarray, bx: np.ndarray, by: np.ndarray) -> np.ndarray:
+    """Bilinear interpolation of a bin-centered map at bin coordinates (bx, by)."""
+    m = field.shape[0]
+    fx = np.clip(bx - 0.5, 0, m - 1)
+    fy = np.clip(by - 0.5, 0, m - 1)
+    i0, j0 = np.minimum(fx.astype(np.int64), m - 2), np.minimum(fy.astype(np.int64), m - 2)
+    i1, j1 = i0 + 1, j0 + 1
+    tx, ty = fx - i0, fy - j0
+    return ((1 - ty) * ((1 - tx) * field[j0, i0] + tx * field[j0, i1])
+            + ty * ((1 - tx) * field[j1, i0] + tx * field[j1, i1]))
+
+def wa_wirelength(pos: np.ndarray, owner: np.ndarray, starts: np.ndarray, gamma: float) -> Tuple[float, np.ndarray]:
+    """
+    Weighted-average wirelength along one axis and its gradient per pin.
+    Pins are grouped by net (`starts` are the first pin of every net).
+    """
+    num = len(starts)
+    hi = np.maximum.reduceat(pos, starts)[owner]
+    lo = np.minimum.reduceat(pos, starts)[owner]
+    ep, en = np.exp((pos - hi) / gamma), np.exp((lo - pos) / gamma)
+    sp, sn = np.bincount(owner, ep, num), np.bincount(owner, en, num)
+    xp, xn = np.bincount(owner, pos * ep, num) / sp, np.bincount(owner, pos * en, num) / sn
+    grad = (ep / sp[owner] * (1 + (pos - xp[owner]) / gamma)
+            - en / sn[owner] * (1 - (pos - xn[owner]) / gamma))
+    return float(np.sum(xp - xn)), grad
+
+def eplace_global_placement(nl: Netlist, chip_w: float, chip_h: float, rng: random.Random,
+                            blockages: Optional[List[Tuple[float, float, float, float]]] = None,
+                            target_overflow: float = 0.1, max_iters: int = 1000, max_fanout: int = 1000,
+                            target_util: float = TARGET_UTIL, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    ePlace-style analytical placement, spreading the current placement.
+
+    Minimizes W + lambda * N with Nesterov's accelerated gradient method,
+    where W is the weighted-average wirelength (smoothing gamma shrinks with
+    the overflow) and N is the electrostatic energy of the cells: every
+    movable cell is a charge of its area, fixed cells and blockages are
+    fixed charges, and the field is solved with DCTs on a bin grid. The step
+    length is predicted from the local Lipschitz constant, the gradient is
+    preconditioned by pin count and charge, and lambda grows by
+    LAMBDA_GROWTH per iteration. Stops once the density overflow (smoothed
+    movable area above `target_util` per bin, relative to all movable area)
+    falls below `target_overflow`, after `max_iters` iterations or at
+    `deadline`.
+
+    Returns statistics (iterations, overflow, wirelength, stop reason).
+    """
+    start = time.perf_counter()
+    mov = nl.movable()
+    info = {"iterations": 0, "overflow": 0.0, "wirelength": 0.0, "stop_reason": "no_movable_cells", "grid": 0}
+    if not len(mov): return info
+
+    m = density_grid_size(len(mov))
+    bw, bh = chip_w / m, chip_h / m
+    bin_area = bw * bh
+    solver = Electrostatics(m)
+    w, h = nl.w[mov], nl.h[mov]
+    area = w * h
+    total_area = float(area.sum())
+
+    # Fixed charge: fixed cells and blockages
+    fx = nl.fixed
+    fixed = bin_utilization(nl.x[fx], nl.y[fx], nl.w[fx], nl.h[fx], chip_w, chip_h, m)
+    if blockages:
+        b = np.asarray(blockages, dtype=np.float64).reshape(-1, 4)
+        fixed += bin_utilization(b[:, 0], b[:, 1], b[:, 2] - b[:, 0], b[:, 3] - b[:, 1], chip_w, chip_h, m)
+    capacity = np.maximum(0.0, target_util - fixed)
+
+    # Cells smaller than a bin are spread over a bin-sized footprint (local smoothing)
+    sw, sh = np.maximum(w, bw), np.maximum(h, bh)
+    scale = area / (sw * sh)
+    ones = np.ones(len(mov))
+
+    # Nets used by the wirelength model; pins are grouped by net
+    deg = nl.net_degree()
+    use = np.flatnonzero((deg >= 2) & (deg <= max_fanout))
+    pin_sel = np.repeat(np.isin(np.arange(nl.num_nets), use), deg)
+    pins = nl.net_pins[pin_sel]
+    owner = np.repeat(np.arange(len(use)), deg[use])
+    starts = np.concatenate([[0], np.cumsum(deg[use])[:-1]]).astype(np.int64) if len(use) else np.zeros(0, dtype=np.int64)
+    pin_count = np.maximum(1, np.bincount(pins, minlength=nl.num_cells)[mov])
+    charge = area / bin_area
+    cx_all, cy_all = nl.x + nl.w / 2, nl.y + nl.h / 2
+
+    lo_x, hi_x = w / 2, chip_w - w / 2
+    lo_y, hi_y = h / 2, chip_h - h / 2
+    def clamp(v):
+        return np.stack([np.clip(v[0], lo_x, np.maximum(lo_x, hi_x)), np.clip(v[1], lo_y, np.maximum(lo_y, hi_y))])
+
+    def coverage(v, sw, sh, weight):
+        return rect_coverage(v[0] - sw / 2, v[1] - sh / 2, v[0] + sw / 2, v[1] + sh / 2, weight,
+                             chip_w, chip_h, m, m)
+
+    def overflow(util) -> float:
+        return float(np.sum(np.maximum(0.0, util - capacity))) * bin_area / max(total_area, 1e-12)
+
+    def gamma_for(tau: float) -> float:
+        # ePlace: 8 bin widths scaled by 10^(k * overflow + b), k = 20/9, b = -11/9
+        return 8.0 * (bw + bh) / 2 * 10 ** (20.0 / 9.0 * tau - 11.0 / 9.0)
+
+    def gradients(v, gamma):
+        cx_all[mov], cy_all[mov] = v[0], v[1]
+        wl = 0.0
+        gw = np.zeros((2, len(mov)))
+        if len(use):
+            for axis, pos in enumerate((cx_all, cy_all)):
+                length, g = wa_wirelength(pos[pins], owner, starts, gamma)
+                wl += length
+                gw[axis] = np.bincount(pins, g, nl.num_cells)[mov]
+        util = coverage(v, sw, sh, scale)
+        _, ex, ey = solver.solve(util + fixed)
+        bx, by = v[0] / bw, v[1] / bh
+        # dN/dx = -q E; the field is in bin units, so convert to die units
+        gd = np.stack([-charge * _sample(ex, bx, by) / bw, -charge * _sample(ey, bx, by) / bh])
+        return wl, gw, gd, overflow(util)
+
+    u = clamp(np.stack([nl.x[mov] + w / 2, nl.y[mov] + h / 2]))
+    # Jitter coincident cells (e.g. a collapsed quadratic solution) apart
+    jitter = np.random.default_rng(rng.getrandbits(64))
+    u = clamp(u + jitter.uniform(-0.5, 0.5, u.shape) * np.array([[bw], [bh]]))
+    gamma = gamma_for(overflow(coverage(u, w, h, ones)))
+    wl, gw, gd, _ = gradients(u, gamma)
+    lam = float(np.abs(gw).sum() / max(np.abs(gd).sum(), 1e-30))
+
+    def total_grad(gw, gd, lam):
+        return (gw + lam * gd) / (pin_count + lam * charge)
+
+    v = u.copy()
+    g = total_grad(gw, gd, lam)
+    # First step: Lipschitz estimate from a small trial step
+    probe = clamp(v - 0.01 * bw * g / max(np.abs(g).max(), 1e-30))
+    _, gw_p, gd_p, _ = gradients(probe, gamma)
+    alpha = np.linalg.norm(probe - v) / max(np.linalg.norm(total_grad(gw_p, gd_p, lam) - g), 1e-30)
+    a = 1.0
+    stop_reason = "iteration_budget"
+    it = 0
+    for it in range(1, max_iters + 1):
+        if expired(deadline):
+            stop_reason = "time_budget"
+            break
+        u_new = clamp(v - alpha * g)
+        a_new = (1 + math.sqrt(4 * a * a + 1)) / 2
+        v_new = clamp(u_new + (a - 1) / a_new * (u_new - u))
+
+        # The overflow is read off the smoothed density map at the gradient point
+        wl, gw, gd, tau = gradients(v_new, gamma)
+        if tau < target_overflow:
+            u = v_new
+            stop_reason = "converged"
+            break
+        gamma = gamma_for(tau)
+        lam *= LAMBDA_GROWTH
+        g_new = total_grad(gw, gd, lam)
+        if not np.isfinite(g_new).all():
+            stop_reason = "diverged"
+            break
+        dg = np.linalg.norm(g_new - g)
+        if dg > 0:
+            alpha = np.linalg.norm(v_new - v) / dg
+        u, v, g, a = u_new, v_new, g_new, a_new
+
+    nl.x[mov], nl.y[mov] = u[0] - w / 2, u[1] - h / 2
+    info.update(iterations=it, overflow=overflow(coverage(u, w, h, ones)), wirelength=wl, stop_reason=stop_reason, grid=m,
+                density_weight=lam, seconds=time.perf_counter() - start)
+    return info
@@ -0,0 +1,253 @@
+import random
+import numpy as np
+from typing import List, Tuple
+from netlist import Netlist
+
+# Candidates examined per move selection, in gain order, for one that keeps the balance
+FM_SCAN = 32
+# Passes stop once one improves the cut by less than this fraction
+FM_MIN_IMPROVEMENT = 0.01
+
+def csr_positions(offsets: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sub-CSR of the given rows: (offsets, positions of their entries in the full CSR)."""
+    deg = offsets[rows + 1] - offsets[rows]
+    sub = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(deg, out=sub[1:])
+    first = np.repeat(offsets[rows] - sub[:-1], deg)
+    return sub, first + np.arange(sub[-1])
+
+def csr_rows(offsets: np.ndarray, values: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sub-CSR of the given rows: (offsets, values) with the rows renumbered 0..len(rows)-1."""
+    sub, pos = csr_positions(offsets, rows)
+    return sub, values[pos]
+
+class _Hypergraph:
+    """
+    The nets of a region restricted to its cells. Pins outside the region
+    (fixed cells and cells of other regions) are not vertices: they are
+    terminals anchored to the side of the cut line they lie on.
+    """
+    def __init__(self, nl: Netlist, cells: np.ndarray, axis: int, cut: float, max_fanout: int):
+        n = len(cells)
+        local = np.full(nl.num_cells, -1, dtype=np.int64)
+        local[cells] = np.arange(n)
+
+        cn_off, cn_ids = nl.cell_nets()
+        _, touched = csr_rows(cn_off, cn_ids, cells)
+        nets = np.unique(touched)
+        deg = nl.net_degree()[nets]
+        nets = nets[(deg >= 2) & (deg <= max_fanout)]
+        off, pins = csr_rows(nl.net_offsets, nl.net_pins, nets)
+        owner = np.repeat(np.arange(len(nets)), np.diff(off))
+
+        loc = local[pins]
+        inside = loc >= 0
+        pos = (nl.x, nl.y)[axis][pins] + (nl.w, nl.h)[axis][pins] / 2
+        ext1 = ~inside & (pos >= cut)
+        ext0 = ~inside & ~ext1
+        inner = np.bincount(owner, weights=inside, minlength=len(nets)).astype(np.int64)
+        term0 = np.bincount(owner, weights=ext0, minlength=len(nets)) > 0
+        term1 = np.bincount(owner, weights=ext1, minlength=len(nets)) > 0
+
+        # Nets that can never be cut or never change state are dropped
+        keep = (inner >= 1) & (inner + term0 + term1 >= 2)
+        renum = np.cumsum(keep) - 1
+        pin_keep = inside & keep[owner]
+        self.num_cells = n
+        self.num_nets = int(keep.sum())
+        self.term0 = term0[keep].astype(np.int64)
+        self.term1 = term1[keep].astype(np.int64)
+        self.pin_net = renum[owner[pin_keep]]
+        self.pin_cell = loc[pin_keep]
+        self.net_offsets = np.zeros(self.num_nets + 1, dtype=np.int64)
+        np.cumsum(inner[keep], out=self.net_offsets[1:])
+
+        order = np.argsort(self.pin_cell, kind="stable")
+        self.cell_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.pin_cell, minlength=n), out=self.cell_offsets[1:])
+        self.cell_nets = self.pin_net[order]
+
+    def counts(self, side: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pins (terminals included) of every net on side 0 and on side 1."""
+        ones = np.bincount(self.pin_net, weights=side[self.pin_cell], minlength=self.num_nets).astype(np.int64)
+        return self.term0 + np.diff(self.net_offsets) - ones, self.term1 + ones
+
+    def cut(self, side: np.ndarray) -> int:
+        c0, c1 = self.counts(side)
+        return int(np.count_nonzero((c0 > 0) & (c1 > 0)))
+
+    def gains(self, side: np.ndarray, c0: np.ndarray, c1: np.ndarray) -> np.ndarray:
+        """FM gain of every cell: nets it would uncut minus nets it would cut."""
+        cell = np.repeat(np.arange(self.num_cells), np.diff(self.cell_offsets))
+        s = side[cell].astype(bool)
+        f = np.where(s, c1[self.cell_nets], c0[self.cell_nets])
+        t = np.where(s, c0[self.cell_nets], c1[self.cell_nets])
+        return np.bincount(cell, weights=(f == 1).astype(np.int64) - (t == 0), minlength=self.num_cells).astype(np.int64)
+
+def fm_bipartition(nl: Netlist, cells: np.ndarray, axis: int, cut: float, tol: float,
+                   rng: random.Random, max_fanout: int = 1000, max_passes: int = 10) -> Tuple[np.ndarray, int, int]:
+    """
+    Fiduccia-Mattheyses min-cut bipartition of `cells` across the line
+    `axis` = `cut` (axis 0 is x). The starting partition is the area median
+    along the axis. Each side must hold between (0.5 - tol) and (0.5 + tol)
+    of the cell area. Pins of cells outside `cells` are terminals fixed on
+    their side of the line. Passes stop once one improves the cut by less
+    than FM_MIN_IMPROVEMENT of it, or after `max_passes`.
+
+    Returns (side, cut size, passes), where side[k] is 1 when cells[k] goes
+    to the upper side.
+    """
+    n = len(cells)
+    side = np.zeros(n, dtype=np.int64)
+    if n < 2: return side, 0, 0
+
+    area = nl.w[cells] * nl.h[cells]
+    order = np.argsort((nl.x, nl.y)[axis][cells], kind="stable")
+    before = np.cumsum(area[order]) - area[order]
+    total = float(area.sum())
+    side[order[before >= total / 2]] = 1
+    if not side.any(): side[order[-1]] = 1
+
+    hg = _Hypergraph(nl, cells, axis, cut, max_fanout)
+    lo, hi = total * (0.5 - tol), total * (0.5 + tol)
+    passes = 0
+    for passes in range(1, max_passes + 1):
+        before = hg.cut(side)
+        if not _fm_pass(hg, side, area, lo, hi, rng):
+            break
+        if before - hg.cut(side) < FM_MIN_IMPROVEMENT * before:
+            break
+    return side, hg.cut(side), passes
+
+def _fm_pass(hg: _Hypergraph, side_arr: np.ndarray, area_arr: np.ndarray, lo: float, hi: float,
+             rng: random.Random) -> bool:
+    """One FM pass; keeps the best prefix of moves. Returns whether the cut or balance improved."""
+    n = hg.num_cells
+    c0, c1 = hg.counts(side_arr)
+    gain_arr = hg.gains(side_arr, c0, c1)
+    gain = gain_arr.tolist()
+    cnt = [c0.tolist(), c1.tolist()]
+    side = side_arr.tolist()
+    area = area_arr.tolist()
+    net_off, net_cells = hg.net_offsets.tolist(), hg.pin_cell.tolist()
+    cell_off, cell_nets = hg.cell_offsets.tolist(), hg.cell_nets.tolist()
+    total = sum(area)
+    area0 = total - sum(a for a, s in zip(area, side) if s)
+    min_area = min(area)
+
+    # Gain buckets: one doubly linked list per (side, gain), gains offset by pmax
+    pmax = int(np.diff(hg.cell_offsets).max(initial=0))
+    size = 2 * pmax + 1
+    free = [True] * n
+
+    # Bulk-build the buckets: cells sorted by (side, gain) in random order
+    perm = np.random.default_rng(rng.getrandbits(64)).permutation(n)
+    key = side_arr * size + gain_arr + pmax
+    order = perm[np.argsort(key[perm], kind="stable")]
+    k = key[order]
+    same = k[1:] == k[:-1]
+    nxt_arr, prv_arr = np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)
+    nxt_arr[order[:-1][same]] = order[1:][same]
+    prv_arr[order[1:][same]] = order[:-1][same]
+    head_arr = np.full(2 * size, -1, dtype=np.int64)
+    firsts = np.concatenate([[True], ~same])
+    head_arr[k[firsts]] = order[firsts]
+    head = [head_arr[:size].tolist(), head_arr[size:].tolist()]
+    nxt, prv = nxt_arr.tolist(), prv_arr.tolist()
+    top = [size - 1, size - 1]
+
+    def insert(c):
+        s, g = side[c], gain[c] + pmax
+        h = head[s]
+        nxt[c], prv[c] = h[g], -1
+        if h[g] >= 0: prv[h[g]] = c
+        h[g] = c
+        if g > top[s]: top[s] = g
+
+    def remove(c):
+        s, g = side[c], gain[c] + pmax
+        if prv[c] >= 0: nxt[prv[c]] = nxt[c]
+        else: head[s][g] = nxt[c]
+        if nxt[c] >= 0: prv[nxt[c]] = prv[c]
+
+    def bump(c, d):
+        remove(c)
+        gain[c] += d
+        insert(c)
+
+    def feasible(c):
+        a0 = area0 - area[c] if side[c] == 0 else area0 + area[c]
+        return lo <= a0 <= hi or abs(a0 - total / 2) < abs(area0 - total / 2)
+
+    def pick(s):
+        # Highest-gain free cell on side s whose move keeps the balance
+        a0 = area0 - min_area if s == 0 else area0 + min_area
+        if not lo <= a0 <= hi and (area0 <= total / 2 if s == 0 else area0 >= total / 2):
+            return -1
+        h = head[s]
+        g = top[s]
+        while g >= 0 and h[g] < 0: g -= 1
+        top[s] = max(g, 0)
+        scan = FM_SCAN
+        while g >= 0:
+            c = h[g]
+            while c >= 0:
+                if feasible(c): return c
+                scan -= 1
+                if not scan: return -1
+                c = nxt[c]
+            g -= 1
+        return -1
+
+    cut = int(np.count_nonzero((c0 > 0) & (c1 > 0)))
+    start_cut, start_imb = cut, abs(area0 - total / 2)
+    best_cut, best_imb, best_len = cut, start_imb, 0
+    moves: List[int] = []
+    stall_limit = max(100, n // 20)
+
+    while True:
+        a, b = pick(0), pick(1)
+        if a < 0 and b < 0: break
+        c = a if b < 0 or (a >= 0 and gain[a] >= gain[b]) else b
+
+        F = side[c]
+        T = 1 - F
+        remove(c)
+        free[c] = False
+        cut -= gain[c]
+        cF, cT = cnt[F], cnt[T]
+        for p in range(cell_off[c], cell_off[c + 1]):
+            k = cell_nets[p]
+            a, b = net_off[k], net_off[k + 1]
+            if cT[k] == 0:
+                for p2 in range(a, b):
+                    u = net_cells[p2]
+                    if free[u]: bump(u, 1)
+            elif cT[k] == 1:
+                for p2 in range(a, b):
+                    u = net_cells[p2]
+                    if free[u] and side[u] == T: bump(u, -1)
+            cF[k] -= 1
+            cT[k] += 1
+            if cF[k] == 0:
+                for p2 in range(a, b):
+                    u = net_cells[p2]
+                    if free[u]: bump(u, -1)
+            elif cF[k] == 1:
+                for p2 in range(a, b):
+                    u = net_cells[p2]
+                    if free[u] and side[u] == F: bump(u, 1)
+        side[c] = T
+        area0 += area[c] if T == 0 else -area[c]
+        moves.append(c)
+
+        imb = abs(area0 - total / 2)
+        if lo <= area0 <= hi and (cut < best_cut or (cut == best_cut and imb < best_imb)):
+            best_cut, best_imb, best_len = cut, imb, len(moves)
+        elif len(moves) - best_len > stall_limit:
+            break
+
+    for c in moves[best_len:]:
+        side[c] = 1 - side[c]
+    side_arr[:] = side
+    return best_cut < start_cut or (best_cut == start_cut and best_imb < start_imb)
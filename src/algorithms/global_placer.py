@@ -1,46 +1,164 @@
 import numpy as np
 from scipy import sparse
-from scipy.sparse.linalg import spsolve
-from typing import Dict, List, Tuple
+from typing import Optional, Tuple
 import random
-from models import Cell, Net
+from netlist import Netlist
+from algorithms.solvers import solve_placement_system, SolveStats
+from utils.timing import expired
 
-def quadratic_global_placement(cells: Dict[str, Cell], nets: List[Net], chip_w: float, chip_h: float, rng: random.Random):
-    movable = [c for c in cells.values() if not c.fixed]
-    fixed = [c for c in cells.values() if c.fixed]
-    if not movable: return
+ANCHOR_WEIGHT = 1e-6
+
+def _degree_buckets(nl: Netlist, nets: np.ndarray):
+    """Yields (degree, pin matrix) for the given nets grouped by degree; row k holds one net's cell ids."""
+    deg = nl.net_degree()[nets]
+    starts = nl.net_offsets[:-1][nets]
+    for d in np.unique(deg).tolist():
+        s = starts[deg == d]
+        yield d, nl.net_pins[s[:, None] + np.arange(d)]
+
+def _net_pin_slots(nl: Netlist, nets: np.ndarray) -> np.ndarray:
+    """Positions in net_pins of all pins of the given nets, net by net."""
+    deg = nl.net_degree()[nets]
+    first = np.repeat(nl.net_offsets[:-1][nets] - (np.cumsum(deg) - deg), deg)
+    return first + np.arange(int(deg.sum()))
+
+def _clique_edges(nl: Netlist, nets: np.ndarray):
+    """Clique model: every pin pair of a p-pin net, weight 1 / (p - 1)."""
+    a, b, w = [], [], []
+    for d, pins in _degree_buckets(nl, nets):
+        iu, ju = np.triu_indices(d, k=1)
+        a.append(pins[:, iu].ravel()); b.append(pins[:, ju].ravel())
+        w.append(np.full(pins.shape[0] * len(iu), 1.0 / (d - 1)))
+    return a, b, w
+
+def _star_edges(nl: Netlist, nets: np.ndarray, first_star: int):
+    """
+    Star model: one extra node per net tied to each of its p pins with weight
+    p / (p - 1), which has the same optimum as the 1 / (p - 1) clique.
+    """
+    deg = nl.net_degree()[nets]
+    star = first_star + np.repeat(np.arange(len(nets)), deg)
+    return [nl.net_pins[_net_pin_slots(nl, nets)]], [star], [np.repeat(deg / (deg - 1.0), deg)]
+
+def _b2b_edges(nl: Netlist, nets: np.ndarray, coord: np.ndarray):
+    """
+    Bound2Bound model for one axis: the two boundary pins are tied to each
+    other and to every inner pin with weight 2 / ((p - 1) * distance).
+    """
+    a, b, w = [], [], []
+    for d, pins in _degree_buckets(nl, nets):
+        pos = coord[pins]
+        rows = np.arange(pins.shape[0])
+        lo, hi = pos.argmin(axis=1), pos.argmax(axis=1)
+        hi = np.where(hi == lo, (lo + 1) % d, hi)
+        p_lo, p_hi = pins[rows, lo], pins[rows, hi]
+        inner = np.ones(pins.shape, dtype=bool)
+        inner[rows, lo] = False
+        inner[rows, hi] = False
+        ends = np.concatenate([p_lo, np.repeat(p_lo, d - 2), np.repeat(p_hi, d - 2)])
+        others = np.concatenate([p_hi, pins[inner], pins[inner]])
+        a.append(ends); b.append(others)
+        w.append(2.0 / ((d - 1) * np.maximum(np.abs(coord[ends] - coord[others]), 1.0)))
+    return a, b, w
+
+def _laplacian(a: np.ndarray, b: np.ndarray, w: np.ndarray, var: np.ndarray, nvars: int,
+               fx: np.ndarray, fy: np.ndarray):
+    """
+    Assembles the system in one shot from COO triplets. `var` maps node ids to
+    unknowns (-1 for fixed nodes, whose coordinates go to the right-hand side).
+    """
+    va, vb = var[a], var[b]
+    both = (va >= 0) & (vb >= 0)
+    to_a = (va >= 0) & (vb < 0)
+    to_b = (vb >= 0) & (va < 0)
+
+    ua, ub, wb = va[both], vb[both], w[both]
+    rows = np.concatenate([ua, ub, ua, ub, va[to_a], vb[to_b]])
+    cols = np.concatenate([ua, ub, ub, ua, va[to_a], vb[to_b]])
+    vals = np.concatenate([wb, wb, -wb, -wb, w[to_a], w[to_b]])
+    A = sparse.coo_matrix((vals, (rows, cols)), shape=(nvars, nvars)).tocsr()
+
+    anchor = np.concatenate([va[to_a], vb[to_b]])
+    target = np.concatenate([b[to_a], a[to_b]])
+    wt = np.concatenate([w[to_a], w[to_b]])
+    bx = np.bincount(anchor, weights=wt * fx[target], minlength=nvars)
+    by = np.bincount(anchor, weights=wt * fy[target], minlength=nvars)
+    return A, bx, by
+
+def _regularize(A: sparse.csr_matrix) -> Tuple[sparse.csr_matrix, float]:
+    """
+    Adds a weak diagonal anchor so the system stays positive definite even for
+    cells or clusters with no fixed connection. The caller adds `eps * x0` to
+    the right-hand side so the anchor pulls toward the current coordinates.
+    """
+    diag = A.diagonal()
+    eps = ANCHOR_WEIGHT * (diag[diag > 0].mean() if np.any(diag > 0) else 1.0)
+    return A + eps * sparse.identity(A.shape[0], format="csr"), eps
+
+def quadratic_global_placement(nl: Netlist, chip_w: float, chip_h: float, rng: random.Random,
+                               net_model: str = "star", fanout_threshold: int = 16,
+                               max_fanout: int = 1000, b2b_iters: int = 5,
+                               solver: str = "direct", precond: str = "jacobi",
+                               tol: float = 1e-5, maxiter: Optional[int] = None,
+                               deadline: Optional[float] = None) -> Optional[SolveStats]:
+    """
+    Quadratic placement. Nets up to `fanout_threshold` pins use the clique
+    model, larger ones use `net_model` ("star" or "b2b"), and nets with more
+    than `max_fanout` pins (clock/reset-like) are ignored. Solves are
+    warm-started from the current coordinates; raises SolverError if the
+    system cannot be solved. Past `deadline`, CG returns its current iterate
+    and no further B2B rounds are run.
+    """
+    movable = nl.movable()
+    if not len(movable): return None
 
-    m_idx = {c.name: i for i, c in enumerate(movable)}
     n = len(movable)
-    A = sparse.lil_matrix((n, n))
-    bx, by = np.zeros(n), np.zeros(n)
-
-    for net in nets:
-        weight = 1.0 / max(1, len(net.pins) - 1)
-        for i in range(len(net.pins)):
-            for j in range(i + 1, len(net.pins)):
-                p1, p2 = net.pins[i], net.pins[j]
-                if p1 in m_idx and p2 in m_idx:
-                    u, v = m_idx[p1], m_idx[p2]
-                    A[u, u] += weight; A[v, v] += weight
-                    A[u, v] -= weight; A[v, u] -= weight
-                elif p1 in m_idx and p2 in cells and cells[p2].fixed:
-                    u = m_idx[p1]
-                    A[u, u] += weight
-                    bx[u] += weight * cells[p2].x
-                    by[u] += weight * cells[p2].y
-                elif p2 in m_idx and p1 in cells and cells[p1].fixed:
-                    u = m_idx[p2]
-                    A[u, u] += weight
-                    bx[u] += weight * cells[p1].x
-                    by[u] += weight * cells[p1].y
-
-    A = A.tocsr()
-    try:
-        sol_x = spsolve(A, bx)
-        sol_y = spsolve(A, by)
-        for i, c in enumerate(movable):
-            c.x = max(0, min(chip_w - c.w, sol_x[i]))
-            c.y = max(0, min(chip_h - c.h, sol_y[i]))
-    except:
-        pass
+    deg = nl.net_degree()
+    nets = np.flatnonzero((deg >= 2) & (deg <= max_fanout))
+    small = nets[deg[nets] <= fanout_threshold]
+    large = nets[deg[nets] > fanout_threshold]
+    stars = large if net_model == "star" else large[:0]
+
+    # Node ids: cells first, then one star node per star-model net
+    var = np.full(nl.num_cells + len(stars), -1, dtype=np.int64)
+    var[movable] = np.arange(n)
+    var[nl.num_cells:] = n + np.arange(len(stars))
+    nvars = n + len(stars)
+    fx = np.concatenate([nl.x, np.zeros(len(stars))])
+    fy = np.concatenate([nl.y, np.zeros(len(stars))])
+
+    a, b, w = _clique_edges(nl, small)
+    sa, sb, sw = _star_edges(nl, stars, nl.num_cells)
+    a, b, w = a + sa, b + sb, w + sw
+    cat = lambda parts: np.concatenate(parts) if parts else np.zeros(0)
+    base = cat(a).astype(np.int64), cat(b).astype(np.int64), cat(w)
+
+    # Warm start: cells from their current position, star nodes from their pins' mean
+    slots = _net_pin_slots(nl, stars)
+    owner = np.repeat(np.arange(len(stars)), nl.net_degree()[stars])
+    count = np.maximum(1, np.bincount(owner, minlength=len(stars)))
+    x0 = np.concatenate([nl.x[movable], np.bincount(owner, weights=nl.x[nl.net_pins[slots]], minlength=len(stars)) / count])
+    y0 = np.concatenate([nl.y[movable], np.bincount(owner, weights=nl.y[nl.net_pins[slots]], minlength=len(stars)) / count])
+
+    rounds = b2b_iters if net_model == "b2b" and len(large) else 1
+    for r in range(rounds):
+        if r and expired(deadline): break
+        if net_model == "b2b" and len(large):
+            systems = []
+            for coord in (nl.x, nl.y):
+                ba, bb, bw = _b2b_edges(nl, large, coord)
+                systems.append(_laplacian(np.concatenate([base[0]] + ba), np.concatenate([base[1]] + bb),
+                                          np.concatenate([base[2]] + bw), var, nvars, fx, fy))
+            (Ax, bx, _), (Ay, _, by) = systems
+        else:
+            Ax, bx, by = _laplacian(*base, var, nvars, fx, fy)
+            Ay = Ax
+
+        same = Ay is Ax
+        Ax, ex = _regularize(Ax)
+        Ay, ey = (Ax, ex) if same else _regularize(Ay)
+        bx, by = bx + ex * x0, by + ey * y0
+        x0, y0, stats = solve_placement_system(Ax, bx, Ay, by, x0, y0, solver, precond, tol, maxiter, deadline)
+        nl.x[movable] = np.maximum(0, np.minimum(chip_w - nl.w[movable], x0[:n]))
+        nl.y[movable] = np.maximum(0, np.minimum(chip_h - nl.h[movable], y0[:n]))
+    return stats
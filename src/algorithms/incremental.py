@@ -0,0 +1,172 @@
+import math
+import numpy as np
+from typing import List, Tuple
+from models import PlacementParams
+from netlist import Netlist
+from algorithms.cost import net_bboxes, bin_utilization, blockage_hits, BLOCKAGE_PENALTY, TARGET_UTIL
+
+# Cost per unit of density overflow. Overflow comes from exact bin overlaps, which are far
+# smaller than the old whole-area-per-touched-bin estimate, so density now weighs less.
+DENSITY_WEIGHT = 1000.0
+
+class IncrementalCost:
+    """
+    Annealing cost model (HPWL + density overflow + blockage penalty) that is
+    updated per move instead of recomputed over the whole design. Pins sit
+    at the cell centers plus their offsets, when the netlist has them.
+
+    A move (or a `swap()` of two cells) is applied tentatively and returns
+    the cost delta; it is then either kept with `commit()` or undone with
+    `rollback()`.
+    """
+    def __init__(self, nl: Netlist, params: PlacementParams,
+                 grid_size: int = 20, target_util: float = TARGET_UTIL):
+        self.nl = nl
+        self.blockages = list(params.blockages)
+        self.grid_size = grid_size
+        self.target_util = target_util
+        self.gx, self.gy = params.chip_w / grid_size, params.chip_h / grid_size
+
+        self.x, self.y = nl.x, nl.y
+        self.hw, self.hh = nl.w / 2, nl.h / 2
+        self.w, self.h = nl.w.tolist(), nl.h.tolist()
+        self.fixed = nl.fixed.tolist()
+        self.net_offsets = nl.net_offsets.tolist()
+        self.net_pins = nl.net_pins
+        self.pin_dx, self.pin_dy = nl.pin_dx, nl.pin_dy
+        self.cell_net_offsets, self.cell_net_ids = nl.cell_nets()
+
+        # Cached per-net bounding boxes
+        px, py = nl.pin_coords()
+        xmin, xmax, ymin, ymax, nonempty = net_bboxes(px, py, nl.net_offsets)
+        self.net_bbox: List[Tuple[float, float, float, float]] = [
+            b if ok else None for b, ok in zip(zip(xmin.tolist(), xmax.tolist(), ymin.tolist(), ymax.tolist()), nonempty.tolist())]
+        self.net_wl: List[float] = ((xmax - xmin) + (ymax - ymin)).tolist()
+
+        self.util = bin_utilization(nl.x, nl.y, nl.w, nl.h, params.chip_w, params.chip_h, grid_size)
+        self.chip_w, self.chip_h = params.chip_w, params.chip_h
+
+        self.wl = float(sum(self.net_wl))
+        self.overflow = float(np.sum(np.maximum(0, self.util - target_util)))
+        hits = blockage_hits(nl.x + self.hw, nl.y + self.hh, self.blockages)
+        self.blk = float(hits[~nl.fixed].sum()) * BLOCKAGE_PENALTY
+        self._undo = None
+
+    @property
+    def cost(self) -> float:
+        return self.wl + self.overflow * DENSITY_WEIGHT + self.blk
+
+    def nets_of(self, i: int) -> np.ndarray:
+        return self.cell_net_ids[self.cell_net_offsets[i]:self.cell_net_offsets[i + 1]]
+
+    def _bbox(self, k: int) -> Tuple[float, float, float, float]:
+        a, b = self.net_offsets[k], self.net_offsets[k + 1]
+        if a == b: return None
+        p = self.net_pins[a:b]
+        xs = self.x[p] + self.hw[p]
+        ys = self.y[p] + self.hh[p]
+        if self.pin_dx is not None:
+            xs += self.pin_dx[a:b]
+            ys += self.pin_dy[a:b]
+        return float(xs.min()), float(xs.max()), float(ys.min()), float(ys.max())
+
+    @staticmethod
+    def _hpwl(b: Tuple[float, float, float, float]) -> float:
+        return 0.0 if b is None else (b[1] - b[0]) + (b[3] - b[2])
+
+    def _span(self, lo: float, hi: float, pitch: float, limit: float) -> Tuple[int, int, float, float]:
+        # Same die clipping and bin coverage rule as cost.bin_utilization
+        lo, hi = min(max(lo, 0.0), limit), min(max(hi, 0.0), limit)
+        first = min(max(math.floor(lo / pitch), 0), self.grid_size)
+        last = min(max(math.ceil(hi / pitch), 0), self.grid_size)
+        return first, max(first, last), lo, hi
+
+    def _bins(self, x: float, y: float, w: float, h: float) -> Tuple[int, int, int, int]:
+        i0, i1, _, _ = self._span(x, x + w, self.gx, self.chip_w)
+        j0, j1, _, _ = self._span(y, y + h, self.gy, self.chip_h)
+        return i0, i1, j0, j1
+
+    def _stamp(self, i: int, sign: float):
+        x, y = float(self.x[i]), float(self.y[i])
+        i0, i1, x0, x1 = self._span(x, x + self.w[i], self.gx, self.chip_w)
+        j0, j1, y0, y1 = self._span(y, y + self.h[i], self.gy, self.chip_h)
+        if i0 < i1 and j0 < j1:
+            edges_x = np.arange(i0, i1 + 1) * self.gx
+            edges_y = np.arange(j0, j1 + 1) * self.gy
+            ox = np.maximum(0, np.minimum(x1, edges_x[1:]) - np.maximum(x0, edges_x[:-1]))
+            oy = np.maximum(0, np.minimum(y1, edges_y[1:]) - np.maximum(y0, edges_y[:-1]))
+            self.util[j0:j1, i0:i1] += sign * np.outer(oy, ox) / (self.gx * self.gy)
+
+    def _blockage(self, i: int) -> float:
+        if self.fixed[i]: return 0.0
+        cx, cy = float(self.x[i]) + self.w[i] / 2, float(self.y[i]) + self.h[i] / 2
+        hits = sum(1 for bx0, by0, bx1, by1 in self.blockages if bx0 < cx < bx1 and by0 < cy < by1)
+        return hits * BLOCKAGE_PENALTY
+
+    def move(self, i: int, x: float, y: float) -> float:
+        """Tentatively moves cell `i` to (x, y) and returns the resulting cost delta."""
+        old_cost = self._begin()
+        self._undo.append(self._apply(i, x, y))
+        return self.cost - old_cost
+
+    def swap(self, i: int, j: int) -> float:
+        """Tentatively exchanges the centers of cells `i` and `j` (kept on the die); returns the cost delta."""
+        old_cost = self._begin()
+        cx_i, cy_i = float(self.x[i]) + self.w[i] / 2, float(self.y[i]) + self.h[i] / 2
+        cx_j, cy_j = float(self.x[j]) + self.w[j] / 2, float(self.y[j]) + self.h[j] / 2
+        for c, cx, cy in ((i, cx_j, cy_j), (j, cx_i, cy_i)):
+            x = max(0.0, min(self.chip_w - self.w[c], cx - self.w[c] / 2))
+            y = max(0.0, min(self.chip_h - self.h[c], cy - self.h[c] / 2))
+            self._undo.append(self._apply(c, x, y))
+        return self.cost - old_cost
+
+    def _begin(self) -> float:
+        if self._undo is not None:
+            raise RuntimeError("previous move was neither committed nor rolled back")
+        self._undo = []
+        return self.cost
+
+    def _apply(self, i: int, x: float, y: float) -> tuple:
+        """Moves cell `i` and updates every cost term; returns the record that undoes it."""
+        old_x, old_y = float(self.x[i]), float(self.y[i])
+        touched = self.nets_of(i).tolist()
+
+        # Density: only the bins covered before or after the move change
+        bi0, bi1, bj0, bj1 = self._bins(old_x, old_y, self.w[i], self.h[i])
+        ni0, ni1, nj0, nj1 = self._bins(x, y, self.w[i], self.h[i])
+        i0, i1 = min(bi0, ni0), max(bi1, ni1)
+        j0, j1 = min(bj0, nj0), max(bj1, nj1)
+        window = self.util[j0:j1, i0:i1].copy()
+        before = float(np.sum(np.maximum(0, window - self.target_util)))
+
+        undo = (i, old_x, old_y, [(k, self.net_bbox[k], self.net_wl[k]) for k in touched],
+                (j0, j1, i0, i1, window), self.wl, self.overflow, self.blk)
+
+        self._stamp(i, -1.0)
+        self.blk -= self._blockage(i)
+        self.x[i], self.y[i] = x, y
+        self._stamp(i, 1.0)
+        self.blk += self._blockage(i)
+
+        after = float(np.sum(np.maximum(0, self.util[j0:j1, i0:i1] - self.target_util)))
+        self.overflow += after - before
+
+        for k in touched:
+            b = self._bbox(k)
+            wl = self._hpwl(b)
+            self.wl += wl - self.net_wl[k]
+            self.net_bbox[k], self.net_wl[k] = b, wl
+        return undo
+
+    def commit(self):
+        self._undo = None
+
+    def rollback(self):
+        if self._undo is None: return
+        for i, old_x, old_y, nets, (j0, j1, i0, i1, window), wl, overflow, blk in reversed(self._undo):
+            self.x[i], self.y[i] = old_x, old_y
+            for k, b, w in nets:
+                self.net_bbox[k], self.net_wl[k] = b, w
+            self.util[j0:j1, i0:i1] = window
+            self.wl, self.overflow, self.blk = wl, overflow, blk
+        self._undo = None
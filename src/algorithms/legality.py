@@ -0,0 +1,106 @@
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from netlist import Netlist
+
+# Candidate pairs tested per chunk, bounding memory on heavily overlapping inputs
+PAIR_CHUNK = 1 << 22
+
+def _candidate_chunks(x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray,
+                      band: Optional[float] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Sweep over x within horizontal bands. Every rectangle is copied into the
+    bands of height `band` it spans (default: the median height). Within a
+    band, sorted by left edge, a rectangle's candidates are those whose left
+    edge lies before its right edge, found by binary search. A candidate is
+    kept if it also overlaps in y, and only in the band holding the bottom of
+    the intersection, so every overlapping pair appears exactly once.
+    Yields (i, j) index arrays.
+    """
+    idx = np.flatnonzero((x1 > x0) & (y1 > y0))
+    if len(idx) < 2: return
+    h = y1[idx] - y0[idx]
+    band = band or float(np.median(h))
+    base = float(y0[idx].min())
+    first = np.zeros(len(x0), dtype=np.int64)
+    first[idx] = np.floor((y0[idx] - base) / band)
+    last = np.maximum(first[idx], np.ceil((y1[idx] - base) / band).astype(np.int64) - 1)
+    counts = last - first[idx] + 1
+    r = np.repeat(idx, counts)
+    bands = np.repeat(first[idx], counts) + np.arange(len(r)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    # Exact integer sort keys: (band, rank of the left edge); a rectangle's
+    # candidates end at the first key at or past (band, rank of its right edge)
+    ranks = np.unique(np.concatenate([x0[idx], x1[idx]]))
+    span = len(ranks) + 1
+    key = bands * span + np.searchsorted(ranks, x0[r])
+    order = np.argsort(key, kind="stable")
+    r, bands, key = r[order], bands[order], key[order]
+    end = np.searchsorted(key, bands * span + np.searchsorted(ranks, x1[r]), side="left")
+    num = np.maximum(0, end - np.arange(len(r)) - 1)
+
+    csum = np.cumsum(num)
+    start = 0
+    while start < len(r):
+        stop = int(np.searchsorted(csum, (csum[start - 1] if start else 0) + PAIR_CHUNK, side="right"))
+        stop = max(stop, start + 1)
+        n = num[start:stop]
+        p = np.repeat(np.arange(start, stop), n)
+        q = p + 1 + np.arange(len(p)) - np.repeat(np.cumsum(n) - n, n)
+        a, b = r[p], r[q]
+        keep = (y0[a] < y1[b]) & (y0[b] < y1[a]) & (x0[b] < x1[a]) & (x0[a] < x1[b])
+        keep &= np.where(y0[a] >= y0[b], first[a], first[b]) == bands[p]
+        yield a[keep], b[keep]
+        start = stop
+
+def overlapping_pairs(x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """All pairs (i, j) of rectangles (x0, y0, x1, y1) whose interiors intersect, in O(n log n + k)."""
+    chunks = list(_candidate_chunks(x0, y0, x1, y1))
+    if not chunks:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate([a for a, _ in chunks]), np.concatenate([b for _, b in chunks])
+
+def check_legality(nl: Netlist, chip_w: float, chip_h: float,
+                   blockages: Optional[List[Tuple[float, float, float, float]]] = None) -> Dict[str, Any]:
+    """
+    Legality of the placement. Pairs of fixed cells and pairs of
+    blockages are part of the input and are not counted.
+
+    Returns overlapping cell pairs (at least one movable) with their total
+    overlap area and the number of cells involved, movable cell/blockage
+    overlaps, movable cells reaching outside the die, and `legal`.
+    """
+    start = time.perf_counter()
+    n = nl.num_cells
+    b = np.asarray(blockages or [], dtype=np.float64).reshape(-1, 4)
+    x0 = np.concatenate([nl.x, b[:, 0]])
+    y0 = np.concatenate([nl.y, b[:, 1]])
+    x1 = np.concatenate([nl.x + nl.w, b[:, 2]])
+    y1 = np.concatenate([nl.y + nl.h, b[:, 3]])
+    movable = np.concatenate([~nl.fixed, np.zeros(len(b), dtype=bool)])
+
+    pairs = area = blocked = 0
+    involved = np.zeros(n, dtype=bool)
+    for i, j in _candidate_chunks(x0, y0, x1, y1):
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        # Blockages come after the cells, so j is the blockage of a cell/blockage pair
+        cell = (j < n) & (movable[i] | movable[j])
+        ci, cj = i[cell], j[cell]
+        pairs += len(ci)
+        area += float(np.sum((np.minimum(x1[ci], x1[cj]) - np.maximum(x0[ci], x0[cj]))
+                             * (np.minimum(y1[ci], y1[cj]) - np.maximum(y0[ci], y0[cj]))))
+        involved[ci] = involved[cj] = True
+        blocked += int(np.count_nonzero((i < n) & (j >= n) & movable[i]))
+
+    m = ~nl.fixed
+    outside = m & ((nl.x < 0) | (nl.y < 0) | (nl.x + nl.w > chip_w) | (nl.y + nl.h > chip_h))
+    out_of_die = int(np.count_nonzero(outside))
+    return {
+        "legal": pairs == 0 and blocked == 0 and out_of_die == 0,
+        "overlap_pairs": pairs,
+        "overlap_area": area,
+        "overlapping_cells": int(np.count_nonzero(involved)),
+        "blockage_overlaps": blocked,
+        "out_of_die": out_of_die,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,231 @@
+import bisect
+import math
+import time
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from models import PlacementParams
+from netlist import Netlist
+
+# Candidate macro positions tested per overlap check
+MACRO_BATCH = 4096
+# Initial macro search radius, in macro half-perimeters
+MACRO_WINDOW = 4
+# Rows searched on either side of a cell once it has a candidate position
+ROW_SEARCH = 32
+# Tolerance when snapping coordinates to rows and sites
+EPS = 1e-9
+
+Segment = Tuple[int, int]
+
+def row_segments(obstacles: np.ndarray, num_rows: int, num_sites: int,
+                 row_h: float, site: float) -> List[List[Segment]]:
+    """Free site intervals [a, b) of every row, sorted, around the obstacle rectangles (x0, y0, x1, y1)."""
+    blocked: List[List[Segment]] = [[] for _ in range(num_rows)]
+    for x0, y0, x1, y1 in obstacles.tolist():
+        a, b = max(0, math.floor(x0 / site + EPS)), min(num_sites, math.ceil(x1 / site - EPS))
+        if a >= b: continue
+        for r in range(max(0, math.floor(y0 / row_h + EPS)), min(num_rows, math.ceil(y1 / row_h - EPS))):
+            blocked[r].append((a, b))
+    segments = []
+    for spans in blocked:
+        free, pos = [], 0
+        for a, b in sorted(spans):
+            if a > pos: free.append((pos, a))
+            pos = max(pos, b)
+        if pos < num_sites: free.append((pos, num_sites))
+        segments.append(free)
+    return segments
+
+def _place_macros(x: np.ndarray, y: np.ndarray, wr: np.ndarray, hr: np.ndarray, obstacles: List[np.ndarray],
+                  num_rows: int, num_sites: int, row_h: float, site: float) -> np.ndarray:
+    """
+    Nearest free lattice position (site column, row) for each multi-row cell,
+    largest first; placed cells become obstacles for the next. Returns the
+    positions, or -1 for cells that fit nowhere.
+
+    Candidates are searched within a Manhattan radius of the cell, starting at
+    MACRO_WINDOW times its half-perimeter and doubling while nothing inside is
+    free, so the lattice is enumerated only around the cell.
+    """
+    out = np.full((len(x), 2), -1, dtype=np.int64)
+    step = max(1, int(round(row_h / site)))
+    obs = np.concatenate(obstacles) if obstacles else np.zeros((0, 4))
+    for k in np.argsort(-(wr * hr), kind="stable"):
+        max_col, max_row = num_sites - wr[k], num_rows - hr[k]
+        if max_col < 0 or max_row < 0: continue
+        # Beyond this radius the window covers the whole lattice
+        full = max(x[k], max_col * site - x[k]) + max(y[k], max_row * row_h - y[k])
+        radius, prev = MACRO_WINDOW * (wr[k] * site + hr[k] * row_h), -1.0
+        while out[k, 0] < 0 and prev < full:
+            c0 = max(0, math.ceil((x[k] - radius) / (site * step)))
+            c1 = math.floor(min(max_col * site, x[k] + radius) / (site * step))
+            r0 = max(0, math.ceil((y[k] - radius) / row_h))
+            r1 = math.floor(min(max_row * row_h, y[k] + radius) / row_h)
+            cx, cy = np.meshgrid(np.arange(c0, c1 + 1) * step, np.arange(r0, r1 + 1))
+            cx, cy = cx.ravel(), cy.ravel()
+            dist = np.abs(cx * site - x[k]) + np.abs(cy * row_h - y[k])
+            # Only the ring not searched yet; beyond `radius` a nearer point may lie outside the window
+            ring = np.flatnonzero((dist > prev) & (dist <= radius))
+            order = ring[np.argsort(dist[ring], kind="stable")]
+            for s in range(0, len(order), MACRO_BATCH):
+                pick = order[s:s + MACRO_BATCH]
+                x0, y0 = cx[pick] * site, cy[pick] * row_h
+                x1, y1 = x0 + wr[k] * site, y0 + hr[k] * row_h
+                hit = ((x0[:, None] < obs[:, 2] - EPS) & (x1[:, None] > obs[:, 0] + EPS)
+                       & (y0[:, None] < obs[:, 3] - EPS) & (y1[:, None] > obs[:, 1] + EPS)).any(axis=1)
+                free = np.flatnonzero(~hit)
+                if len(free):
+                    i = pick[free[0]]
+                    out[k] = cx[i], cy[i]
+                    obs = np.vstack([obs, [[cx[i] * site, cy[i] * row_h, cx[i] * site + wr[k] * site, cy[i] * row_h + hr[k] * row_h]]])
+                    break
+            prev, radius = radius, 2 * radius
+    return out
+
+def _abacus(targets: List[float], widths: List[int], a: int, b: int) -> List[int]:
+    """
+    Abacus placement of one row segment: cells keep their order and get the
+    positions (in sites) closest to `targets` in the squared-displacement
+    sense, without overlap and within [a, b). Cells are appended one at a
+    time; a cell overlapping the last cluster joins it, and a cluster whose
+    optimal position overlaps its predecessor merges with it.
+    """
+    # Per cluster: position, weight, weighted target sum, width, cell count
+    cx: List[int] = []
+    ce: List[int] = []
+    cq: List[float] = []
+    cw: List[int] = []
+    cn: List[int] = []
+    for t, w in zip(targets, widths):
+        if cx and cx[-1] + cw[-1] > t:
+            ce[-1] += 1
+            cq[-1] += t - cw[-1]
+            cw[-1] += w
+            cn[-1] += 1
+        else:
+            cx.append(0); ce.append(1); cq.append(t); cw.append(w); cn.append(1)
+        while True:
+            pos = min(max(int(round(cq[-1] / ce[-1])), a), b - cw[-1])
+            if len(cx) > 1 and cx[-2] + cw[-2] > pos:
+                e, q, w2, n = ce.pop(), cq.pop(), cw.pop(), cn.pop()
+                cx.pop()
+                cq[-1] += q - e * cw[-1]
+                ce[-1] += e
+                cw[-1] += w2
+                cn[-1] += n
+                continue
+            cx[-1] = pos
+            break
+    out = []
+    for pos, n in zip(cx, cn):
+        out.append(pos)
+        for _ in range(n - 1):
+            out.append(out[-1] + widths[len(out) - 1])
+    return out
+
+def legalize_rows(nl: Netlist, params: PlacementParams, row_height: float = 0.0,
+                  site_width: float = 1.0) -> Dict[str, Any]:
+    """
+    Snaps the movable cells onto a row/site grid without overlaps, avoiding
+    fixed cells and `params.blockages`, with little displacement.
+
+    Rows are `row_height` tall (0 uses the median movable cell height) and
+    start at y = 0. Sites are `site_width` wide, and cell widths are rounded
+    up to whole sites.
+    1. Taller cells are macros. Largest first, each takes the nearest free
+       lattice position and then blocks it.
+    2. The remaining cells, sorted by x, are dealt out Tetris-style. Each
+       goes to the free row segment where packing it after the cells already
+       there moves it least. Only rows closer than the best cost so far, and
+       at most ROW_SEARCH rows away once a position is found, are searched.
+    3. Each segment is placed with Abacus cluster merging, which keeps the
+       order but pulls cells back toward their targets.
+    Cells that fit nowhere keep their position and are counted as failed.
+
+    Returns statistics (total and max Manhattan displacement, cell counts).
+    """
+    start = time.perf_counter()
+    mov = nl.movable()
+    row_h = row_height if row_height > 0 else (float(np.median(nl.h[mov])) if len(mov) else 1.0)
+    site = site_width
+    num_rows = int(params.chip_h / row_h + EPS)
+    num_sites = int(params.chip_w / site + EPS)
+    x0, y0 = nl.x.copy(), nl.y.copy()
+
+    fx = nl.fixed
+    obstacles = [np.stack([nl.x[fx], nl.y[fx], nl.x[fx] + nl.w[fx], nl.y[fx] + nl.h[fx]], axis=1)]
+    if params.blockages:
+        obstacles.append(np.asarray(params.blockages, dtype=np.float64).reshape(-1, 4))
+
+    wr = np.maximum(1, np.ceil(nl.w[mov] / site - EPS)).astype(np.int64)
+    hr = np.maximum(1, np.ceil(nl.h[mov] / row_h - EPS)).astype(np.int64)
+    failed = []
+
+    # 1. Macros
+    tall = np.flatnonzero(hr > 1)
+    if len(tall):
+        cells = mov[tall]
+        pos = _place_macros(nl.x[cells], nl.y[cells], wr[tall], hr[tall], obstacles, num_rows, num_sites, row_h, site)
+        ok = pos[:, 0] >= 0
+        nl.x[cells[ok]], nl.y[cells[ok]] = pos[ok, 0] * site, pos[ok, 1] * row_h
+        failed.extend(cells[~ok].tolist())
+        placed = cells[ok]
+        obstacles.append(np.stack([nl.x[placed], nl.y[placed], nl.x[placed] + wr[tall][ok] * site,
+                                   nl.y[placed] + hr[tall][ok] * row_h], axis=1))
+
+    # 2. Row assignment
+    segments = row_segments(np.concatenate(obstacles), num_rows, num_sites, row_h, site) if num_rows else []
+    starts = [[a for a, _ in segs] for segs in segments]
+    fill = [[a for a, _ in segs] for segs in segments]
+    members: Dict[Tuple[int, int], List[int]] = {}
+    single = np.flatnonzero(hr == 1)
+    cells = mov[single]
+    widths = wr[single].tolist()
+    tx, ty = (nl.x[cells] / site).tolist(), nl.y[cells].tolist()
+    for k in np.argsort(nl.x[cells], kind="stable").tolist():
+        xs, y, w = tx[k], ty[k], widths[k]
+        xr = int(round(xs))
+        r0 = min(max(int(round(y / row_h)), 0), num_rows - 1) if num_rows else 0
+        best, best_cost = None, math.inf
+        for d in range(num_rows):
+            if d and ((d - 1) * row_h >= best_cost or (d > ROW_SEARCH and best is not None)): break
+            for r in ((r0,) if d == 0 else (r0 - d, r0 + d)):
+                if not 0 <= r < num_rows: continue
+                dy = abs(r * row_h - y)
+                if dy >= best_cost: continue
+                segs, f = segments[r], fill[r]
+                j0 = max(0, bisect.bisect_right(starts[r], xs) - 1)
+                for j in range(max(0, j0 - 1), min(len(segs), j0 + 3)):
+                    a, b = segs[j]
+                    px = max(f[j], min(max(xr, a), b - w))
+                    if px + w > b: continue
+                    cost = abs(px - xs) * site + dy
+                    if cost < best_cost:
+                        best, best_cost = (r, j, px), cost
+        if best is None:
+            failed.append(int(cells[k]))
+            continue
+        r, j, px = best
+        fill[r][j] = px + w
+        members.setdefault((r, j), []).append(k)
+
+    # 3. Abacus per segment
+    for (r, j), ks in members.items():
+        a, b = segments[r][j]
+        pos = _abacus([tx[k] for k in ks], [widths[k] for k in ks], a, b)
+        idx = cells[ks]
+        nl.x[idx] = np.asarray(pos) * site
+        nl.y[idx] = r * row_h
+
+    disp = np.abs(nl.x[mov] - x0[mov]) + np.abs(nl.y[mov] - y0[mov])
+    return {
+        "cells": int(len(mov)),
+        "macros": int(len(tall)),
+        "failed": len(failed),
+        "rows": num_rows,
+        "row_height": row_h,
+        "site_width": site,
+        "total_displacement": float(disp.sum()),
+        "max_displacement": float(disp.max()) if len(disp) else 0.0,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,213 @@
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+from models import PlacementParams
+from algorithms.incremental import IncrementalCost
+from algorithms.spatial import SpatialGrid
+
+# Move type probabilities per `PlacementParams.anneal_moves`
+MOVE_MIXES: Dict[str, Tuple[Tuple[str, float], ...]] = {
+    "random": (("displace", 1.0),),
+    "mixed": (("displace", 0.5), ("swap", 0.25), ("centroid", 0.15), ("free", 0.1)),
+}
+# Spots or density bins sampled by a free-space move
+FREE_SAMPLES = 3
+
+def _median(v: List[float]) -> float:
+    v = sorted(v)
+    m = len(v) // 2
+    return v[m] if len(v) % 2 else (v[m - 1] + v[m]) / 2
+
+def move_stats(*counts: Dict[str, List[int]]) -> Dict[str, Dict[str, float]]:
+    """Proposed and accepted moves, and the acceptance ratio, per move type, summed over `counts`."""
+    total: Dict[str, List[int]] = {}
+    for c in counts:
+        for kind, (p, a) in c.items():
+            t = total.setdefault(kind, [0, 0])
+            t[0] += p
+            t[1] += a
+    return {k: {"proposed": p, "accepted": a, "accept_ratio": a / p if p else 0.0} for k, (p, a) in total.items()}
+
+class MoveGenerator:
+    """
+    Proposes annealing moves on an IncrementalCost model and applies the
+    Metropolis test. Move types:
+
+    - displace: random shift of one cell by up to the move window per axis.
+    - swap: exchange with a cell near the cell's optimal region (see
+      centroid), found in a SpatialGrid; when there is none within the
+      window, with any cell within the window.
+    - centroid: jump into the cell's optimal region, the box between the
+      medians of the lower and upper bounding-box edges of its nets (the
+      cell itself excluded).
+    - free: leave a blockage across its nearest edge. Near a blockage, jump
+      to the least utilized of a few spots just outside its edges that face
+      the cell; elsewhere, into the least utilized of a few density bins
+      within the window.
+
+    A proposal that is not possible (no neighbour, no nets) falls back to a
+    displacement. Proposals and acceptances are counted per type.
+    """
+    # Moves per `run()` call that the geometric schedule treats as one step
+    chunk = 1
+
+    def __init__(self, model: IncrementalCost, cells: List[int], params: PlacementParams,
+                 rng: random.Random, mix: Optional[str] = None):
+        mix = mix or params.anneal_moves
+        if mix not in MOVE_MIXES:
+            raise ValueError(f"Unknown annealing move set: {mix}")
+        self.model, self.cells, self.params, self.rng = model, cells, params, rng
+        self.nl = nl = model.nl
+        self.w, self.h = nl.w.tolist(), nl.h.tolist()
+        self.kinds = [k for k, _ in MOVE_MIXES[mix]]
+        total = sum(p for _, p in MOVE_MIXES[mix])
+        self.cum, acc = [], 0.0
+        for _, p in MOVE_MIXES[mix]:
+            acc += p / total
+            self.cum.append(acc)
+        self.grid = SpatialGrid(nl, cells, params.chip_w, params.chip_h) if "swap" in self.kinds else None
+        self.counts = {k: [0, 0] for k in self.kinds}
+        self.counts.setdefault("displace", [0, 0])
+        self._propose = {"displace": self._displace, "swap": self._swap,
+                         "centroid": self._centroid, "free": self._free}
+
+    @property
+    def cost(self) -> float:
+        return self.model.cost
+
+    def run(self, T: float, window: float, n: int) -> int:
+        """Runs `n` moves at temperature T; returns how many were accepted."""
+        return sum(self.step(T, window) for _ in range(n))
+
+    def probe(self, window: float, n: int) -> List[float]:
+        """Cost deltas of `n` random displacements, each rolled back."""
+        deltas = []
+        for _ in range(n):
+            deltas.append(self._displace(window)[0])
+            self.model.rollback()
+        return deltas
+
+    def step(self, T: float, window: float) -> bool:
+        """Proposes one move at temperature T with move window `window`; returns whether it was accepted."""
+        rng = self.rng
+        kind = "displace"
+        if len(self.kinds) > 1:
+            r = rng.random()
+            kind = next((k for k, c in zip(self.kinds, self.cum) if r < c), self.kinds[-1])
+        out = self._propose[kind](window)
+        if out is None:
+            kind, out = "displace", self._displace(window)
+        delta, moved = out
+
+        accept = delta < 0 or (T > 0 and rng.random() < math.exp(-delta / T))
+        counts = self.counts[kind]
+        counts[0] += 1
+        if accept:
+            counts[1] += 1
+            self.model.commit()
+            if self.grid is not None:
+                for c in moved: self.grid.update(c)
+        else:
+            self.model.rollback()
+        return accept
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return move_stats(self.counts)
+
+    def _move_to(self, c: int, x: float, y: float) -> Tuple[float, List[int]]:
+        x = max(0, min(self.params.chip_w - self.w[c], x))
+        y = max(0, min(self.params.chip_h - self.h[c], y))
+        return self.model.move(c, x, y), [c]
+
+    def _displace(self, window: float) -> Tuple[float, List[int]]:
+        rng, nl = self.rng, self.model.nl
+        c = rng.choice(self.cells)
+        dx = rng.uniform(-window, window)
+        dy = rng.uniform(-window, window)
+        return self._move_to(c, float(nl.x[c]) + dx, float(nl.y[c]) + dy)
+
+    def _swap(self, window: float) -> Optional[Tuple[float, List[int]]]:
+        model, grid = self.model, self.grid
+        c = self.rng.choice(self.cells)
+        r = max(window, grid.bw, grid.bh)
+        # Prefer a partner near c's optimal region; outside the window, any neighbour
+        other = -1
+        target = self._optimal_region(c)
+        if target is not None:
+            (lx, hx), (ly, hy) = target
+            other = grid.near((lx + hx) / 2, (ly + hy) / 2, max(grid.bw, grid.bh), self.rng, c)
+        if other < 0 or max(abs(model.x[other] - model.x[c]), abs(model.y[other] - model.y[c])) > r:
+            other = grid.neighbor(c, r, self.rng)
+        if other < 0: return None
+        return model.swap(c, other), [c, other]
+
+    def _optimal_region(self, c: int) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """
+        The box between the medians of the lower and upper bounding-box edges
+        of the nets of `c` (the cell itself excluded), as ((lo_x, hi_x), (lo_y, hi_y)).
+        """
+        model = self.model
+        lo_x, hi_x, lo_y, hi_y = [], [], [], []
+        for k in model.nets_of(c).tolist():
+            a, b = model.net_offsets[k], model.net_offsets[k + 1]
+            if b - a > self.params.max_net_fanout: continue
+            p = model.net_pins[a:b]
+            p = p[p != c]
+            if not len(p): continue
+            xs, ys = model.x[p] + model.hw[p], model.y[p] + model.hh[p]
+            lo_x.append(float(xs.min())); hi_x.append(float(xs.max()))
+            lo_y.append(float(ys.min())); hi_y.append(float(ys.max()))
+        if not lo_x: return None
+        # Per net lo <= hi, so the median of the lows never exceeds that of the highs
+        return (_median(lo_x), _median(hi_x)), (_median(lo_y), _median(hi_y))
+
+    def _centroid(self, window: float) -> Optional[Tuple[float, List[int]]]:
+        c = self.rng.choice(self.cells)
+        target = self._optimal_region(c)
+        if target is None: return None
+        (lx, hx), (ly, hy) = target
+        cx, cy = self.rng.uniform(lx, hx), self.rng.uniform(ly, hy)
+        return self._move_to(c, cx - self.w[c] / 2, cy - self.h[c] / 2)
+
+    def _free(self, window: float) -> Tuple[float, List[int]]:
+        model, rng = self.model, self.rng
+        c = rng.choice(self.cells)
+        w, h = self.w[c], self.h[c]
+        cx, cy = float(model.x[c]) + w / 2, float(model.y[c]) + h / 2
+        for bx0, by0, bx1, by1 in model.blockages:
+            if bx0 < cx < bx1 and by0 < cy < by1:
+                # Step out across the nearest edge, clear of the blockage
+                exits = ((cx - bx0, bx0 - w / 2, cy), (bx1 - cx, bx1 + w / 2, cy),
+                         (cy - by0, cx, by0 - h / 2), (by1 - cy, cx, by1 + h / 2))
+                _, tx, ty = min(exits)
+                return self._move_to(c, tx - w / 2, ty - h / 2)
+
+        # Near a blockage: strips just outside the edges that face the cell, within the window
+        strips = []
+        for bx0, by0, bx1, by1 in model.blockages:
+            if bx0 - window < cx < bx1 + window and by0 - window < cy < by1 + window:
+                sx0, sx1 = max(bx0, cx - window), min(bx1, cx + window)
+                sy0, sy1 = max(by0, cy - window), min(by1, cy + window)
+                if cx <= bx0: strips.append((bx0 - w / 2, bx0 - w / 2, sy0, sy1))
+                if cx >= bx1: strips.append((bx1 + w / 2, bx1 + w / 2, sy0, sy1))
+                if cy <= by0: strips.append((sx0, sx1, by0 - h / 2, by0 - h / 2))
+                if cy >= by1: strips.append((sx0, sx1, by1 + h / 2, by1 + h / 2))
+        if strips:
+            points = []
+            for _ in range(FREE_SAMPLES):
+                x0, x1, y0, y1 = rng.choice(strips)
+                points.append((rng.uniform(x0, x1), rng.uniform(y0, y1)))
+            tx, ty = min(points, key=lambda q: model.util[self._bin(q[1], model.gy), self._bin(q[0], model.gx)])
+            return self._move_to(c, tx - w / 2, ty - h / 2)
+
+        # Elsewhere: into the least utilized of a few density bins within the window
+        i0, i1 = self._bin(cx - window, model.gx), self._bin(cx + window, model.gx)
+        j0, j1 = self._bin(cy - window, model.gy), self._bin(cy + window, model.gy)
+        samples = [(rng.randint(j0, j1), rng.randint(i0, i1)) for _ in range(FREE_SAMPLES)]
+        j, i = min(samples, key=lambda b: model.util[b])
+        tx = rng.uniform(i * model.gx, (i + 1) * model.gx)
+        ty = rng.uniform(j * model.gy, (j + 1) * model.gy)
+        return self._move_to(c, tx - w / 2, ty - h / 2)
+
+    def _bin(self, v: float, size: float) -> int:
+        return min(max(int(v / size), 0), self.model.grid_size - 1)
@@ -0,0 +1,219 @@
+import random
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from scipy import sparse
+from netlist import Netlist, NameTable
+from algorithms.global_placer import quadratic_global_placement
+from utils.timing import expired
+
+# Nets above this size do not contribute clustering affinity
+CLUSTER_MAX_DEGREE = 8
+# A cluster may hold at most this multiple of the mean movable cell area
+CLUSTER_AREA_LIMIT = 8.0
+MATCHING_ROUNDS = 6
+
+@dataclass
+class Level:
+    """One coarsening step: `coarse` is built from `fine`, whose cell i becomes cluster cmap[i]."""
+    fine: Netlist
+    coarse: Netlist
+    cmap: np.ndarray
+
+def _affinity(nl: Netlist) -> sparse.csr_matrix:
+    """Clique-model connectivity between movable cells (weight 1 / (p - 1) per net)."""
+    deg = nl.net_degree()
+    rows, cols, vals = [], [], []
+    for d in range(2, CLUSTER_MAX_DEGREE + 1):
+        starts = nl.net_offsets[:-1][deg == d]
+        if not len(starts): continue
+        pins = nl.net_pins[starts[:, None] + np.arange(d)]
+        iu, ju = np.triu_indices(d, k=1)
+        rows.append(pins[:, iu].ravel()); cols.append(pins[:, ju].ravel())
+        vals.append(np.full(len(starts) * len(iu), 1.0 / (d - 1)))
+    n = nl.num_cells
+    if not rows: return sparse.csr_matrix((n, n))
+    a, b, w = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+    keep = (a != b) & ~nl.fixed[a] & ~nl.fixed[b]
+    a, b, w = a[keep], b[keep], w[keep]
+    A = sparse.coo_matrix((np.concatenate([w, w]), (np.concatenate([a, b]), np.concatenate([b, a]))), shape=(n, n)).tocsr()
+    A.sum_duplicates()
+    A.sort_indices()
+    return A
+
+def cluster_cells(nl: Netlist) -> np.ndarray:
+    """
+    Heavy-edge clustering. Rounds of handshake matching pair every free
+    movable cell with its most strongly connected free neighbour when the
+    choice is mutual. A first-choice pass then lets each cell left over join
+    the pair of its strongest matched neighbour. No cluster exceeds
+    CLUSTER_AREA_LIMIT times the mean cell area (leftovers picking the same
+    pair join in id order while it fits), and fixed cells are never merged. Ties go to the lowest id, so the
+    result is deterministic.
+
+    Returns the representative (lowest member id) of every cell's cluster.
+    """
+    n = nl.num_cells
+    A = _affinity(nl).tocoo()
+    area = nl.w * nl.h
+    movable = ~nl.fixed
+    cap = CLUSTER_AREA_LIMIT * (area[movable].mean() if movable.any() else 1.0)
+    ok = area[A.row] + area[A.col] <= cap
+    r0, c0, w0 = A.row[ok], A.col[ok], A.data[ok]
+
+    def strongest(r, c, w):
+        # Strongest neighbour of every row (-1 if none). Edges are in CSR
+        # order (by row, then column), so the first maximum has the lowest id.
+        best = np.full(n, -1, dtype=np.int64)
+        if len(r):
+            starts = np.flatnonzero(np.concatenate([[True], r[1:] != r[:-1]]))
+            seg = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(r))))
+            at_max = np.flatnonzero(w == np.maximum.reduceat(w, starts)[seg])
+            first = np.concatenate([[True], seg[at_max][1:] != seg[at_max][:-1]])
+            best[r[at_max[first]]] = c[at_max[first]]
+        return best
+
+    mate = np.full(n, -1, dtype=np.int64)
+    r, c, w = r0, c0, w0
+    for _ in range(MATCHING_ROUNDS):
+        free = (mate[r] < 0) & (mate[c] < 0)
+        r, c, w = r[free], c[free], w[free]
+        if not len(r): break
+        best = strongest(r, c, w)
+        cand = np.flatnonzero(best >= 0)
+        mutual = cand[best[best[cand]] == cand]
+        mate[mutual] = best[mutual]
+
+    ids = np.arange(n)
+    rep = np.where(mate >= 0, np.minimum(ids, mate), ids)
+    pair_area = area + np.where(mate >= 0, area[np.maximum(mate, 0)], 0.0)
+    # First choice: a leftover cell joins its strongest matched neighbour's pair
+    join = (mate[r0] < 0) & (mate[c0] >= 0) & (area[r0] + pair_area[c0] <= cap)
+    best = strongest(r0[join], c0[join], w0[join])
+    leftover = np.flatnonzero(best >= 0)
+    # Several leftovers may pick one pair: they join in id order while the cluster stays under the cap
+    target = rep[best[leftover]]
+    order = np.lexsort((leftover, target))
+    leftover, target = leftover[order], target[order]
+    joined = np.cumsum(area[leftover])
+    first = np.concatenate([[True], target[1:] != target[:-1]])
+    joined -= np.maximum.accumulate(np.where(first, joined - area[leftover], 0.0))
+    ok = pair_area[target] + joined <= cap
+    rep[leftover[ok]] = target[ok]
+    return rep
+
+def coarsen(nl: Netlist) -> Level:
+    """Merges clustered cells and rebuilds the netlist over the clusters."""
+    rep = cluster_cells(nl)
+    is_rep = np.zeros(nl.num_cells, dtype=bool)
+    is_rep[rep] = True
+    reps = np.flatnonzero(is_rep)
+    cmap = (np.cumsum(is_rep) - 1)[rep]
+    m = len(reps)
+    area = nl.w * nl.h
+    carea = np.bincount(cmap, weights=area, minlength=m)
+    # Area-weighted member centers; zero-area clusters (pins, pads) take the plain mean
+    count = np.bincount(cmap, minlength=m)
+    massive = carea > 0
+    weight = np.where(massive[cmap], area, 1.0)
+    norm = np.where(massive, carea, count)
+    cx = np.bincount(cmap, weights=weight * (nl.x + nl.w / 2), minlength=m) / norm
+    cy = np.bincount(cmap, weights=weight * (nl.y + nl.h / 2), minlength=m) / norm
+    fixed = nl.fixed[reps]
+    # Clusters are squares of the member area; fixed cells keep their shape
+    w = np.where(fixed, nl.w[reps], np.sqrt(carea))
+    h = np.where(fixed, nl.h[reps], np.sqrt(carea))
+
+    # Nets over clusters: duplicate pins collapse, nets inside one cluster vanish
+    owner = nl.pin_net()
+    pairs = np.sort(owner * m + cmap[nl.net_pins])
+    pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]
+    pnet, pcl = np.divmod(pairs, m)
+    deg = np.bincount(pnet, minlength=nl.num_nets)
+    keep = deg[pnet] >= 2
+    pnet, pcl = pnet[keep], pcl[keep]
+    offsets = np.zeros(int(np.count_nonzero(deg >= 2)) + 1, dtype=np.int64)
+    np.cumsum(deg[deg >= 2], out=offsets[1:])
+
+    coarse = Netlist(NameTable.empty(), w, h, fixed, cx - w / 2, cy - h / 2, NameTable.empty(),
+                     offsets, pcl.astype(np.int32))
+    return Level(nl, coarse, cmap)
+
+def _connected_movable(nl: Netlist) -> int:
+    """Movable cells on at least one net; clusters whose nets all became internal do not count."""
+    on_net = np.zeros(nl.num_cells, dtype=bool)
+    on_net[nl.net_pins] = True
+    return int(np.count_nonzero(on_net & ~nl.fixed))
+
+def build_hierarchy(nl: Netlist, coarsest: int, max_levels: int = 20) -> List[Level]:
+    """Coarsens until at most `coarsest` connected movable cells remain or clustering stalls."""
+    levels: List[Level] = []
+    cur = nl
+    while len(levels) < max_levels and _connected_movable(cur) > coarsest:
+        level = coarsen(cur)
+        if _connected_movable(level.coarse) > 0.9 * _connected_movable(cur):
+            break
+        levels.append(level)
+        cur = level.coarse
+    return levels
+
+def relax(nl: Netlist, chip_w: float, chip_h: float, sweeps: int = 3, damping: float = 0.5,
+          max_fanout: int = 1000):
+    """
+    Star-model smoothing: every movable cell moves part of the way toward the
+    weighted mean of the centroids of its nets (weight 1 / (p - 1)). Each
+    sweep is O(pins).
+    """
+    deg = nl.net_degree()
+    use = (deg >= 2) & (deg <= max_fanout)
+    owner = nl.pin_net()
+    pin_use = use[owner]
+    pins, owner = nl.net_pins[pin_use], owner[pin_use]
+    wt = 1.0 / np.maximum(1, deg[owner] - 1)
+    total = np.bincount(pins, weights=wt, minlength=nl.num_cells)
+    move = ~nl.fixed & (total > 0)
+    for _ in range(sweeps):
+        for pos, size, limit in ((nl.x, nl.w, chip_w), (nl.y, nl.h, chip_h)):
+            center = pos + size / 2
+            mean = np.bincount(owner, weights=center[pins], minlength=nl.num_nets) / np.maximum(1, deg)
+            target = np.bincount(pins, weights=wt * mean[owner], minlength=nl.num_cells)
+            new = center[move] + damping * (target[move] / total[move] - center[move])
+            pos[move] = np.maximum(0, np.minimum(limit - size[move], new - size[move] / 2))
+
+def project(level: Level, chip_w: float, chip_h: float, rng: np.random.Generator):
+    """Places every fine cell at its cluster's center, jittered within the cluster footprint."""
+    fine, coarse, cmap = level.fine, level.coarse, level.cmap
+    m = ~fine.fixed
+    cx = coarse.x + coarse.w / 2
+    cy = coarse.y + coarse.h / 2
+    jx = rng.uniform(-0.25, 0.25, fine.num_cells) * coarse.w[cmap]
+    jy = rng.uniform(-0.25, 0.25, fine.num_cells) * coarse.h[cmap]
+    fine.x[m] = (cx[cmap] + jx - fine.w / 2)[m]
+    fine.y[m] = (cy[cmap] + jy - fine.h / 2)[m]
+    fine.x[m] = np.maximum(0, np.minimum(chip_w - fine.w[m], fine.x[m]))
+    fine.y[m] = np.maximum(0, np.minimum(chip_h - fine.h[m], fine.y[m]))
+
+def multilevel_global_placement(nl: Netlist, chip_w: float, chip_h: float, rng: random.Random,
+                                coarsest: int = 2000, relax_sweeps: int = 3,
+                                deadline: Optional[float] = None, **gp_kwargs) -> Tuple[Optional[Any], Dict[str, Any]]:
+    """
+    Multilevel global placement. The netlist is coarsened by heavy-edge
+    clustering until at most `coarsest` connected movable cells remain, the coarsest
+    level is placed with `quadratic_global_placement` (`gp_kwargs` are passed
+    through), and the solution is projected back level by level with
+    `relax_sweeps` sweeps of centroid relaxation as refinement.
+
+    Returns (solver statistics of the coarsest solve, hierarchy summary).
+    """
+    levels = build_hierarchy(nl, coarsest)
+    top = levels[-1].coarse if levels else nl
+    stats = quadratic_global_placement(top, chip_w, chip_h, rng, deadline=deadline, **gp_kwargs)
+    jitter = np.random.default_rng(rng.getrandbits(64))
+    for level in reversed(levels):
+        project(level, chip_w, chip_h, jitter)
+        if not expired(deadline):
+            relax(level.fine, chip_w, chip_h, relax_sweeps, max_fanout=gp_kwargs.get("max_fanout", 1000))
+    info = {"levels": len(levels) + 1,
+            "cells": [nl.num_cells] + [lv.coarse.num_cells for lv in levels],
+            "nets": [nl.num_nets] + [lv.coarse.num_nets for lv in levels]}
+    return stats, info
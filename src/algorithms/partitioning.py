@@ -1,45 +1,127 @@
 import random
-from typing import Dict, List, Tuple, Optional
-from models import Cell, Net
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple, Optional
+from netlist import Netlist
+from algorithms.fm import fm_bipartition
+from utils.shared import SharedArrays, resolve_workers, shared_netlist, worker_netlist
+from utils.timing import expired
+
+# Regions with fewer movable cells are split in the parent process
+PARALLEL_MIN_CELLS = 5000
+
+Region = Tuple[np.ndarray, float, float, float, float]
 
 def recursive_bipartition_place(
-    cells_dict: Dict[str, Cell], nets: List[Net], 
-    w: float, h: float, num_levels: int, 
-    tol: float, rng: random.Random
-):
-    cells = list(cells_dict.values())
-    _bipartition(cells, 0, 0, w, h, num_levels, tol, rng)
-
-def _bipartition(cells: List[Cell], x: float, y: float, w: float, h: float, level: int, tol: float, rng: random.Random):
-    if level <= 0 or not cells:
-        for c in cells:
-            if not c.fixed:
-                c.x = max(x, min(x + w - c.w, c.x))
-                c.y = max(y, min(y + h - c.h, c.y))
-        return
-
-    movable = [c for c in cells if not c.fixed]
-    if not movable: return
-
-    horiz = w > h
-    if horiz:
-        movable.sort(key=lambda c: c.x)
-        mid = x + w / 2
-        w1, w2 = w / 2, w / 2
-        h1, h2 = h, h
-        x1, x2 = x, x + w / 2
-        y1, y2 = y, y
-    else:
-        movable.sort(key=lambda c: c.y)
-        mid = y + h / 2
-        w1, w2 = w, w
-        h1, h2 = h / 2, h / 2
-        x1, x2 = x, x
-        y1, y2 = y, y + h / 2
-
-    split_idx = len(movable) // 2
-    c1 = movable[:split_idx] + [c for c in cells if c.fixed and (c.x < mid if horiz else c.y < mid)]
-    c2 = movable[split_idx:] + [c for c in cells if c.fixed and (c.x >= mid if horiz else c.y >= mid)]
-
-    _bipartition(c1, x1, y1, w1, h1, level - 1, tol, rng)
-    _bipartition(c2, x2, y2, w2, h2, level - 1, tol, rng)
+    nl: Netlist, w: float, h: float, num_levels: int,
+    tol: float, rng: random.Random, deadline: Optional[float] = None,
+    method: str = "fm", max_fanout: int = 1000, workers: int = 0
+) -> Dict[str, Any]:
+    """
+    Splits the die in halves `num_levels` times, assigning the movable cells
+    of every region to its two halves, and clamps the cells into their leaf
+    regions. `method` is "fm" (min-cut, balance within `tol`) or "median"
+    (split at the coordinate median). Once `deadline` passes, regions that
+    are not yet split become leaves.
+
+    The tree is processed level by level. Coordinates only change at the
+    leaves, so all regions of a level are independent: large ones are
+    shipped to a pool of `workers` processes (one per CPU when `workers`
+    <= 0) as cell index arrays over a shared-memory copy of the netlist, and
+    the results are merged in region order. Every region has its own seed, so the placement does not depend
+    on `workers`.
+
+    Returns the number of splits and, for "fm", the total number of cut nets.
+    """
+    if method not in ("fm", "median"):
+        raise ValueError(f"Unknown partitioning method: {method}")
+    stats = {"method": method, "splits": 0, "cut_nets": 0 if method == "fm" else None, "parallel_splits": 0}
+    regions: List[Region] = [(nl.movable(), 0.0, 0.0, w, h)]
+    base = rng.getrandbits(63)
+
+    with _SplitPool(nl, workers) as pool:
+        for depth in range(num_levels):
+            if expired(deadline): break
+            tasks = []
+            for k, (cells, x, y, rw, rh) in enumerate(regions):
+                horiz = rw > rh
+                line = x + rw / 2 if horiz else y + rh / 2
+                seed = int(np.random.SeedSequence([base, depth, k]).generate_state(1)[0])
+                tasks.append((cells, 0 if horiz else 1, line, seed))
+            sides = pool.split(tasks, method, tol, max_fanout, stats)
+
+            children: List[Region] = []
+            for (cells, x, y, rw, rh), side in zip(regions, sides):
+                if rw > rh:
+                    halves = ((x, y, rw / 2, rh), (x + rw / 2, y, rw / 2, rh))
+                else:
+                    halves = ((x, y, rw, rh / 2), (x, y + rh / 2, rw, rh / 2))
+                for s, (hx, hy, hw, hh) in enumerate(halves):
+                    part = cells[side == s]
+                    if len(part): children.append((part, hx, hy, hw, hh))
+            stats["splits"] += len(regions)
+            regions = children
+
+    for cells, x, y, rw, rh in regions:
+        nl.x[cells] = np.maximum(x, np.minimum(x + rw - nl.w[cells], nl.x[cells]))
+        nl.y[cells] = np.maximum(y, np.minimum(y + rh - nl.h[cells], nl.y[cells]))
+    return stats
+
+def _median_split(nl: Netlist, cells: np.ndarray, axis: int) -> np.ndarray:
+    order = np.argsort((nl.x, nl.y)[axis][cells], kind="stable")
+    side = np.zeros(len(cells), dtype=np.int8)
+    side[order[len(cells) // 2:]] = 1
+    return side
+
+def _split(nl: Netlist, cells: np.ndarray, axis: int, line: float, seed: int, method: str,
+           tol: float, max_fanout: int) -> Tuple[np.ndarray, int]:
+    if method == "median":
+        return _median_split(nl, cells, axis), 0
+    side, cut, _ = fm_bipartition(nl, cells, axis, line, tol, random.Random(seed), max_fanout)
+    return side.astype(np.int8), cut
+
+_worker: Dict[str, Any] = {}
+
+def _init_worker(spec):
+    shm, arrays = SharedArrays.attach(spec)
+    nl = worker_netlist(arrays, copy_coords=False)
+    nl._cell_nets = (arrays["cell_net_offsets"], arrays["cell_nets"])
+    _worker.update(shm=shm, nl=nl)
+
+def _pool_split(cells, axis, line, seed, method, tol, max_fanout):
+    return _split(_worker["nl"], cells, axis, line, seed, method, tol, max_fanout)
+
+class _SplitPool:
+    """Runs the splits of one tree level, sending large FM regions to worker processes."""
+    def __init__(self, nl: Netlist, workers: int):
+        self.nl, self.workers = nl, workers
+        self.shared = self.pool = None
+
+    def split(self, tasks, method: str, tol: float, max_fanout: int, stats: Dict[str, Any]) -> List[np.ndarray]:
+        big = [i for i, t in enumerate(tasks) if method == "fm" and len(t[0]) >= PARALLEL_MIN_CELLS]
+        futures = {}
+        if len(big) > 1 and resolve_workers(self.workers, len(big)) > 1:
+            if self.pool is None:
+                cn_off, cn_ids = self.nl.cell_nets()
+                self.shared = SharedArrays({**shared_netlist(self.nl),
+                                            "cell_net_offsets": cn_off, "cell_nets": cn_ids})
+                self.pool = ProcessPoolExecutor(max_workers=resolve_workers(self.workers, 1 << 30),
+                                                initializer=_init_worker, initargs=(self.shared.spec,))
+            futures = {i: self.pool.submit(_pool_split, *tasks[i], method, tol, max_fanout) for i in big}
+            stats["parallel_splits"] += len(big)
+        results = []
+        for i, (cells, axis, line, seed) in enumerate(tasks):
+            side, cut = futures[i].result() if i in futures else \
+                _split(self.nl, cells, axis, line, seed, method, tol, max_fanout)
+            if stats["cut_nets"] is not None:
+                stats["cut_nets"] += cut
+            results.append(side)
+        return results
+
+    def __enter__(self) -> "_SplitPool":
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.shared.close()
@@ -0,0 +1,156 @@
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+from scipy import sparse
+from scipy.sparse.linalg import splu
+from utils.timing import expired
+
+class SolverError(RuntimeError):
+    """Raised when a placement system cannot be solved to a usable result."""
+
+@dataclass
+class SolveStats:
+    method: str
+    precond: Optional[str]
+    tol: float
+    converged: bool = True
+    iterations: List[int] = field(default_factory=list)
+    residuals: List[float] = field(default_factory=list)
+    seconds: float = 0.0
+    message: str = ""
+
+def _preconditioner(A: sparse.csr_matrix, kind: str) -> Callable[[np.ndarray], np.ndarray]:
+    if kind == "jacobi":
+        inv_diag = 1.0 / A.diagonal()
+        return lambda r: inv_diag * r
+    if kind == "ichol":
+        return _dic(A)
+    if kind == "none":
+        return lambda r: r
+    raise ValueError(f"Unknown preconditioner: {kind}")
+
+def _levels(L: sparse.csr_matrix) -> np.ndarray:
+    """
+    Level schedule of a strictly lower triangular L: a row's level is one
+    more than the highest level of the rows it depends on. Found by a
+    Kahn-style sweep that resolves a whole level per step.
+    """
+    n = L.shape[0]
+    U = L.T.tocsr()
+    pending = np.diff(L.indptr)
+    level = np.zeros(n, dtype=np.int64)
+    frontier = np.flatnonzero(pending == 0)
+    depth = 0
+    while len(frontier):
+        level[frontier] = depth
+        deg = U.indptr[frontier + 1] - U.indptr[frontier]
+        first = np.repeat(U.indptr[frontier] - np.cumsum(deg) + deg, deg)
+        rows, count = np.unique(U.indices[first + np.arange(deg.sum())], return_counts=True)
+        pending[rows] -= count
+        frontier = rows[pending[rows] == 0]
+        depth += 1
+    return level
+
+def _dic(A: sparse.csr_matrix) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Diagonal incomplete Cholesky, M = (D + L) D^-1 (D + L)^T with the strict
+    lower triangle L of A and d_i = a_ii - sum_k a_ik^2 / d_k. It has no fill
+    and stays positive definite for the M-matrix Laplacians built here. The
+    d_i of one level (see `_levels`) are independent and computed together.
+    """
+    L = sparse.tril(A, k=-1, format="csr")
+    L.sum_duplicates()
+    level = _levels(L)
+    order = np.argsort(level, kind="stable")
+    bounds = np.searchsorted(level[order], np.arange(level.max(initial=0) + 2))
+    Lp = L[order]
+    row = np.repeat(np.arange(len(order)), np.diff(Lp.indptr))
+    sq = Lp.data * Lp.data
+    d = A.diagonal().astype(np.float64)
+    for s, e in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        a, b = Lp.indptr[s], Lp.indptr[e]
+        if a < b:
+            d[order[s:e]] -= np.bincount(row[a:b] - s, weights=sq[a:b] / d[Lp.indices[a:b]], minlength=e - s)
+    # SuperLU on an already triangular matrix is just a fast triangular solver
+    tri = splu((L + sparse.diags(d)).tocsc(), permc_spec="NATURAL", diag_pivot_thresh=0.0,
+               options={"SymmetricMode": True})
+    return lambda r: tri.solve(d * tri.solve(r), trans="T")
+
+def pcg(A: sparse.csr_matrix, b: np.ndarray, x0: np.ndarray, precond: Callable[[np.ndarray], np.ndarray],
+        tol: float, maxiter: int, deadline: Optional[float] = None) -> Tuple[np.ndarray, int, float]:
+    """
+    Preconditioned conjugate gradient. Returns (x, iterations, relative
+    residual); stops early with the current iterate once `deadline` passes.
+    """
+    x = x0.copy()
+    r = b - A @ x
+    b_norm = np.linalg.norm(b) or 1.0
+    res = np.linalg.norm(r) / b_norm
+    if res <= tol:
+        return x, 0, res
+    z = precond(r)
+    p = z.copy()
+    rz = r @ z
+    for it in range(1, maxiter + 1):
+        Ap = A @ p
+        alpha = rz / (p @ Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        res = np.linalg.norm(r) / b_norm
+        if res <= tol or expired(deadline):
+            return x, it, res
+        z = precond(r)
+        rz_new = r @ z
+        p = z + (rz_new / rz) * p
+        rz = rz_new
+    return x, maxiter, res
+
+def solve_placement_system(Ax: sparse.csr_matrix, bx: np.ndarray, Ay: sparse.csr_matrix, by: np.ndarray,
+                           x0: np.ndarray, y0: np.ndarray, method: str = "direct", precond: str = "jacobi",
+                           tol: float = 1e-5, maxiter: Optional[int] = None,
+                           deadline: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, SolveStats]:
+    """
+    Solves the x and y placement systems.
+
+    "cg": preconditioned CG warm-started from (x0, y0); the two solves run in
+    parallel threads and return their current iterates if `deadline` passes.
+    "direct": sparse LU; when Ax and Ay are the same matrix a single
+    factorization serves both right-hand sides.
+    """
+    start = time.perf_counter()
+    stats = SolveStats(method=method, precond=precond if method == "cg" else None, tol=tol)
+    try:
+        if method == "cg":
+            maxiter = maxiter or 2000
+            def run(A, b, guess):
+                return pcg(A, b, guess, _preconditioner(A, precond), tol, maxiter, deadline)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                fx, fy = pool.submit(run, Ax, bx, x0), pool.submit(run, Ay, by, y0)
+                (sx, ix, rx), (sy, iy, ry) = fx.result(), fy.result()
+            stats.iterations, stats.residuals = [ix, iy], [rx, ry]
+            stats.converged = rx <= tol and ry <= tol
+            if not stats.converged:
+                stats.message = (f"CG stopped by the time budget above tolerance {tol:g}" if expired(deadline)
+                                 else f"CG stopped after {maxiter} iterations above tolerance {tol:g}")
+        elif method == "direct":
+            lu = splu(Ax.tocsc())
+            if Ay is Ax:
+                sol = lu.solve(np.column_stack([bx, by]))
+                sx, sy = sol[:, 0], sol[:, 1]
+                stats.iterations = [1]
+            else:
+                sx, sy = lu.solve(bx), splu(Ay.tocsc()).solve(by)
+                stats.iterations = [1, 1]
+            stats.residuals = [np.linalg.norm(Ax @ sx - bx) / (np.linalg.norm(bx) or 1.0),
+                               np.linalg.norm(Ay @ sy - by) / (np.linalg.norm(by) or 1.0)]
+        else:
+            raise ValueError(f"Unknown solver: {method}")
+    except (RuntimeError, ArithmeticError) as e:
+        raise SolverError(f"{method} solve failed: {e}") from e
+
+    stats.seconds = time.perf_counter() - start
+    if not (np.all(np.isfinite(sx)) and np.all(np.isfinite(sy))):
+        raise SolverError(f"{method} solve produced non-finite coordinates")
+    return sx, sy, stats
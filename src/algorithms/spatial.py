@@ -0,0 +1,81 @@
+import math
+import random
+from typing import List, Tuple
+import numpy as np
+from netlist import Netlist
+
+# Average number of indexed cells per grid bin
+CELLS_PER_BIN = 4
+NEIGHBOR_TRIES = 4
+
+class SpatialGrid:
+    """
+    Uniform-grid index of cell centers. Each bin keeps a list of its cells;
+    a cell's bin and its slot in that list are stored per cell, so moving a
+    cell is O(1). Call `update()` after a cell's coordinates change.
+    """
+    def __init__(self, nl: Netlist, cells: List[int], chip_w: float, chip_h: float):
+        self.nl = nl
+        self.chip_w, self.chip_h = chip_w, chip_h
+        side = max(1, int(math.sqrt(max(1, len(cells)) / CELLS_PER_BIN)))
+        self.nx = self.ny = side
+        self.bw, self.bh = chip_w / side, chip_h / side
+        self.bins: List[List[int]] = [[] for _ in range(side * side)]
+        self.where = [-1] * nl.num_cells
+        self.slot = [-1] * nl.num_cells
+        for c in cells:
+            self._insert(c, self._bin_of(c))
+
+    def _bin_of(self, c: int) -> int:
+        nl = self.nl
+        i = int((float(nl.x[c]) + float(nl.w[c]) / 2) / self.bw)
+        j = int((float(nl.y[c]) + float(nl.h[c]) / 2) / self.bh)
+        return min(max(j, 0), self.ny - 1) * self.nx + min(max(i, 0), self.nx - 1)
+
+    def _insert(self, c: int, b: int):
+        self.where[c], self.slot[c] = b, len(self.bins[b])
+        self.bins[b].append(c)
+
+    def _remove(self, c: int):
+        members = self.bins[self.where[c]]
+        last = members.pop()
+        if last != c:
+            members[self.slot[c]] = last
+            self.slot[last] = self.slot[c]
+
+    def update(self, c: int):
+        """Re-files cell `c` after a move."""
+        b = self._bin_of(c)
+        if b != self.where[c]:
+            self._remove(c)
+            self._insert(c, b)
+
+    def bin_range(self, cx: float, cy: float, radius: float) -> Tuple[int, int, int, int]:
+        """Bins (i0, i1, j0, j1), inclusive, overlapping the square of `radius` around (cx, cy)."""
+        i0 = min(max(int((cx - radius) / self.bw), 0), self.nx - 1)
+        i1 = min(max(int((cx + radius) / self.bw), 0), self.nx - 1)
+        j0 = min(max(int((cy - radius) / self.bh), 0), self.ny - 1)
+        j1 = min(max(int((cy + radius) / self.bh), 0), self.ny - 1)
+        return i0, i1, j0, j1
+
+    def neighbor(self, c: int, radius: float, rng: random.Random) -> int:
+        """
+        A random indexed cell other than `c` in a bin within `radius` of its
+        center, or -1 if a few sampled bins hold none.
+        """
+        nl = self.nl
+        return self.near(float(nl.x[c]) + float(nl.w[c]) / 2, float(nl.y[c]) + float(nl.h[c]) / 2, radius, rng, c)
+
+    def near(self, cx: float, cy: float, radius: float, rng: random.Random, exclude: int = -1) -> int:
+        """A random indexed cell other than `exclude` in a bin within `radius` of (cx, cy), or -1."""
+        i0, i1, j0, j1 = self.bin_range(cx, cy, radius)
+        for _ in range(NEIGHBOR_TRIES):
+            members = self.bins[rng.randint(j0, j1) * self.nx + rng.randint(i0, i1)]
+            if members:
+                other = members[rng.randrange(len(members))]
+                if other != exclude: return other
+        return -1
+
+    def counts(self) -> np.ndarray:
+        """Number of cells in every bin, as an (ny, nx) array."""
+        return np.array([len(b) for b in self.bins]).reshape(self.ny, self.nx)
@@ -0,0 +1,224 @@
+import math
+import multiprocessing as mp
+import random
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from models import PlacementParams
+from netlist import Netlist
+from algorithms.incremental import IncrementalCost
+from algorithms.annealing import T_START, T_FLOOR
+from algorithms.moves import MoveGenerator, move_stats
+from utils.shared import SharedArrays, derive_seeds, resolve_workers, shared_netlist, worker_netlist
+from utils.timing import expired
+
+# Probe moves that calibrate the ladder
+PT_PROBES = 100
+# Hottest ladder temperature, relative to the spread of probe deltas
+PT_HOT_SCALE = 0.1
+# Coldest over hottest ladder temperature
+PT_COLD_RATIO = 1e-3
+
+def temperature_ladder(replicas: int, t_min: float = T_FLOOR, t_max: float = T_START) -> List[float]:
+    """Geometric ladder from t_min (replica 0) to t_max."""
+    if replicas == 1: return [t_min]
+    return [t_min * (t_max / t_min) ** (k / (replicas - 1)) for k in range(replicas)]
+
+def calibrated_ladder(nl: Netlist, params: PlacementParams, replicas: int, seed: int) -> List[float]:
+    """
+    Ladder scaled to the cost of this placement: the hottest temperature is
+    PT_HOT_SCALE times the spread of probe move deltas (the temperature the
+    adaptive schedule starts at), the coldest PT_COLD_RATIO of that.
+    """
+    model = IncrementalCost(worker_netlist(shared_netlist(nl)), params)
+    cells = nl.movable().tolist()
+    probe = MoveGenerator(model, cells, params, random.Random(seed))
+    deltas = probe.probe(max(params.chip_w, params.chip_h) / 10.0, min(len(cells), PT_PROBES))
+    t_max = max(float(np.std(deltas)) if deltas else 0.0, 1e-9)
+    t_max *= PT_HOT_SCALE
+    return temperature_ladder(replicas, t_max * PT_COLD_RATIO, t_max)
+
+class _ReplicaGroup:
+    """
+    The replicas owned by one worker. Each replica is a private copy of the
+    placement with its own cost model and random stream; it remembers the
+    best configuration seen at a sweep boundary.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray], params: PlacementParams, ids: List[int], seeds: List[int]):
+        self.arrays, self.params = arrays, params
+        self.replicas = {}
+        cells = np.flatnonzero(~arrays["fixed"]).tolist()
+        for r in ids:
+            nl = worker_netlist(arrays)
+            model = IncrementalCost(nl, params)
+            moves = MoveGenerator(model, cells, params, random.Random(seeds[r]))
+            self.replicas[r] = {"nl": nl, "model": model, "moves": moves,
+                                "best": model.cost, "best_x": nl.x.copy(), "best_y": nl.y.copy()}
+
+    def sweep(self, temps: Dict[int, Tuple[float, float]], moves: int) -> Dict[int, Tuple[float, int]]:
+        """Runs `moves` Metropolis moves per replica at its assigned (temperature, move window)."""
+        out = {}
+        for r, (T, window) in temps.items():
+            rep = self.replicas[r]
+            model = rep["model"]
+            accepted = sum(rep["moves"].step(T, window) for _ in range(moves))
+            if model.cost < rep["best"]:
+                rep["best"] = model.cost
+                rep["best_x"][:], rep["best_y"][:] = rep["nl"].x, rep["nl"].y
+            out[r] = (model.cost, accepted)
+        return out
+
+    def finish(self) -> Dict[int, Tuple[float, Dict[str, Any]]]:
+        """Writes every replica's best configuration to its shared output slot; returns best costs and move counts."""
+        for r, rep in self.replicas.items():
+            self.arrays["out_x"][r], self.arrays["out_y"][r] = rep["best_x"], rep["best_y"]
+        return {r: (rep["best"], rep["moves"].counts) for r, rep in self.replicas.items()}
+
+def _replica_worker(conn, spec, params: PlacementParams, ids: List[int], seeds: List[int]):
+    shm, arrays = SharedArrays.attach(spec)
+    try:
+        group = _ReplicaGroup(arrays, params, ids, seeds)
+        while True:
+            cmd, *args = conn.recv()
+            if cmd == "sweep":
+                conn.send(("ok", group.sweep(*args)))
+            elif cmd == "finish":
+                conn.send(("ok", group.finish()))
+                break
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        del arrays
+        shm.close()
+        conn.close()
+
+class _ProcessGroups:
+    """Replica groups hosted in worker processes, driven over pipes."""
+    def __init__(self, spec, params: PlacementParams, groups: List[List[int]], seeds: List[int]):
+        ctx = mp.get_context()
+        self.conns, self.procs = [], []
+        for ids in groups:
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_replica_worker, args=(child, spec, params, ids, seeds), daemon=True)
+            p.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(p)
+        self.groups = groups
+
+    def call(self, cmd: str, per_group: List[tuple]) -> Dict[int, Any]:
+        for conn, args in zip(self.conns, per_group):
+            conn.send((cmd, *args))
+        out = {}
+        for conn in self.conns:
+            status, result = conn.recv()
+            if status == "error":
+                raise RuntimeError(f"replica worker failed:\n{result}")
+            out.update(result)
+        return out
+
+    def close(self):
+        for p in self.procs:
+            p.join(timeout=5)
+            if p.is_alive(): p.terminate()
+
+def parallel_tempering(nl: Netlist, params: PlacementParams, replicas: int = 4, swap_interval: int = 100,
+                       workers: int = 0, seed: int = 0,
+                       deadline: Optional[float] = None) -> Tuple[float, float, Dict[str, Any]]:
+    """
+    Replica-exchange annealing. `replicas` copies of the placement run
+    Metropolis moves at fixed temperatures of a calibrated geometric ladder
+    (see `calibrated_ladder`), spread over worker processes. Every
+    `swap_interval` moves, neighbouring temperatures
+    attempt a Metropolis exchange (alternating even and odd pairs). Replicas
+    keep their configuration and swap temperatures, so no placement data
+    crosses process boundaries until the end.
+
+    `params.anneal_iters` is the total move budget, split evenly across the
+    replicas. The best configuration seen by any replica is written to `nl`.
+    The result depends only on `seed` and `replicas`, not on `workers`.
+    No further sweeps are started once `deadline` passes. Batched moves
+    (`params.anneal_batch`) are not supported.
+
+    Returns (best cost, accept ratio, statistics).
+    """
+    start = time.perf_counter()
+    if params.anneal_batch > 0:
+        raise ValueError("Parallel tempering evaluates moves one at a time; anneal_batch must be 0")
+    if not len(nl.movable()): return 0.0, 0.0, {}
+    seeds = derive_seeds(seed, replicas + 2)
+    ladder = calibrated_ladder(nl, params, replicas, seeds[-2])
+    rng = random.Random(seeds[-1])
+    # Move windows follow the ladder, from a tenth of the die at the top
+    cells = nl.movable()
+    min_window = float(np.mean(nl.w[cells] + nl.h[cells])) / 20.0
+    span = max(params.chip_w, params.chip_h)
+    windows = [max(min_window, span / 10.0 * T / ladder[-1]) for T in ladder]
+    workers = resolve_workers(workers, replicas)
+    groups = [list(range(k, replicas, workers)) for k in range(workers)]
+
+    moves = -(-params.anneal_iters // replicas)
+    sweeps = max(1, -(-moves // swap_interval))
+    # temp_of[r] is the ladder index currently held by replica r
+    temp_of = list(range(replicas))
+    swaps_tried = swaps_accepted = accepted = 0
+
+    arrays = shared_netlist(nl)
+    arrays["out_x"] = np.zeros((replicas, nl.num_cells))
+    arrays["out_y"] = np.zeros((replicas, nl.num_cells))
+    with SharedArrays(arrays) as shared:
+        if workers == 1:
+            group = _ReplicaGroup(shared.arrays, params, groups[0], seeds)
+            call = lambda cmd, per_group: getattr(group, cmd)(*per_group[0])
+            pool = None
+        else:
+            pool = _ProcessGroups(shared.spec, params, groups, seeds)
+            call = pool.call
+        try:
+            done = completed = 0
+            for s in range(sweeps):
+                if s and expired(deadline): break
+                n = min(swap_interval, moves - done)
+                done += n
+                completed += 1
+                results = call("sweep", [({r: (ladder[temp_of[r]], windows[temp_of[r]]) for r in ids}, n)
+                                         for ids in groups])
+                accepted += sum(a for _, a in results.values())
+                for r, (_, a) in results.items():
+                    t = temp_of[r]
+                    windows[t] = min(span, max(min_window, windows[t] * (1.0 - params.anneal_target_accept + a / n)))
+
+                # Metropolis exchange between neighbouring ladder slots
+                holder = {t: r for r, t in enumerate(temp_of)}
+                for t in range(s % 2, replicas - 1, 2):
+                    a, b = holder[t], holder[t + 1]
+                    ca, cb = results[a][0], results[b][0]
+                    arg = (ca - cb) * (1.0 / ladder[t] - 1.0 / ladder[t + 1])
+                    swaps_tried += 1
+                    if arg >= 0 or rng.random() < math.exp(arg):
+                        temp_of[a], temp_of[b] = t + 1, t
+                        swaps_accepted += 1
+            finished = call("finish", [() for _ in groups])
+        finally:
+            if pool: pool.close()
+            group = None
+
+        best_costs = {r: cost for r, (cost, _) in finished.items()}
+        best = min(best_costs, key=lambda r: (best_costs[r], r))
+        nl.x[:] = shared["out_x"][best]
+        nl.y[:] = shared["out_y"][best]
+
+    info = {
+        "replicas": replicas,
+        "ladder": ladder,
+        "windows": windows,
+        "sweeps": completed,
+        "moves_per_replica": done,
+        "swap_accept_ratio": swaps_accepted / max(1, swaps_tried),
+        "replica_best_costs": [best_costs[r] for r in range(replicas)],
+        "best_replica": best,
+        "move_stats": move_stats(*(counts for _, counts in finished.values())),
+        "seconds": time.perf_counter() - start,
+    }
+    return best_costs[best], accepted / max(1, done * replicas), info
@@ -1,16 +1,30 @@
 import random
-from typing import Dict, Tuple, List, Optional, Any
+from dataclasses import asdict
+from typing import Dict, Tuple, Optional, Any
 import numpy as np
 
 from utils.samples import create_cpu_like_blockages, example_netlist_dict, CHIP_W, CHIP_H
-from models import Cell, Net, PlacementParams
-from utils.parser import parse_netlist, init_placement
-from utils.verilog_parser import parse_verilog_netlist
+from models import PlacementParams
+from netlist import Netlist, NetlistBuilder, CellsView, NetsView
+from utils.parser import parse_netlist, parse_netlist_file, init_placement, PARSER_VERSION as JSON_PARSER_VERSION
+from utils.verilog_parser import parse_verilog_netlist, PARSER_VERSION as VERILOG_PARSER_VERSION
+from utils.bookshelf import read_bookshelf
+from utils.netlist_cache import NetlistCache
+from utils.netlist_store import save_netlist_store, open_netlist_store
 from utils.def_writer import write_def
-from algorithms.cost import total_wirelength, density_overflow, congestion_estimate
+from utils.placement_io import save_placement_npz, write_placement_jsonl
+from utils.timing import TimeBudget
+from algorithms.cost import netlist_wirelength, netlist_density, netlist_congestion
 from algorithms.global_placer import quadratic_global_placement
+from algorithms.multilevel import multilevel_global_placement
+from algorithms.eplace import eplace_global_placement
+from algorithms.solvers import SolverError
 from algorithms.partitioning import recursive_bipartition_place
-from algorithms.annealing import anneal
+from algorithms.annealing import anneal, multi_start_anneal
+from algorithms.tempering import parallel_tempering
+from algorithms.detailed import window_detailed_placement, placement_cost
+from algorithms.legalize import legalize_rows
+from algorithms.legality import check_legality
 from utils.visualize import plot_cells_and_nets, plot_congestion
 import json
 import os
@@ -21,52 +35,223 @@ class PlacementEngine:
     """
     def __init__(self, params: Optional[PlacementParams] = None):
         self.params = params or PlacementParams(chip_w=CHIP_W, chip_h=CHIP_H)
-        self.cells: Dict[str, Cell] = {}
-        self.nets: List[Net] = []
+        self.netlist: Netlist = NetlistBuilder().build()
+        # Coordinates are placed relative to the die's lower-left corner; this is added back on output
+        self.origin: Tuple[float, float] = (0.0, 0.0)
         self.rng = random.Random(self.params.rng_seed)
 
+    @property
+    def cells(self) -> CellsView:
+        """`Dict[str, Cell]`-compatible view of the loaded netlist."""
+        return self.netlist.cells
+
+    @property
+    def nets(self) -> NetsView:
+        """`List[Net]`-compatible view of the loaded netlist."""
+        return self.netlist.nets
+
     def load_netlist(self, netlist: Dict):
-        self.cells, self.nets = parse_netlist(netlist)
-        if not self.params.blockages:
-            self.params.blockages = create_cpu_like_blockages(self.cells, rng_seed=self.params.rng_seed)
+        self._set_netlist(parse_netlist(netlist))
 
     def load_verilog(self, file_path: str):
         """Loads a Verilog or SystemVerilog netlist."""
-        self.cells, self.nets = parse_verilog_netlist(file_path)
+        self._load_file(file_path, parse_verilog_netlist, VERILOG_PARSER_VERSION)
+
+    def load_json(self, file_path: str):
+        """Loads a JSON netlist file."""
+        self._load_file(file_path, parse_netlist_file, JSON_PARSER_VERSION)
+
+    def _load_file(self, file_path: str, parse, parser_version: str):
+        # With `params.cache_dir` set, a file parsed before is read back from the binary cache
+        if self.params.cache_dir:
+            cache = NetlistCache(self.params.cache_dir, self.params.cache_size_mb)
+            nl, hit = cache.load(file_path, parse, parser_version)
+            print(f"Netlist cache {'hit' if hit else 'miss'}: {file_path}")
+        else:
+            nl = parse(file_path)
+        self._set_netlist(nl)
+
+    def load_bookshelf(self, aux_path: str):
+        """
+        Loads a Bookshelf design (.aux). Die size, row height and site width
+        come from its rows; its fixed cells are the only obstacles, so no
+        default blockages are generated. The core's lower-left corner becomes
+        `origin`.
+        """
+        nl, layout = read_bookshelf(aux_path)
+        self.params.chip_w, self.params.chip_h = layout["die"]
+        if layout["rows"]:
+            self.params.row_height, self.params.site_width = layout["row_height"], layout["site_width"]
+        print(f"Bookshelf design: {nl.num_cells} nodes ({int(nl.fixed.sum())} fixed), {nl.num_nets} nets, "
+              f"{layout['rows']} rows, die {layout['die'][0]:g} x {layout['die'][1]:g}")
+        self._set_netlist(nl, blockages=False)
+        self.origin = layout["origin"]
+
+    def load_store(self, path: str):
+        """Opens a netlist store (see `utils.netlist_store`) memory-mapped, without parsing."""
+        self.netlist = open_netlist_store(path)
+        self.origin = (0.0, 0.0)
+        self._default_blockages()
+
+    def _set_netlist(self, nl: Netlist, blockages: bool = True):
+        # Out-of-core mode: the arrays move to memory-mapped files under `params.mmap_dir`
+        if self.params.mmap_dir:
+            save_netlist_store(nl, self.params.mmap_dir)
+            nl = open_netlist_store(self.params.mmap_dir)
+        self.netlist = nl
+        self.origin = (0.0, 0.0)
+        if blockages:
+            self._default_blockages()
+
+    def _default_blockages(self):
         if not self.params.blockages:
             self.params.blockages = create_cpu_like_blockages(self.cells, rng_seed=self.params.rng_seed)
 
     def run(self, init_coords: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, Any]:
-        """Runs the full placement flow."""
-        init_placement(self.cells, self.params.chip_w, self.params.chip_h, init_coords, self.rng)
+        """
+        Runs the full placement flow. With `params.time_budget` set, the budget
+        is split across the stages and each stage keeps its best-so-far result
+        when its slice runs out. `init_coords` are in output coordinates (with
+        `origin`).
+        """
+        nl = self.netlist
+        budget = TimeBudget(self.params.time_budget, self.params.stage_weights())
+        if init_coords and self.origin != (0.0, 0.0):
+            ox, oy = self.origin
+            init_coords = {name: (x - ox, y - oy) for name, (x, y) in init_coords.items()}
+        init_placement(nl, self.params.chip_w, self.params.chip_h, init_coords, self.rng)
 
         print("Starting placement flow...")
-        print("1. Quadratic global placement...")
-        quadratic_global_placement(self.cells, self.nets, self.params.chip_w, self.params.chip_h, self.rng)
+        engine = "Multilevel quadratic" if self.params.multilevel else "Quadratic"
+        if self.params.global_engine == "eplace":
+            engine += " + electrostatic (ePlace)"
+        print(f"1. {engine} global placement...")
+        deadline = budget.stage("global")
+        gp_args = dict(net_model=self.params.net_model,
+                       fanout_threshold=self.params.fanout_threshold,
+                       max_fanout=self.params.max_net_fanout,
+                       solver=self.params.solver,
+                       precond=self.params.solver_precond,
+                       tol=self.params.solver_tol,
+                       deadline=deadline)
+        hierarchy = {}
+        try:
+            if self.params.multilevel:
+                stats, hierarchy = multilevel_global_placement(nl, self.params.chip_w, self.params.chip_h, self.rng,
+                                                               coarsest=self.params.ml_coarsest, **gp_args)
+                print(f"   Multilevel: {hierarchy['levels']} levels, coarsest {hierarchy['cells'][-1]} cells")
+            else:
+                stats = quadratic_global_placement(nl, self.params.chip_w, self.params.chip_h, self.rng, **gp_args)
+            solve_info = asdict(stats) if stats else {}
+            if stats and not stats.converged:
+                print(f"   Warning: {stats.message}")
+        except SolverError as e:
+            print(f"   Warning: global placement skipped, {e}")
+            solve_info = {"converged": False, "message": str(e)}
 
-        print("2. Recursive bisection partitioning...")
-        recursive_bipartition_place(self.cells, self.nets, self.params.chip_w, self.params.chip_h, 
-                                   self.params.num_partitions, self.params.balance_tolerance, self.rng)
+        spreading, bisection = {}, {}
+        if self.params.global_engine == "eplace":
+            spreading = eplace_global_placement(nl, self.params.chip_w, self.params.chip_h, self.rng,
+                                                self.params.blockages, self.params.eplace_overflow,
+                                                self.params.eplace_iters, self.params.max_net_fanout,
+                                                deadline=deadline)
+            print(f"   Electrostatic spreading: {spreading['iterations']} iterations, "
+                  f"overflow {spreading['overflow']:.3f} ({spreading['stop_reason']})")
+            print("2. Recursive bisection skipped (analytical spreading)")
+        else:
+            print("2. Recursive bisection partitioning...")
+            deadline = budget.stage("bisection")
+            bisection = recursive_bipartition_place(nl, self.params.chip_w, self.params.chip_h,
+                                                    self.params.num_partitions, self.params.balance_tolerance,
+                                                    self.rng, deadline, self.params.partitioner,
+                                                    self.params.max_net_fanout, self.params.workers)
 
         print("3. Simulated annealing refinement...")
-        final_cost, acc_ratio = anneal(self.nets, self.cells, self.params, self.rng)
+        deadline = budget.stage("anneal")
+        anneal_runs, tempering, anneal_info = [], {}, {}
+        if self.params.anneal_engine == "pt":
+            final_cost, acc_ratio, tempering = parallel_tempering(
+                nl, self.params, self.params.pt_replicas, self.params.pt_swap_interval,
+                self.params.workers, self.params.rng_seed, deadline)
+        elif self.params.anneal_runs > 1:
+            final_cost, acc_ratio, anneal_runs = multi_start_anneal(
+                nl, self.params, self.params.anneal_runs, self.params.workers, self.params.rng_seed, deadline)
+            best = min(anneal_runs, key=lambda s: (s["cost"], s["run"]))
+            print(f"   Best of {len(anneal_runs)} runs: run {best['run']} (cost {final_cost:.2f})")
+        else:
+            final_cost, acc_ratio, anneal_info = anneal(nl, self.params, self.rng, deadline)
+            print(f"   Stopped after {anneal_info['iterations']} moves ({anneal_info['stop_reason']})")
+        move_stats = anneal_info.get("move_stats") or tempering.get("move_stats")
+        if move_stats:
+            print("   Acceptance by move type: " + ", ".join(f"{k} {v['accept_ratio']:.2f}" for k, v in move_stats.items()))
+
+        detailed = {}
+        if self.params.detailed_rounds > 0:
+            print("4. Window-parallel detailed placement...")
+            deadline = budget.stage("detailed")
+            final_cost, detailed = window_detailed_placement(
+                nl, self.params, self.params.detailed_rounds, self.params.detailed_window_cells,
+                self.params.workers, self.params.rng_seed, deadline=deadline)
+            print(f"   {detailed['rounds']} rounds over {detailed['windows']} windows (cost {final_cost:.2f})")
+
+        legalization = {}
+        if self.params.legalize:
+            print("5. Row legalization...")
+            budget.stage("legalize")
+            legalization = legalize_rows(nl, self.params, self.params.row_height, self.params.site_width)
+            final_cost = placement_cost(nl, self.params)
+            print(f"   {legalization['rows']} rows, {legalization['failed']} cells unplaced, displacement "
+                  f"total {legalization['total_displacement']:.1f} / max {legalization['max_displacement']:.1f}")
+        stage_seconds = budget.done()
 
         print("\nPlacement complete. Calculating metrics...")
-        wl = total_wirelength(self.nets, self.cells)
-        dens_over, util = density_overflow(self.cells, self.params.chip_w, self.params.chip_h)
-        cong = congestion_estimate(self.nets, self.cells, self.params.chip_w, self.params.chip_h)
+        wl = netlist_wirelength(nl)
+        dens_over, util = netlist_density(nl, self.params.chip_w, self.params.chip_h)
+        cong = netlist_congestion(nl, self.params.chip_w, self.params.chip_h, self.params.congestion_grid)
+        legality = check_legality(nl, self.params.chip_w, self.params.chip_h, self.params.blockages)
+        print(f"   Legality: {legality['overlap_pairs']} overlapping pairs, {legality['blockage_overlaps']} "
+              f"blockage overlaps, {legality['out_of_die']} cells outside the die")
 
         metrics = {
             "wirelength_total": wl,
             "density_overflow_sum": dens_over,
             "avg_utilization": float(np.mean(util)),
             "congestion_heatmap": cong,
+            "legality": legality,
             "anneal_accept_ratio": acc_ratio,
             "final_cost": final_cost,
+            "global_solve": solve_info,
+            "multilevel": hierarchy,
+            "eplace": spreading,
+            "bisection": bisection,
+            "anneal_iterations": anneal_info.get("iterations"),
+            "anneal_stop_reason": anneal_info.get("stop_reason"),
+            "anneal_move_stats": move_stats,
+            "anneal_runs": anneal_runs,
+            "anneal_tempering": tempering,
+            "detailed": detailed,
+            "legalization": legalization,
+            "stage_seconds": stage_seconds,
         }
 
         return metrics
 
+    def check_placement(self, coords: Dict[str, Tuple[float, float]],
+                        die: Optional[Tuple[float, float, float, float]] = None) -> Dict[str, Any]:
+        """
+        Legality of a saved placement of the loaded netlist. `coords` maps cell
+        names to lower-left corners in output coordinates; `die` (x0, y0, x1,
+        y1) overrides the chip size, and its corner the `origin`.
+        """
+        nl = self.netlist
+        ox, oy = die[:2] if die else self.origin
+        for i, name in enumerate(nl.names):
+            if name in coords:
+                x, y = coords[name]
+                nl.x[i], nl.y[i] = x - ox, y - oy
+        chip_w, chip_h = (die[2] - die[0], die[3] - die[1]) if die else (self.params.chip_w, self.params.chip_h)
+        return check_legality(nl, chip_w, chip_h, self.params.blockages)
+
     def visualize(self, metrics: Dict[str, Any], save_dir: Optional[str] = None):
         """Generates plots for the placement and congestion."""
         p_path = os.path.join(save_dir, "placement.png") if save_dir else None
@@ -75,19 +260,33 @@ class PlacementEngine:
         plot_cells_and_nets(self.cells, self.nets, self.params, "Final Placement", save_path=p_path)
         plot_congestion(metrics["congestion_heatmap"], self.params, "Final Congestion", save_path=c_path)
 
-    def save_results(self, folder_path: str, design_name: str = "top"):
-        """Saves placement results in .def and .json formats."""
+    def save_results(self, folder_path: str, design_name: str = "top", compress: bool = False,
+                     json_output: bool = False, jsonl: bool = False):
+        """
+        Saves placement results as .def (.def.gz if `compress`) and as a
+        columnar `_placement.npz`; optionally also as JSON lines
+        (`_placement.jsonl`) and as the indented `{name: {x, y}}` JSON. All
+        coordinates, and the DEF die area, are shifted by `origin`.
+        """
         if not os.path.exists(folder_path):
             os.makedirs(folder_path)
             
         # 1. Save DEF
-        def_path = os.path.join(folder_path, f"{design_name}.def")
-        write_def(self.cells, self.params.chip_w, self.params.chip_h, def_path, design_name)
+        def_path = os.path.join(folder_path, f"{design_name}.def" + (".gz" if compress else ""))
+        write_def(self.netlist, self.params.chip_w, self.params.chip_h, def_path, design_name, origin=self.origin)
         
-        # 2. Save JSON coordinates
-        json_path = os.path.join(folder_path, f"{design_name}_placement.json")
-        coords = {name: {"x": c.x, "y": c.y} for name, c in self.cells.items()}
-        with open(json_path, 'w') as f:
-            json.dump(coords, f, indent=4)
+        # 2. Save columnar coordinates
+        nl = self.netlist
+        save_placement_npz(nl, os.path.join(folder_path, f"{design_name}_placement.npz"), self.origin)
+        if jsonl:
+            write_placement_jsonl(nl, os.path.join(folder_path, f"{design_name}_placement.jsonl"), origin=self.origin)
+
+        # 3. Save JSON coordinates
+        if json_output:
+            json_path = os.path.join(folder_path, f"{design_name}_placement.json")
+            ox, oy = self.origin
+            coords = {name: {"x": x + ox, "y": y + oy} for name, x, y in zip(nl.names, nl.x.tolist(), nl.y.tolist())}
+            with open(json_path, 'w') as f:
+                json.dump(coords, f, indent=4)
             
         print(f"Results saved to folder: {folder_path}")
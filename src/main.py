@@ -1,7 +1,6 @@
 import argparse
 import sys
 import os
-import json
 import tkinter as tk
 from tkinter import filedialog
 from engine import PlacementEngine
@@ -9,32 +8,65 @@ from models import PlacementParams
 from utils.samples import example_netlist_dict, CHIP_W, CHIP_H
 from utils.generators import create_systolic_array, create_modern_soc
 from utils.gui import get_user_params
+from utils.parser import load_placement
+from utils.netlist_store import is_netlist_store
 
 def select_file():
     root = tk.Tk()
     root.withdraw() # Hide the main window
     file_path = filedialog.askopenfilename(
         title="AutoPlacer: Select Input Netlist",
-        filetypes=[("Hardware Description", "*.v *.sv"), ("JSON Netlist", "*.json")]
+        filetypes=[("Hardware Description", "*.v *.sv"), ("JSON Netlist", "*.json"), ("Bookshelf Design", "*.aux")]
     )
     root.destroy()
     return file_path
 
 def main():
     parser = argparse.ArgumentParser(description="AutoPlacer: Automated VLSI Placement Engine")
-    parser.add_argument("--input", type=str, help="Path to input netlist (.v, .sv, or .json)")
+    parser.add_argument("--input", type=str, help="Path to input netlist (.v, .sv, .json, Bookshelf .aux, or a netlist store directory)")
     parser.add_argument("--example", type=str, choices=['systolic', 'soc'], help="Run an industry-standard example")
-    parser.add_argument("--iters", type=int, default=10000, help="Simulated annealing iterations")
+    parser.add_argument("--iters", type=int, help="Simulated annealing move budget (default 10000, or the --effort preset's)")
     parser.add_argument("--partitions", type=int, default=4, help="Number of recursive bisection levels")
+    parser.add_argument("--partitioner", type=str, choices=['fm', 'median'], default='fm', help="Bisection method")
+    parser.add_argument("--congestion-grid", type=int, default=25, help="Bins per side of the RUDY congestion map")
+    parser.add_argument("--net-model", type=str, choices=['star', 'b2b'], default='star', help="Global placement model for high-fanout nets")
+    parser.add_argument("--multilevel", action="store_true", help="Coarsen the netlist before global placement")
+    parser.add_argument("--global", dest="global_engine", type=str, choices=['quadratic', 'eplace'], default='quadratic', help="Global placement engine (eplace adds electrostatic spreading)")
+    parser.add_argument("--solver", type=str, choices=['cg', 'direct'], default='direct', help="Linear solver for global placement")
+    parser.add_argument("--precond", type=str, choices=['jacobi', 'ichol', 'none'], default='jacobi', help="CG preconditioner")
+    parser.add_argument("--schedule", type=str, choices=['adaptive', 'geometric'], default='geometric', help="Annealing cooling schedule")
+    parser.add_argument("--moves", type=str, choices=['mixed', 'random'], help="Annealing move set (default: mixed; random with --batch, which supports only displacements)")
+    parser.add_argument("--batch", type=int, default=0, help="Evaluate annealing moves in vectorized batches of this size (0 = one at a time)")
+    parser.add_argument("--anneal-runs", type=int, default=1, help="Independent annealing runs (best one is kept)")
+    parser.add_argument("--detailed", type=int, help="Window-parallel detailed placement rounds after annealing (default 0, or the --effort preset's)")
+    parser.add_argument("--legalize", action=argparse.BooleanOptionalAction, help="Snap cells to an overlap-free row/site grid after placement (default off, or the --effort preset's)")
+    parser.add_argument("--row-height", type=float, default=0.0, help="Legalization row height (0 = median cell height)")
+    parser.add_argument("--site-width", type=float, default=1.0, help="Legalization site width")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for parallel stages (0 = one per CPU)")
+    parser.add_argument("--cache-dir", type=str, help="Directory caching parsed netlists by file content")
+    parser.add_argument("--cache-size", type=float, default=1024.0, help="Netlist cache size cap in MB (least recently used entries are evicted)")
+    parser.add_argument("--mmap-dir", type=str, help="Keep the netlist arrays in memory-mapped files in this directory")
+    parser.add_argument("--time-budget", type=float, help="Wall-clock budget for the placement flow, in seconds")
+    parser.add_argument("--effort", type=str, choices=['fast', 'balanced', 'quality'], help="Effort preset (explicit --iters, --detailed and --legalize/--no-legalize win)")
+    parser.add_argument("--init", type=str, help="Start from a saved placement (.def, .def.gz, .npz, .jsonl or .json) instead of a random one")
+    parser.add_argument("--gzip", action="store_true", help="Write the output DEF gzip-compressed")
+    parser.add_argument("--json", action="store_true", help="Also write the placement as indented JSON")
+    parser.add_argument("--jsonl", action="store_true", help="Also write the placement as JSON lines")
+    parser.add_argument("--check", type=str, help="Check the legality of a saved placement (.def, .npz, .jsonl or .json) of the input netlist instead of placing")
     parser.add_argument("--no-vis", action="store_true", help="Disable visualization")
     parser.add_argument("--no-gui", action="store_true", help="Disable GUI pop-up for file selection")
 
     args = parser.parse_args()
+    if args.batch > 0 and args.moves == "mixed":
+        parser.error("--batch evaluates displacements only; it cannot be combined with --moves mixed")
 
     # 1. Determine Input
     input_path = args.input
     netlist_data = None
     is_verilog = False
+    is_json = False
+    is_store = False
+    is_bookshelf = False
 
     if not args.example and not args.input and not args.no_gui:
         print("Launching file selection pop-up...")
@@ -47,11 +79,14 @@ def main():
         elif args.example == 'soc':
             netlist_data = create_modern_soc()
     elif input_path:
-        if input_path.endswith(('.v', '.sv')):
+        if is_netlist_store(input_path):
+            is_store = True
+        elif input_path.endswith(('.v', '.sv')):
             is_verilog = True
         elif input_path.endswith('.json'):
-            with open(input_path, 'r') as f:
-                netlist_data = json.load(f)
+            is_json = True
+        elif input_path.endswith('.aux'):
+            is_bookshelf = True
         else:
             print(f"Error: Unsupported file format for {input_path}")
             sys.exit(1)
@@ -61,7 +96,7 @@ def main():
 
     # 2. Get Advanced Parameters via GUI
     user_params = None
-    if not args.no_gui:
+    if not args.no_gui and not args.check:
         print("Opening advanced configuration GUI...")
         user_params = get_user_params(CHIP_W, CHIP_H)
         if not user_params:
@@ -73,29 +108,66 @@ def main():
         chip_w=user_params["chip_w"] if user_params else CHIP_W,
         chip_h=user_params["chip_h"] if user_params else CHIP_H,
         num_partitions=user_params["num_partitions"] if user_params else args.partitions,
-        anneal_iters=user_params["anneal_iters"] if user_params else args.iters,
+        partitioner=args.partitioner,
         blockages=user_params["blockages"] if user_params else [],
         rng_seed=42,
-        visualize=not args.no_vis
+        visualize=not args.no_vis,
+        congestion_grid=args.congestion_grid,
+        net_model=args.net_model,
+        multilevel=args.multilevel,
+        global_engine=args.global_engine,
+        solver=args.solver,
+        solver_precond=args.precond,
+        anneal_schedule=args.schedule,
+        anneal_moves=args.moves or ("random" if args.batch > 0 else "mixed"),
+        anneal_batch=args.batch,
+        anneal_runs=args.anneal_runs,
+        row_height=args.row_height,
+        site_width=args.site_width,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size,
+        mmap_dir=args.mmap_dir,
+        time_budget=args.time_budget,
+        effort=args.effort
     )
     
+    # Values given on the command line or in the GUI win over the effort preset
+    for key, value in (("anneal_iters", user_params["anneal_iters"] if user_params else args.iters),
+                       ("detailed_rounds", args.detailed), ("legalize", args.legalize)):
+        if value is not None:
+            setattr(params, key, value)
+
     engine = PlacementEngine(params)
     
     if is_verilog:
         print(f"Parsing Hardware Description: {input_path}")
         engine.load_verilog(input_path)
+    elif is_json:
+        engine.load_json(input_path)
+    elif is_bookshelf:
+        engine.load_bookshelf(input_path)
+    elif is_store:
+        engine.load_store(input_path)
     else:
         engine.load_netlist(netlist_data)
     
+    if args.check:
+        report = engine.check_placement(*load_placement(args.check))
+        print(f"\n--- Legality of {args.check} ---")
+        for key, value in report.items():
+            print(f"  {key}: {value}")
+        sys.exit(0 if report["legal"] else 1)
+
     # 3. Execution
-    metrics = engine.run()
+    metrics = engine.run(load_placement(args.init)[0] if args.init else None)
     
     # 4. Results Bundling
-    design_name = os.path.splitext(os.path.basename(input_path))[0] if input_path else args.example if args.example else "autoplacer_result"
+    design_name = os.path.splitext(os.path.basename(os.path.normpath(input_path)))[0] if input_path else args.example if args.example else "autoplacer_result"
     results_dir = os.path.join("results", f"{design_name}_placed")
     print(f"\nFinalizing results in '{results_dir}' folder...")
     
-    engine.save_results(results_dir, design_name)
+    engine.save_results(results_dir, design_name, compress=args.gzip, json_output=args.json, jsonl=args.jsonl)
     
     if not args.no_vis:
         engine.visualize(metrics, save_dir=results_dir)
@@ -103,7 +175,7 @@ def main():
     print("\n--- Placement Complete ---")
     print(f"  Final Wirelength: {metrics['wirelength_total']:.2f}")
     if is_verilog:
-        print(f"  Coordinates exported to: {results_dir}/{design_name}.def")
+        print(f"  Coordinates exported to: {results_dir}/{design_name}.def{'.gz' if args.gzip else ''}")
 
 if __name__ == "__main__":
     main()
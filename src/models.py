@@ -1,9 +1,25 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Tuple, Optional
 
 BBox = Tuple[float, float, float, float]
 
+# Settings applied by `PlacementParams.effort`
+EFFORT_PRESETS: Dict[str, Dict[str, object]] = {
+    "fast": {"anneal_iters": 2_000, "anneal_stop_tol": 1e-2, "solver_tol": 1e-3},
+    "balanced": {"anneal_iters": 10_000, "anneal_stop_tol": 1e-3, "solver_tol": 1e-5},
+    "quality": {"anneal_iters": 100_000, "anneal_stop_tol": 1e-4, "anneal_stop_window": 10, "solver_tol": 1e-6,
+                "detailed_rounds": 2, "legalize": True},
+}
+
+# Share of `PlacementParams.time_budget` given to each flow stage, per effort
+# (legalization cannot stop early; its share only reserves time for it)
+STAGE_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "fast": {"global": 0.3, "bisection": 0.1, "anneal": 0.45, "detailed": 0.1, "legalize": 0.05},
+    "balanced": {"global": 0.25, "bisection": 0.1, "anneal": 0.5, "detailed": 0.1, "legalize": 0.05},
+    "quality": {"global": 0.2, "bisection": 0.1, "anneal": 0.5, "detailed": 0.15, "legalize": 0.05},
+}
+
 @dataclass
 class Cell:
     name: str
@@ -24,9 +40,64 @@ class PlacementParams:
     chip_w: float
     chip_h: float
     num_partitions: int = 4
+    partitioner: str = "fm"
     balance_tolerance: float = 0.1
     blockages: List[BBox] = field(default_factory=list)
     keepout: float = 0.0
     anneal_iters: int = 10_000
     rng_seed: int = 42
     visualize: bool = True
+    congestion_grid: int = 25
+    net_model: str = "star"
+    fanout_threshold: int = 16
+    max_net_fanout: int = 1000
+    solver: str = "direct"
+    solver_precond: str = "jacobi"
+    solver_tol: float = 1e-5
+    multilevel: bool = False
+    ml_coarsest: int = 2000
+    global_engine: str = "quadratic"
+    eplace_overflow: float = 0.1
+    eplace_iters: int = 1000
+    anneal_engine: str = "sa"
+    anneal_schedule: str = "geometric"
+    anneal_moves: str = "mixed"
+    anneal_batch: int = 0
+    anneal_target_accept: float = 0.44
+    anneal_stop_window: int = 5
+    anneal_stop_tol: float = 1e-3
+    anneal_runs: int = 1
+    pt_replicas: int = 4
+    pt_swap_interval: int = 100
+    detailed_rounds: int = 0
+    detailed_window_cells: int = 200
+    legalize: bool = False
+    row_height: float = 0.0
+    site_width: float = 1.0
+    workers: int = 0
+    cache_dir: Optional[str] = None
+    cache_size_mb: float = 1024.0
+    mmap_dir: Optional[str] = None
+    time_budget: Optional[float] = None
+    effort: Optional[str] = None
+
+    def __post_init__(self):
+        # The preset fills in only the fields left at their defaults; explicit values win
+        if self.effort is not None:
+            if self.effort not in EFFORT_PRESETS:
+                raise ValueError(f"Unknown effort preset: {self.effort}")
+            defaults = {f.name: f.default for f in fields(self)}
+            for key, value in EFFORT_PRESETS[self.effort].items():
+                if getattr(self, key) == defaults[key]:
+                    setattr(self, key, value)
+
+    def stage_weights(self) -> Dict[str, float]:
+        weights = dict(STAGE_WEIGHTS[self.effort or "balanced"])
+        if self.detailed_rounds <= 0:
+            weights.pop("detailed")
+        if not self.legalize:
+            weights.pop("legalize")
+        if self.global_engine == "eplace":
+            # Bisection is skipped after analytical spreading
+            weights["global"] += weights.pop("bisection")
+        return weights
@@ -0,0 +1,355 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Tuple, Optional, Iterable, Iterator, Mapping, Sequence
+import numpy as np
+
+from models import Cell, Net
+
+
+class NameTable(Sequence[str]):
+    """
+    Packed UTF-8 name storage: one byte buffer plus an offsets array.
+    The name -> id index is built lazily, on the first lookup by name.
+    """
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def empty(cls) -> "NameTable":
+        return cls(np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64))
+
+    @classmethod
+    def from_list(cls, names: Iterable[str]) -> "NameTable":
+        encoded = [n.encode("utf-8") for n in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+        return cls(data, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            a, b, step = i.indices(len(self))
+            if step != 1:
+                return [self[k] for k in range(a, b, step)]
+            # Contiguous range: decode one block of the buffer
+            offs = (self.offsets[a:b + 1] - self.offsets[a]).tolist() if b > a else [0]
+            buf = self.data[self.offsets[a]:self.offsets[a] + offs[-1]].tobytes()
+            return [buf[offs[k]:offs[k + 1]].decode("utf-8") for k in range(len(offs) - 1)]
+        if i < 0: i += len(self)
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        buf = self.data.tobytes()
+        offs = self.offsets.tolist()
+        text = buf.decode("utf-8")
+        if len(text) == len(buf):
+            # Pure ASCII: byte offsets are character offsets
+            return (text[offs[i]:offs[i + 1]] for i in range(len(offs) - 1))
+        return (buf[offs[i]:offs[i + 1]].decode("utf-8") for i in range(len(offs) - 1))
+
+    def __contains__(self, name) -> bool:
+        return name in self.index_map()
+
+    def index_map(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self)}
+        return self._index
+
+    def index(self, name: str) -> int:
+        return self.index_map()[name]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.offsets.nbytes
+
+
+class NameTableBuilder:
+    """Appends names to a growing UTF-8 buffer; `build()` freezes it into a NameTable."""
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def append(self, name: str):
+        self.data += name.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def extend(self, names: Iterable[str]):
+        for name in names:
+            self.append(name)
+
+    def build(self) -> NameTable:
+        return NameTable(np.frombuffer(self.data, dtype=np.uint8).copy(),
+                         np.frombuffer(self.offsets, dtype=np.int64).copy())
+
+
+class Netlist:
+    """
+    Struct-of-arrays netlist.
+
+    Cells are identified by integer ids: geometry, coordinates and the fixed
+    flag live in NumPy arrays indexed by id. Net connectivity is stored
+    CSR-style: the pins of net k are `net_pins[net_offsets[k]:net_offsets[k + 1]]`.
+    Macro (library cell) names are optional: `cell_types[i]` indexes
+    `type_names`, or is -1 when unknown. So are pin offsets from the cell
+    center (`pin_dx`, `pin_dy`, in net_pins order).
+    """
+    def __init__(self, names: NameTable, w: np.ndarray, h: np.ndarray, fixed: np.ndarray,
+                 x: np.ndarray, y: np.ndarray, net_names: NameTable,
+                 net_offsets: np.ndarray, net_pins: np.ndarray,
+                 cell_types: Optional[np.ndarray] = None, type_names: Optional[NameTable] = None,
+                 pin_dx: Optional[np.ndarray] = None, pin_dy: Optional[np.ndarray] = None):
+        self.names = names
+        self.w, self.h = w, h
+        self.fixed = fixed
+        self.x, self.y = x, y
+        self.net_names = net_names
+        self.net_offsets = net_offsets
+        self.net_pins = net_pins
+        self.cell_types = cell_types
+        self.type_names = type_names
+        self.pin_dx, self.pin_dy = pin_dx, pin_dy
+        self._cell_nets: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def num_cells(self) -> int:
+        return len(self.w)
+
+    @property
+    def num_nets(self) -> int:
+        return len(self.net_offsets) - 1
+
+    @property
+    def num_pins(self) -> int:
+        return len(self.net_pins)
+
+    def index(self, name: str) -> int:
+        return self.names.index(name)
+
+    def macros(self, start: int, stop: int, default: str = "CELL") -> List[str]:
+        """Macro names of cells [start, stop); `default` where unknown."""
+        n = max(0, min(stop, self.num_cells) - start)
+        if self.cell_types is None:
+            return [default] * n
+        types = list(self.type_names) + [default]
+        return [types[t] for t in self.cell_types[start:start + n].tolist()]
+
+    def movable(self) -> np.ndarray:
+        return np.flatnonzero(~self.fixed)
+
+    def net_degree(self) -> np.ndarray:
+        return np.diff(self.net_offsets)
+
+    def pin_net(self) -> np.ndarray:
+        """Owning net id of every pin."""
+        return np.repeat(np.arange(self.num_nets, dtype=np.int64), self.net_degree())
+
+    def pin_coords(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Pin positions (cell centers plus the pin offsets, when known), in net_pins order."""
+        p = self.net_pins
+        px, py = self.x[p] + self.w[p] / 2, self.y[p] + self.h[p] / 2
+        if self.pin_dx is not None:
+            px += self.pin_dx
+            py += self.pin_dy
+        return px, py
+
+    def cell_nets(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Transposed incidence in CSR form: the nets of cell i are
+        `nets[offsets[i]:offsets[i + 1]]`. Repeated pins of a net are collapsed.
+        """
+        if self._cell_nets is None:
+            owner = self.pin_net()
+            pairs = np.unique(self.net_pins.astype(np.int64) * max(1, self.num_nets) + owner)
+            cells, nets = np.divmod(pairs, max(1, self.num_nets))
+            offsets = np.zeros(self.num_cells + 1, dtype=np.int64)
+            np.cumsum(np.bincount(cells, minlength=self.num_cells), out=offsets[1:])
+            self._cell_nets = (offsets, nets)
+        return self._cell_nets
+
+    @property
+    def cells(self) -> "CellsView":
+        return CellsView(self)
+
+    @property
+    def nets(self) -> "NetsView":
+        return NetsView(self)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.w, self.h, self.fixed, self.x, self.y, self.net_offsets, self.net_pins)
+        total = sum(a.nbytes for a in arrays) + self.names.nbytes + self.net_names.nbytes
+        if self.cell_types is not None:
+            total += self.cell_types.nbytes + self.type_names.nbytes
+        if self.pin_dx is not None:
+            total += self.pin_dx.nbytes + self.pin_dy.nbytes
+        return total
+
+    @classmethod
+    def from_objects(cls, cells: Mapping[str, Cell], nets: Iterable[Net]) -> "Netlist":
+        """Builds a netlist from the legacy `Dict[str, Cell]` / `List[Net]` form."""
+        b = NetlistBuilder()
+        for name, c in cells.items():
+            b.add_cell(name, c.w, c.h, c.fixed, c.x, c.y)
+        for net in nets:
+            b.add_net(net.name, net.pins)
+        return b.build()
+
+
+class NetlistBuilder:
+    """Accumulates cells and nets into compact buffers, then freezes them into a Netlist."""
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.w, self.h = array("d"), array("d")
+        self.x, self.y = array("d"), array("d")
+        self.fixed = array("b")
+        self.types = array("i")
+        self.type_ids: Dict[str, int] = {}
+        self.net_names: List[str] = []
+        self.net_offsets = array("q", [0])
+        self.net_pins = array("i")
+
+    def add_cell(self, name: str, w: float, h: float, fixed: bool = False,
+                 x: float = 0.0, y: float = 0.0, macro: Optional[str] = None) -> int:
+        t = -1 if macro is None else self.type_ids.setdefault(macro, len(self.type_ids))
+        i = self.ids.get(name)
+        if i is not None:
+            self.w[i], self.h[i], self.fixed[i], self.x[i], self.y[i], self.types[i] = w, h, fixed, x, y, t
+            return i
+        i = self.ids[name] = len(self.names)
+        self.names.append(name)
+        self.w.append(w); self.h.append(h)
+        self.x.append(x); self.y.append(y)
+        self.fixed.append(bool(fixed))
+        self.types.append(t)
+        return i
+
+    def add_net(self, name: str, pins: Iterable[str]):
+        """Adds a net by pin names; pins that name no known cell are dropped."""
+        ids = self.ids
+        self.net_pins.extend(ids[p] for p in pins if p in ids)
+        self.net_offsets.append(len(self.net_pins))
+        self.net_names.append(name)
+
+    def build(self) -> Netlist:
+        return Netlist(
+            NameTable.from_list(self.names),
+            np.frombuffer(self.w, dtype=np.float64).copy(),
+            np.frombuffer(self.h, dtype=np.float64).copy(),
+            np.frombuffer(self.fixed, dtype=np.int8).astype(bool),
+            np.frombuffer(self.x, dtype=np.float64).copy(),
+            np.frombuffer(self.y, dtype=np.float64).copy(),
+            NameTable.from_list(self.net_names),
+            np.frombuffer(self.net_offsets, dtype=np.int64).copy(),
+            np.frombuffer(self.net_pins, dtype=np.int32).copy(),
+            np.frombuffer(self.types, dtype=np.int32).copy() if self.type_ids else None,
+            NameTable.from_list(self.type_ids) if self.type_ids else None,
+        )
+
+
+class CellView:
+    """Live `Cell`-compatible view of one netlist entry; x/y writes go to the arrays."""
+    __slots__ = ("netlist", "idx")
+    region = None
+
+    def __init__(self, netlist: Netlist, idx: int):
+        self.netlist = netlist
+        self.idx = idx
+
+    @property
+    def name(self) -> str:
+        return self.netlist.names[self.idx]
+
+    @property
+    def w(self) -> float:
+        return float(self.netlist.w[self.idx])
+
+    @property
+    def h(self) -> float:
+        return float(self.netlist.h[self.idx])
+
+    @property
+    def fixed(self) -> bool:
+        return bool(self.netlist.fixed[self.idx])
+
+    @property
+    def x(self) -> float:
+        return float(self.netlist.x[self.idx])
+
+    @x.setter
+    def x(self, v: float):
+        self.netlist.x[self.idx] = v
+
+    @property
+    def y(self) -> float:
+        return float(self.netlist.y[self.idx])
+
+    @y.setter
+    def y(self, v: float):
+        self.netlist.y[self.idx] = v
+
+    def to_cell(self) -> Cell:
+        return Cell(name=self.name, w=self.w, h=self.h, fixed=self.fixed, x=self.x, y=self.y)
+
+    def __repr__(self) -> str:
+        return f"CellView(name={self.name!r}, w={self.w}, h={self.h}, fixed={self.fixed}, x={self.x}, y={self.y})"
+
+
+class CellsView(Mapping[str, CellView]):
+    """`Dict[str, Cell]`-compatible mapping over a Netlist."""
+    def __init__(self, netlist: Netlist):
+        self.netlist = netlist
+
+    def __getitem__(self, name: str) -> CellView:
+        return CellView(self.netlist, self.netlist.index(name))
+
+    def __contains__(self, name) -> bool:
+        return name in self.netlist.names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.netlist.names)
+
+    def __len__(self) -> int:
+        return self.netlist.num_cells
+
+    def values(self):
+        return [CellView(self.netlist, i) for i in range(self.netlist.num_cells)]
+
+    def items(self):
+        return list(zip(self.netlist.names, self.values()))
+
+
+class NetsView(Sequence[Net]):
+    """`List[Net]`-compatible sequence over a Netlist; each access builds a Net."""
+    def __init__(self, netlist: Netlist):
+        self.netlist = netlist
+
+    def __len__(self) -> int:
+        return self.netlist.num_nets
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        nl = self.netlist
+        if k < 0: k += len(self)
+        pins = nl.net_pins[nl.net_offsets[k]:nl.net_offsets[k + 1]].tolist()
+        return Net(name=nl.net_names[k], pins=[nl.names[p] for p in pins])
+
+
+def as_netlist(cells: Mapping[str, Cell], nets: Optional[Iterable[Net]] = None) -> Netlist:
+    """
+    Returns the Netlist behind view arguments, or builds one from legacy
+    containers. `nets=None` means the caller only needs the cells.
+    """
+    if isinstance(cells, CellsView):
+        if nets is None or (isinstance(nets, NetsView) and nets.netlist is cells.netlist):
+            return cells.netlist
+    return Netlist.from_objects(cells, nets or [])
@@ -0,0 +1,149 @@
+import os
+from array import array
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+from netlist import Netlist, NameTable
+
+def _lines(file_path: str) -> Iterator[List[str]]:
+    """Token lists of the non-empty lines of a Bookshelf file, without comments and the `UCLA` header."""
+    with open(file_path) as f:
+        for line in f:
+            if "#" in line:
+                line = line[:line.index("#")]
+            toks = line.split()
+            if toks and toks[0] != "UCLA":
+                yield toks
+
+def _aux_files(aux_path: str) -> Dict[str, str]:
+    """Paths of the files listed in an .aux file, by extension."""
+    base = os.path.dirname(aux_path)
+    files = {}
+    for toks in _lines(aux_path):
+        for t in toks[toks.index(":") + 1 if ":" in toks else 1:]:
+            files[os.path.splitext(t)[1].lstrip(".").lower()] = os.path.join(base, t)
+    return files
+
+def _read_scl(file_path: str) -> List[Dict[str, float]]:
+    """
+    Rows of an .scl file: y, height, site width, x origin and site count.
+    The site width is the pitch (Sitespacing); Sitewidth is ignored.
+    """
+    rows = []
+    row: Dict[str, float] = {}
+    for t in _lines(file_path):
+        key = t[0]
+        if key == "CoreRow":
+            row = {"y": 0.0, "height": 0.0, "site": 1.0, "x": 0.0, "sites": 0}
+        elif key == "Coordinate":
+            row["y"] = float(t[2])
+        elif key == "Height":
+            row["height"] = float(t[2])
+        elif key == "Sitespacing":
+            row["site"] = float(t[2])
+        elif key == "SubrowOrigin":
+            row["x"] = float(t[2])
+            if "NumSites" in t:
+                row["sites"] = int(t[t.index("NumSites") + 2])
+        elif key == "End" and row:
+            rows.append(row)
+            row = {}
+    return rows
+
+def read_bookshelf(aux_path: str) -> Tuple[Netlist, Dict[str, Any]]:
+    """
+    Reads a Bookshelf design (.aux listing .nodes, .nets, .pl and .scl).
+    Every file is streamed line by line into array buffers.
+
+    Terminals (.nodes) and /FIXED nodes (.pl) become fixed cells. Pin
+    offsets (.nets, relative to the cell center) are kept per pin. When
+    rows are given (.scl), coordinates are shifted so that the core's
+    lower-left corner is at (0, 0).
+
+    Returns the netlist and the layout: die size, row count, row height,
+    site width and the shifted-out origin.
+    """
+    files = _aux_files(aux_path)
+    for ext in ("nodes", "nets"):
+        if ext not in files:
+            raise ValueError(f"{aux_path} lists no .{ext} file")
+
+    # Nodes
+    ids: Dict[str, int] = {}
+    names: List[str] = []
+    w, h = array("d"), array("d")
+    fixed = array("b")
+    for t in _lines(files["nodes"]):
+        if t[0] in ("NumNodes", "NumTerminals"): continue
+        ids[t[0]] = len(names)
+        names.append(t[0])
+        w.append(float(t[1]))
+        h.append(float(t[2]))
+        fixed.append(len(t) > 3 and t[3].startswith("terminal"))
+    n = len(names)
+
+    # Nets: "NetDegree : k [name]" followed by k pin lines "cell dir [: dx dy]"
+    net_names: List[str] = []
+    net_offsets = array("q", [0])
+    pins = array("i")
+    dx, dy = array("d"), array("d")
+    for t in _lines(files["nets"]):
+        key = t[0]
+        if key == "NetDegree":
+            if net_names:
+                net_offsets.append(len(pins))
+            net_names.append(t[3] if len(t) > 3 else f"net_{len(net_names)}")
+        elif key in ("NumNets", "NumPins"):
+            continue
+        else:
+            i = ids.get(key)
+            if i is None: continue
+            pins.append(i)
+            if len(t) > 4:
+                dx.append(float(t[3]))
+                dy.append(float(t[4]))
+            else:
+                dx.append(0.0)
+                dy.append(0.0)
+    if net_names:
+        net_offsets.append(len(pins))
+
+    # Placement
+    x, y = np.zeros(n), np.zeros(n)
+    fixed_arr = np.frombuffer(fixed, dtype=np.int8).astype(bool)
+    if "pl" in files:
+        placed, px, py = array("q"), array("d"), array("d")
+        pinned = array("q")
+        for t in _lines(files["pl"]):
+            i = ids.get(t[0])
+            if i is None or len(t) < 3: continue
+            placed.append(i)
+            px.append(float(t[1]))
+            py.append(float(t[2]))
+            if "/FIXED" in t or "/FIXED_NI" in t:
+                pinned.append(i)
+        placed = np.frombuffer(placed, dtype=np.int64)
+        x[placed], y[placed] = np.frombuffer(px), np.frombuffer(py)
+        fixed_arr[np.frombuffer(pinned, dtype=np.int64)] = True
+    del ids
+
+    # Rows
+    w_arr, h_arr = np.frombuffer(w, dtype=np.float64).copy(), np.frombuffer(h, dtype=np.float64).copy()
+    rows = _read_scl(files["scl"]) if "scl" in files else []
+    if rows:
+        x0 = min(r["x"] for r in rows)
+        y0 = min(r["y"] for r in rows)
+        die = (max(r["x"] + r["sites"] * r["site"] for r in rows) - x0, max(r["y"] + r["height"] for r in rows) - y0)
+        x -= x0
+        y -= y0
+        row_height, site_width = rows[0]["height"], rows[0]["site"]
+    else:
+        x0 = y0 = 0.0
+        die = (float(np.max(x + w_arr, initial=0.0)), float(np.max(y + h_arr, initial=0.0)))
+        row_height, site_width = 0.0, 1.0
+
+    nl = Netlist(NameTable.from_list(names), w_arr, h_arr, fixed_arr, x, y,
+                 NameTable.from_list(net_names), np.frombuffer(net_offsets, dtype=np.int64).copy(),
+                 np.frombuffer(pins, dtype=np.int32).copy(),
+                 pin_dx=np.frombuffer(dx, dtype=np.float64).copy(), pin_dy=np.frombuffer(dy, dtype=np.float64).copy())
+    layout = {"die": die, "rows": len(rows), "row_height": row_height, "site_width": site_width, "origin": (x0, y0)}
+    return nl, layout
@@ -0,0 +1,81 @@
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils.fileio import open_text
+
+# Characters read per chunk
+CHUNK_SIZE = 1 << 22
+# - name macro ... + PLACED|FIXED|COVER ( x y ) ... ;  (unplaced components do not match)
+COMPONENT = re.compile(r"-\s+(\S+)\s+\S+[^;]*?\+\s*(?:PLACED|FIXED|COVER)\s*\(\s*(\S+)\s+(\S+)\s*\)[^;]*;")
+END_COMPONENTS = re.compile(r"\bEND\s+COMPONENTS\b")
+
+class _Reader:
+    """A DEF text stream read in chunks, statement by statement; `rest()` is the text read but not yet consumed."""
+    def __init__(self, f):
+        self.f = f
+        self.text, self.pos = "", 0
+
+    def statements(self) -> Iterator[List[str]]:
+        """`;`-terminated statements of whitespace-separated tokens."""
+        while True:
+            i = self.text.find(";", self.pos)
+            if i < 0:
+                chunk = self.f.read(CHUNK_SIZE)
+                self.text, self.pos = self.text[self.pos:] + chunk, 0
+                if chunk: continue
+                tokens = self.text.split()
+                self.text = ""
+                if tokens:
+                    yield tokens
+                return
+            tokens = self.text[self.pos:i].split()
+            self.pos = i + 1
+            yield tokens
+
+    def rest(self) -> str:
+        return self.text[self.pos:]
+
+def _components(f, rest: str, coords: Dict[str, Tuple[float, float]]):
+    """
+    Reads the COMPONENTS section body up to `END COMPONENTS`, starting with
+    the already read text `rest`, in chunks cut after the last `;`.
+    """
+    carry = rest
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        text = carry + chunk
+        # A plain substring scan first; the regex only confirms the keyword
+        i = text.find("COMPONENTS")
+        end = END_COMPONENTS.search(text, max(0, i - 64)) if i >= 0 else None
+        if end:
+            text = text[:end.start()]
+        elif chunk:
+            cut = text.rfind(";") + 1
+            text, carry = text[:cut], text[cut:]
+        coords.update((name, (float(x), float(y))) for name, x, y in COMPONENT.findall(text))
+        if end or not chunk:
+            return
+
+def read_def_placement(file_path: str) -> Tuple[Dict[str, Tuple[float, float]], Optional[Tuple[float, float, float, float]]]:
+    """
+    Reads component locations and the die area from a DEF file (gzipped if
+    the name ends with `.gz`), as written by `write_def`. Coordinates are
+    returned as stored. The file is read in chunks: the header statement by
+    statement, then, from the text after `COMPONENTS n ;` on, the components
+    section with one regex pass per chunk. Reading stops at its end.
+    Returns ({name: (x, y)} of placed and fixed components, (x0, y0, x1, y1)
+    or None).
+    """
+    coords: Dict[str, Tuple[float, float]] = {}
+    die = None
+    with open_text(file_path) as f:
+        reader = _Reader(f)
+        for st in reader.statements():
+            if not st: continue
+            if st[0] == "DIEAREA":
+                nums = [float(t) for t in st if t not in ("DIEAREA", "(", ")")]
+                xs, ys = nums[0::2], nums[1::2]
+                die = (min(xs), min(ys), max(xs), max(ys))
+            elif st[0] == "COMPONENTS":
+                _components(f, reader.rest(), coords)
+                break
+    return coords, die
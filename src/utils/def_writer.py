@@ -1,27 +1,41 @@
-from typing import Dict, List
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
 from models import Cell
+from netlist import Netlist, as_netlist
+from utils.fileio import open_text
 
-def write_def(cells: Dict[str, Cell], chip_w: float, chip_h: float, file_path: str, design_name: str = "top"):
+# Components formatted per write
+DEF_CHUNK = 1 << 16
+COMPONENT = "    - {} {} + {} ( {} {} ) N ;\n"
+
+def write_def(cells: Union[Netlist, Dict[str, Cell]], chip_w: float, chip_h: float, file_path: str,
+              design_name: str = "top", compress: Optional[bool] = None, origin: Tuple[float, float] = (0.0, 0.0)):
     """
-    Writes placement results to a standardized .def file.
+    Writes placement results to a standardized .def file. Every cell is a
+    component with its macro name (`CELL` when unknown), PLACED or FIXED.
+    Components are formatted from the netlist arrays DEF_CHUNK at a time,
+    one write per chunk. `compress` (default: name ends with `.gz`) gzips it.
+    `origin` is added to every coordinate, including the die area.
     """
-    with open(file_path, 'w') as f:
+    nl = cells if isinstance(cells, Netlist) else as_netlist(cells)
+    with open_text(file_path, "w", compress) as f:
         f.write(f"VERSION 5.8 ;\n")
         f.write(f"DIVIDERCHAR \"/\" ;\n")
         f.write(f"BUSBITCHARS \"[]\" ;\n")
         f.write(f"DESIGN {design_name} ;\n")
         f.write(f"UNITS DISTANCE MICRONS 1000 ;\n\n")
         
-        f.write(f"DIEAREA ( 0 0 ) ( {int(chip_w)} {int(chip_h)} ) ;\n\n")
+        ox, oy = origin
+        f.write(f"DIEAREA ( {int(ox)} {int(oy)} ) ( {int(ox + chip_w)} {int(oy + chip_h)} ) ;\n\n")
         
-        # Components section
-        num_movable = sum(1 for c in cells.values() if not c.fixed)
-        f.write(f"COMPONENTS {num_movable} ;\n")
-        for name, cell in cells.items():
-            if not cell.fixed:
-                # Format: - inst_name mod_name + PLACED ( x y ) N ;
-                # Since we don't track original mod_name in Cell, we use "CELL" as placeholder
-                f.write(f"    - {name} CELL + PLACED ( {int(cell.x)} {int(cell.y)} ) N ;\n")
+        # Components section: - inst_name macro_name + PLACED|FIXED ( x y ) N ;
+        f.write(f"COMPONENTS {nl.num_cells} ;\n")
+        status = np.array(["PLACED", "FIXED"])
+        for s in range(0, nl.num_cells, DEF_CHUNK):
+            e = min(s + DEF_CHUNK, nl.num_cells)
+            f.write("".join(map(COMPONENT.format, nl.names[s:e], nl.macros(s, e),
+                                status[nl.fixed[s:e].astype(np.int64)].tolist(),
+                                (nl.x[s:e] + ox).astype(np.int64).tolist(), (nl.y[s:e] + oy).astype(np.int64).tolist())))
         f.write(f"END COMPONENTS\n\n")
         
         f.write(f"END DESIGN\n")
@@ -0,0 +1,13 @@
+import gzip
+from typing import Optional
+
+# gzip level of compressed output (speed over ratio)
+GZIP_LEVEL = 1
+
+def open_text(file_path: str, mode: str = "r", compress: Optional[bool] = None):
+    """Opens a text file, gzip-compressed if `compress` (default: if the name ends with `.gz`)."""
+    if compress is None:
+        compress = file_path.endswith(".gz")
+    if not compress:
+        return open(file_path, mode)
+    return gzip.open(file_path, mode + "t", compresslevel=GZIP_LEVEL)
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import zipfile
+from typing import Callable, Optional, Tuple
+import numpy as np
+from netlist import Netlist
+from utils.netlist_store import netlist_arrays, netlist_from_arrays
+
+# Version of the cache file layout; part of every key
+CACHE_FORMAT = 2
+# Default size cap of a cache directory, in MB
+DEFAULT_CACHE_MB = 1024.0
+# Bytes hashed per read
+HASH_CHUNK = 1 << 22
+
+def save_netlist(nl: Netlist, path: str):
+    """Writes the netlist arrays to an uncompressed `.npz` file."""
+    with open(path, "wb") as f:
+        np.savez(f, **netlist_arrays(nl))
+
+def load_netlist(path: str) -> Netlist:
+    """Reads a netlist written by `save_netlist`."""
+    with np.load(path) as z:
+        return netlist_from_arrays(z)
+
+def source_key(file_path: str, parser_version: str) -> str:
+    """Cache key of a source file: SHA-256 of its content, the parser version and the cache format."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    digest.update(f"\0{parser_version}\0{CACHE_FORMAT}".encode())
+    return digest.hexdigest()
+
+class NetlistCache:
+    """
+    Directory of parsed netlists keyed by `source_key`. Reading an entry
+    marks it as recently used (its mtime); after every store the least
+    recently used entries are deleted until the directory is under `max_mb`.
+    """
+    def __init__(self, cache_dir: str, max_mb: float = DEFAULT_CACHE_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * (1 << 20))
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Netlist]:
+        path = self.path(key)
+        try:
+            nl = load_netlist(path)
+        except OSError:
+            return None
+        except (KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            # A corrupt entry is a miss; it is dropped so the next put() rewrites it
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        os.utime(path)
+        return nl
+
+    def put(self, key: str, nl: Netlist):
+        # Written under a temporary name, so readers never see a partial entry
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        save_netlist(nl, tmp)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+
+    def evict(self, keep: Optional[str] = None):
+        """Deletes least recently used entries (never `keep`) while the cache is over its size cap."""
+        entries = []
+        for e in os.scandir(self.cache_dir):
+            if e.name.endswith(".npz") and e.is_file():
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes: break
+            if path == keep: continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def load(self, file_path: str, parse: Callable[[str], Netlist], parser_version: str) -> Tuple[Netlist, bool]:
+        """The netlist of `file_path` from the cache, or parsed and stored. Returns (netlist, cache hit)."""
+        key = source_key(file_path, parser_version)
+        nl = self.get(key)
+        if nl is not None:
+            return nl, True
+        nl = parse(file_path)
+        self.put(key, nl)
+        return nl, False
@@ -0,0 +1,67 @@
+import os
+from typing import Dict
+import numpy as np
+from netlist import Netlist, NameTable
+
+# Arrays of a stored netlist; coordinates are the only ones written during placement
+FIELDS = ("names_data", "names_offsets", "w", "h", "fixed", "x", "y",
+          "net_names_data", "net_names_offsets", "net_offsets", "net_pins")
+# Present when the netlist has macro names
+TYPE_FIELDS = ("cell_types", "type_names_data", "type_names_offsets")
+# Present when the netlist has pin offsets
+PIN_FIELDS = ("pin_dx", "pin_dy")
+COORDS = ("x", "y")
+
+def netlist_arrays(nl: Netlist) -> Dict[str, np.ndarray]:
+    """The arrays that make up a netlist, by field name."""
+    arrays = {"names_data": nl.names.data, "names_offsets": nl.names.offsets,
+              "w": nl.w, "h": nl.h, "fixed": nl.fixed, "x": nl.x, "y": nl.y,
+              "net_names_data": nl.net_names.data, "net_names_offsets": nl.net_names.offsets,
+              "net_offsets": nl.net_offsets, "net_pins": nl.net_pins}
+    if nl.cell_types is not None:
+        arrays.update(cell_types=nl.cell_types, type_names_data=nl.type_names.data,
+                      type_names_offsets=nl.type_names.offsets)
+    if nl.pin_dx is not None:
+        arrays.update(pin_dx=nl.pin_dx, pin_dy=nl.pin_dy)
+    return arrays
+
+def netlist_from_arrays(a) -> Netlist:
+    """Inverse of `netlist_arrays`; `a` is any field name -> array mapping."""
+    typed = "cell_types" in a
+    return Netlist(NameTable(a["names_data"], a["names_offsets"]), a["w"], a["h"], a["fixed"],
+                   a["x"], a["y"], NameTable(a["net_names_data"], a["net_names_offsets"]),
+                   a["net_offsets"], a["net_pins"],
+                   a["cell_types"] if typed else None,
+                   NameTable(a["type_names_data"], a["type_names_offsets"]) if typed else None,
+                   a["pin_dx"] if "pin_dx" in a else None, a["pin_dy"] if "pin_dy" in a else None)
+
+def is_netlist_store(path: str) -> bool:
+    return os.path.isdir(path) and all(os.path.exists(os.path.join(path, f"{k}.npy")) for k in FIELDS)
+
+def save_netlist_store(nl: Netlist, path: str):
+    """Writes the netlist as one `.npy` file per array into the directory `path`."""
+    os.makedirs(path, exist_ok=True)
+    arrays = netlist_arrays(nl)
+    for key, a in arrays.items():
+        np.save(os.path.join(path, f"{key}.npy"), np.ascontiguousarray(a))
+    for key in TYPE_FIELDS + PIN_FIELDS:
+        stale = os.path.join(path, f"{key}.npy")
+        if key not in arrays and os.path.exists(stale):
+            os.remove(stale)
+
+def _map(path: str, mode: str) -> np.ndarray:
+    a = np.load(path, mmap_mode=mode)
+    # Empty arrays cannot be mapped; plain ndarray views keep the mapping alive
+    return np.asarray(a) if a.size else np.load(path)
+
+def open_netlist_store(path: str, writable: bool = True) -> Netlist:
+    """
+    Opens a store written by `save_netlist_store` with every array memory
+    mapped, so the OS pages the design in and out on demand. Geometry and
+    connectivity are read-only. Coordinate updates are written back to the
+    store, or kept private (copy-on-write) when `writable` is False.
+    """
+    keys = FIELDS + tuple(k for k in TYPE_FIELDS + PIN_FIELDS if os.path.exists(os.path.join(path, f"{k}.npy")))
+    return netlist_from_arrays({key: _map(os.path.join(path, f"{key}.npy"),
+                                          ("r+" if writable else "c") if key in COORDS else "r")
+                                for key in keys})
@@ -1,27 +1,69 @@
+import json
 import random
-from typing import Dict, List, Tuple, Optional
-from models import Cell, Net
+from typing import Dict, Tuple, Optional
+import numpy as np
+from netlist import Netlist, NetlistBuilder
+from utils.def_reader import read_def_placement
+from utils.placement_io import read_placement_npz, read_placement_jsonl
 
-def parse_netlist(netlist_dict: Dict) -> Tuple[Dict[str, Cell], List[Net]]:
-    cells = {}
+# Bumped whenever the produced netlist changes (invalidates cached netlists)
+PARSER_VERSION = "json-2"
+# Cells initialized per block
+INIT_CHUNK = 1 << 18
+
+def parse_netlist(netlist_dict: Dict) -> Netlist:
+    b = NetlistBuilder()
     for name, attr in netlist_dict["cells"].items():
-        cells[name] = Cell(name=name, w=attr["w"], h=attr["h"], 
-                          fixed=attr.get("fixed", False),
-                          x=attr.get("x", 0.0), y=attr.get("y", 0.0))
-    
-    nets = []
+        b.add_cell(name, attr["w"], attr["h"],
+                   fixed=attr.get("fixed", False),
+                   x=attr.get("x", 0.0), y=attr.get("y", 0.0), macro=attr.get("macro"))
+
     for i, n_attr in enumerate(netlist_dict["nets"]):
-        nets.append(Net(name=f"net_{i}", pins=n_attr["pins"]))
-    
-    return cells, nets
+        b.add_net(f"net_{i}", n_attr["pins"])
+
+    return b.build()
 
-def init_placement(cells: Dict[str, Cell], chip_w: float, chip_h: float, 
+def parse_netlist_file(file_path: str) -> Netlist:
+    """Parses a JSON netlist file (the `parse_netlist` dictionary format)."""
+    with open(file_path) as f:
+        return parse_netlist(json.load(f))
+
+def init_placement(netlist: Netlist, chip_w: float, chip_h: float,
                   init_coords: Optional[Dict[str, Tuple[float, float]]], rng: random.Random):
-    for name, cell in cells.items():
-        if cell.fixed:
-            continue
-        if init_coords and name in init_coords:
-            cell.x, cell.y = init_coords[name]
-        else:
-            cell.x = rng.uniform(0, chip_w - cell.w)
-            cell.y = rng.uniform(0, chip_h - cell.h)
+    """
+    Movable cells named in `init_coords` start there. The others get uniform
+    random positions, two draws per cell in cell order, in blocks of
+    INIT_CHUNK cells so large (memory-mapped) netlists are not materialized.
+    """
+    mov = netlist.movable()
+    if init_coords:
+        index = netlist.names.index_map()
+        given = np.zeros(netlist.num_cells, dtype=bool)
+        for name, (x, y) in init_coords.items():
+            i = index.get(name)
+            if i is not None and not netlist.fixed[i]:
+                netlist.x[i], netlist.y[i] = x, y
+                given[i] = True
+        mov = mov[~given[mov]]
+    for s in range(0, len(mov), INIT_CHUNK):
+        ids = mov[s:s + INIT_CHUNK]
+        # rng.uniform(0, b) == b * rng.random()
+        r = np.fromiter((rng.random() for _ in range(2 * len(ids))), dtype=np.float64, count=2 * len(ids))
+        netlist.x[ids] = (chip_w - netlist.w[ids]) * r[0::2]
+        netlist.y[ids] = (chip_h - netlist.h[ids]) * r[1::2]
+
+def load_placement(file_path: str) -> Tuple[Dict[str, Tuple[float, float]], Optional[Tuple[float, float, float, float]]]:
+    """
+    Reads a saved placement: `.def` or `.def.gz`, or the `_placement.npz`,
+    `.jsonl` or `.json` written by `PlacementEngine.save_results`.
+    Returns ({name: (x, y)}, die area or None).
+    """
+    if file_path.endswith((".def", ".def.gz")):
+        return read_def_placement(file_path)
+    if file_path.endswith(".npz"):
+        return read_placement_npz(file_path), None
+    if file_path.endswith((".jsonl", ".jsonl.gz")):
+        return read_placement_jsonl(file_path), None
+    with open(file_path) as f:
+        data = json.load(f)
+    return {name: (c["x"], c["y"]) for name, c in data.items()}, None
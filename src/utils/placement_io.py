@@ -0,0 +1,50 @@
+import json
+from typing import Dict, Optional, Tuple
+import numpy as np
+from netlist import Netlist, NameTable
+from utils.fileio import open_text
+
+# DEF orientations; placements store the index
+ORIENTATIONS = ("N", "S", "W", "E", "FN", "FS", "FW", "FE")
+# Cells formatted per write of the JSON-lines output
+JSONL_CHUNK = 1 << 16
+
+def save_placement_npz(nl: Netlist, path: str, origin: Tuple[float, float] = (0.0, 0.0)):
+    """
+    Columnar placement: the packed cell names once, then x, y (plus
+    `origin`), orientation (index into ORIENTATIONS) and fixed arrays, in
+    one uncompressed `.npz`.
+    """
+    with open(path, "wb") as f:
+        np.savez(f, names_data=nl.names.data, names_offsets=nl.names.offsets,
+                 x=nl.x + origin[0], y=nl.y + origin[1], orient=np.zeros(nl.num_cells, dtype=np.uint8), fixed=nl.fixed)
+
+def write_placement_jsonl(nl: Netlist, path: str, compress: Optional[bool] = None,
+                          origin: Tuple[float, float] = (0.0, 0.0)):
+    """
+    One JSON object per line: {"name", "x", "y", "orient", "fixed"}, with
+    `origin` added to x and y; gzipped if `compress` or `.gz`.
+    """
+    with open_text(path, "w", compress) as f:
+        for s in range(0, nl.num_cells, JSONL_CHUNK):
+            e = min(s + JSONL_CHUNK, nl.num_cells)
+            names = [json.dumps(n) for n in nl.names[s:e]]
+            f.write("".join(f'{{"name": {n}, "x": {x!r}, "y": {y!r}, "orient": "N", "fixed": {"true" if fx else "false"}}}\n'
+                            for n, x, y, fx in zip(names, (nl.x[s:e] + origin[0]).tolist(), (nl.y[s:e] + origin[1]).tolist(),
+                                                   nl.fixed[s:e].tolist())))
+
+def read_placement_npz(path: str) -> Dict[str, Tuple[float, float]]:
+    """{name: (x, y)} of a placement written by `save_placement_npz`."""
+    with np.load(path) as z:
+        names = NameTable(z["names_data"], z["names_offsets"])
+        return dict(zip(names, zip(z["x"].tolist(), z["y"].tolist())))
+
+def read_placement_jsonl(path: str) -> Dict[str, Tuple[float, float]]:
+    """{name: (x, y)} of a placement written by `write_placement_jsonl`, streamed line by line."""
+    coords: Dict[str, Tuple[float, float]] = {}
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                c = json.loads(line)
+                coords[c["name"]] = (c["x"], c["y"])
+    return coords
@@ -1,6 +1,8 @@
 import random
 from typing import Dict, List, Tuple
+import numpy as np
 from models import Cell
+from netlist import as_netlist
 
 CHIP_W, CHIP_H = 2000, 2000
 
@@ -50,10 +52,11 @@ def create_cpu_like_blockages(cells: Dict[str, Cell], rng_seed: int = 42) -> Lis
         (0, CHIP_H / 2 - cross_thick / 2, CHIP_W, CHIP_H / 2 + cross_thick / 2)
     ]
 
+    nl = as_netlist(cells)
+    f = nl.fixed
+    fx, fy, fw, fh = nl.x[f], nl.y[f], nl.w[f], nl.h[f]
+
     def overlaps_fixed(x0, y0, x1, y1):
-        return any(
-            c.fixed and x1 > c.x and x0 < c.x + c.w and y1 > c.y and y0 < c.y + c.h
-            for c in cells.values()
-        )
+        return bool(np.any((x1 > fx) & (x0 < fx + fw) & (y1 > fy) & (y0 < fy + fh)))
 
     return [b for b in blockages if not overlaps_fixed(*b)]
@@ -0,0 +1,82 @@
+import os
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+import numpy as np
+from netlist import Netlist, NameTable
+
+ALIGN = 64
+
+Layout = List[Tuple[str, str, Tuple[int, ...], int]]
+
+class SharedArrays:
+    """
+    Named NumPy arrays packed into one shared-memory block, so worker
+    processes can map them instead of receiving pickled copies.
+
+    The owner creates the block from a dict of arrays; workers call
+    `attach(spec)` with the small picklable `spec`. The owner must call
+    `close()` (which also unlinks the block) when all workers are done.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        layout: Layout = []
+        size = 0
+        for key, a in arrays.items():
+            a = np.asarray(a)
+            layout.append((key, a.dtype.str, a.shape, size))
+            size += -(-a.nbytes // ALIGN) * ALIGN
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.spec = (self._shm.name, layout)
+        self.arrays = _views(self._shm, layout)
+        for key, a in arrays.items():
+            self.arrays[key][...] = a
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+    def close(self):
+        self.arrays = {}
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def attach(spec) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+        """Maps an existing block; keep the returned handle alive while the arrays are in use."""
+        name, layout = spec
+        shm = shared_memory.SharedMemory(name=name)
+        return shm, _views(shm, layout)
+
+def _views(shm: shared_memory.SharedMemory, layout: Layout) -> Dict[str, np.ndarray]:
+    return {key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for key, dtype, shape, offset in layout}
+
+# --- Process-pool helpers ----------------------------------------------------
+
+def derive_seeds(seed: int, runs: int) -> List[int]:
+    """Independent per-run seeds; they depend only on `seed` and the run index."""
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(runs)]
+
+def resolve_workers(workers: int, tasks: int) -> int:
+    """`workers <= 0` means one per CPU; never more than there are tasks."""
+    return max(1, min(tasks, workers if workers > 0 else os.cpu_count() or 1))
+
+def shared_netlist(nl: Netlist) -> Dict[str, np.ndarray]:
+    """Arrays a worker needs to rebuild `nl` without names, pin offsets included (see `worker_netlist`)."""
+    arrays = {"w": nl.w, "h": nl.h, "fixed": nl.fixed, "x": nl.x, "y": nl.y,
+              "net_offsets": nl.net_offsets, "net_pins": nl.net_pins}
+    if nl.pin_dx is not None:
+        arrays.update(pin_dx=nl.pin_dx, pin_dy=nl.pin_dy)
+    return arrays
+
+def worker_netlist(arrays: Dict[str, np.ndarray], copy_coords: bool = True) -> Netlist:
+    """Nameless netlist over shared arrays, by default with private copies of the coordinates."""
+    no_names = NameTable.empty()
+    x, y = (arrays["x"].copy(), arrays["y"].copy()) if copy_coords else (arrays["x"], arrays["y"])
+    return Netlist(no_names, arrays["w"], arrays["h"], arrays["fixed"], x, y, no_names,
+                   arrays["net_offsets"], arrays["net_pins"],
+                   pin_dx=arrays.get("pin_dx"), pin_dy=arrays.get("pin_dy"))
@@ -0,0 +1,41 @@
+import time
+from typing import Dict, Optional
+
+def expired(deadline: Optional[float]) -> bool:
+    """True once `deadline` (a `time.monotonic()` value, or None for no limit) has passed."""
+    return deadline is not None and time.monotonic() >= deadline
+
+class TimeBudget:
+    """
+    Splits a wall-clock budget across named stages by weight. Each stage's
+    slice is taken from what is left when it starts, so time a stage does
+    not use rolls over to the following ones.
+    """
+    def __init__(self, seconds: Optional[float], weights: Dict[str, float]):
+        self.seconds = seconds
+        self.start = time.monotonic()
+        self.pending = dict(weights)
+        self.elapsed: Dict[str, float] = {}
+        self._current = None
+
+    def stage(self, name: str) -> Optional[float]:
+        """Starts stage `name` and returns its deadline (None without a budget)."""
+        self._finish()
+        self._current = (name, time.monotonic())
+        weight = self.pending.pop(name, 0.0)
+        if self.seconds is None:
+            return None
+        remaining = max(0.0, self.seconds - (time.monotonic() - self.start))
+        share = weight / (weight + sum(self.pending.values()) or 1.0)
+        return time.monotonic() + remaining * share
+
+    def done(self) -> Dict[str, float]:
+        """Ends the current stage and returns the seconds spent per stage."""
+        self._finish()
+        return dict(self.elapsed)
+
+    def _finish(self):
+        if self._current:
+            name, t0 = self._current
+            self.elapsed[name] = time.monotonic() - t0
+            self._current = None
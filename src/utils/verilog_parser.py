@@ -1,60 +1,509 @@
 import re
-from typing import Dict, List, Tuple
-from models import Cell, Net
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from netlist import Netlist, NameTable, NameTableBuilder
 
-def parse_verilog_netlist(file_path: str) -> Tuple[Dict[str, Cell], List[Net]]:
+# Bumped whenever the produced netlist changes (invalidates cached netlists)
+PARSER_VERSION = "verilog-3"
+# Characters read per chunk
+CHUNK_SIZE = 1 << 20
+# Footprints of instances and of top-level port pads
+INSTANCE_SIZE = 50.0
+PAD_SIZE = 30.0
+# Macro name of top-level port pads
+PAD_MACRO = "PAD"
+
+# Directives, comments, attributes and strings are single tokens; a block
+# comment or attribute cut off by the end of a chunk matches to the end
+TOKEN = re.compile(r"`[^\n]*|//[^\n]*|/\*(?:.*?\*/|.*)|\(\*(?!\))(?:.*?\*\)|.*)|\"(?:[^\"\\\n]|\\.)*\"?|\\\S+|[\w$']+|\S", re.S)
+
+NET_TYPES = {"wire", "reg", "logic", "tri", "tri0", "tri1", "wand", "wor", "uwire", "supply0", "supply1", "trireg"}
+DIRECTIONS = {"input", "output", "inout"}
+MODIFIERS = NET_TYPES | {"signed", "unsigned", "var"}
+# Statements that cannot be instances
+SKIPPED = {"parameter", "localparam", "defparam", "genvar", "integer", "real", "time", "realtime", "specparam",
+           "timeunit", "timeprecision", "import", "function", "task", "return", "always", "always_comb",
+           "always_ff", "always_latch", "initial", "final", "if", "for", "case", "while", "forever", "repeat",
+           "wait", "disable", "force", "release", "typedef", "struct", "enum"}
+# Keywords not terminated by `;`
+BLOCK_WORDS = {"endmodule", "begin", "end", "else", "generate", "endgenerate", "endcase", "endfunction",
+               "endtask", "specify", "endspecify", "fork", "join", "endprimitive", "endtable", "table"}
+
+def _tokens(f, chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
     """
-    Primitive structural Verilog/SystemVerilog parser.
-    Extracts instances as cells and wires as nets.
+    Streams token lists from an open file, one chunk at a time. Each chunk
+    is cut after its last newline (no token but a block comment or an
+    attribute spans lines); an unterminated one is carried over as well.
     """
-    with open(file_path, 'r') as f:
-        content = f.read()
+    carry = ""
+    while True:
+        chunk = f.read(chunk_size)
+        text = carry + chunk
+        if not chunk:
+            yield TOKEN.findall(text)
+            return
+        cut = text.rfind("\n") + 1
+        if not cut:
+            carry = text
+            continue
+        text, carry = text[:cut], text[cut:]
+        toks = TOKEN.findall(text)
+        if toks:
+            last = toks[-1]
+            if (last[:2] == "/*" and (len(last) < 4 or last[-2:] != "*/")) or \
+               (last[:2] == "(*" and (len(last) < 4 or last[-2:] != "*)")):
+                toks.pop()
+                carry = text[len(text) - len(last):] + carry
+        yield toks
 
-    # Remove comments
-    content = re.sub(r'//.*', '', content)
-    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+def _statements(f) -> Iterator[List[str]]:
+    """`;`-terminated statements (and standalone block keywords) without comments and attributes."""
+    st: List[str] = []
+    for toks in _tokens(f):
+        for t in toks:
+            c = t[0]
+            if c == ";":
+                yield st
+                st = []
+            elif c == "/" and t[:2] in ("//", "/*") or c == "(" and t[:2] == "(*" or c == "`":
+                continue
+            elif not st and t in BLOCK_WORDS:
+                yield [t]
+            else:
+                st.append(t)
+    if st:
+        yield st
 
-    cells = {}
-    nets_dict = {} # wire_name -> list of cell_names
+def _name(tok: str) -> str:
+    """Identifier text; escaped identifiers drop their leading backslash."""
+    return tok[1:] if tok[0] == "\\" else tok
 
-    # 1. Look for instances: module_name instance_name (.pin(wire), ...)
-    # This regex is a simplification but often works for structural netlists
-    instance_pattern = r'(\w+)\s+(\w+)\s*\((.*?)\);'
-    instances = re.findall(instance_pattern, content, re.DOTALL)
+def _int(tok: str) -> Optional[int]:
+    try:
+        return int(tok.replace("_", ""))
+    except ValueError:
+        return None
 
-    for mod_name, inst_name, ports_str in instances:
-        # Ignore common keywords that might match this pattern if not careful
-        if mod_name in ['module', 'endmodule', 'wire', 'reg', 'input', 'output']:
-            continue
-            
-        # Default size if not known
-        cells[inst_name] = Cell(name=inst_name, w=50, h=50)
-
-        # Parse ports: .pin(wire)
-        port_matches = re.findall(r'\.\w+\s*\(\s*(\w+)\s*\)', ports_str)
-        for wire in port_matches:
-            if wire not in nets_dict:
-                nets_dict[wire] = []
-            nets_dict[wire].append(inst_name)
-
-    # 2. Look for inputs/outputs as fixed pads
-    port_pattern = r'(input|output)\s+(?:wire\s+|reg\s+)?(\w+)'
-    ports = re.findall(port_pattern, content)
-    
-    for p_type, p_name in ports:
-        # Create a fixed "pad" cell for each top-level port
-        pad_name = f"PAD_{p_name}"
-        cells[pad_name] = Cell(name=pad_name, w=30, h=30, fixed=True)
-        
-        # Connect to the wire of the same name
-        if p_name not in nets_dict:
-            nets_dict[p_name] = []
-        nets_dict[p_name].append(pad_name)
-
-    # Convert nets_dict to List[Net]
-    nets = []
-    for wire_name, connected_cells in nets_dict.items():
-        if len(connected_cells) > 1:
-            nets.append(Net(name=wire_name, pins=list(set(connected_cells))))
-
-    return cells, nets
+def _width(tok: str) -> int:
+    """Bit count of a sized constant such as 4'b1010 (1 if unsized)."""
+    size, sep, _ = tok.partition("'")
+    return int(size) if sep and size.isdigit() else 1
+
+class _Module:
+    """
+    One parsed module: local nets (ids in insertion order of `nets`), ports,
+    assigns and instances with their connections (CSR). Instance names are
+    packed in a NameTableBuilder and instance types are ids from the shared
+    `type_ids` table. A connection is stored as a pin id from the shared
+    `pins` table, or -(position + 1) when it is positional.
+    """
+    def __init__(self, name: str, pins: Dict[str, int], type_ids: Dict[str, int]):
+        self.name = name
+        self.pins = pins
+        self.type_ids = type_ids
+        self.nets: Dict[str, int] = {}
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+        self.ports: List[str] = []
+        self.directions: Dict[str, str] = {}
+        self.assigns = array("i")
+        self.types = array("i")
+        self.inst_names = NameTableBuilder()
+        self.conn_offsets = array("q", [0])
+        self.conn_pins = array("i")
+        self.bit_offsets = array("q", [0])
+        self.bits = array("i")
+
+    def net(self, name: str) -> int:
+        i = self.nets.get(name)
+        if i is None:
+            i = self.nets[name] = len(self.nets)
+        return i
+
+    def expand(self, name: str) -> List[str]:
+        """Bit names of a whole signal, MSB first."""
+        r = self.ranges.get(name)
+        if r is None:
+            return [name]
+        msb, lsb = r
+        step = -1 if msb >= lsb else 1
+        return [f"{name}[{i}]" for i in range(msb, lsb + step, step)]
+
+    def declare(self, st: List[str], start: int) -> List[str]:
+        """Declares the comma-separated signals of `st[start:]` (with an optional range); returns their names."""
+        names = []
+        rng = None
+        i = start
+        n = len(st)
+        while i < n:
+            t = st[i]
+            if t in MODIFIERS or t in DIRECTIONS:
+                i += 1
+            elif t == "[":
+                j = st.index("]", i)
+                colon = st.index(":", i) if ":" in st[i:j] else -1
+                msb, lsb = (_int(st[i + 1]) if colon == i + 2 else None), (_int(st[j - 1]) if colon == j - 2 else None)
+                rng = (msb, lsb) if msb is not None and lsb is not None else None
+                i = j + 1
+            elif t == ",":
+                i += 1
+            elif t == "=":
+                # `wire a = b;` aliases like an assign
+                j = i + 1
+                while j < n and st[j] != ",":
+                    j += 1
+                self.alias(self.expand(names[-1]), st[i + 1:j])
+                i = j
+            else:
+                name = _name(t)
+                if rng: self.ranges[name] = rng
+                names.append(name)
+                for b in self.expand(name):
+                    self.net(b)
+                i += 1
+                # Unpacked dimensions are ignored
+                while i < n and st[i] == "[":
+                    i = st.index("]", i) + 1
+        return names
+
+    def expr_bits(self, toks: List[str]) -> Optional[List[int]]:
+        """Local net ids (-1 for constant bits) of a connection expression, MSB first; None for logic."""
+        if len(toks) == 1:
+            t = toks[0]
+            c = t[0]
+            if c.isdigit() or c == "'":
+                return [-1] * _width(t)
+            return [self.net(b) for b in self.expand(_name(t))]
+        if len(toks) == 4 and toks[1] == "[" and toks[2].isdigit():
+            return [self.net(f"{_name(toks[0])}[{int(toks[2])}]")]
+        out: List[int] = []
+        i, n = 0, len(toks)
+        while i < n:
+            t = toks[i]
+            c = t[0]
+            if t in ("{", "}", ","):
+                # A replication {N{...}} repeats the inner concatenation
+                if t == "{" and i + 2 < n and toks[i + 2] == "{" and _int(toks[i + 1]) is not None:
+                    depth, j = 1, i + 3
+                    while depth:
+                        depth += {"{": 1, "}": -1}.get(toks[j], 0)
+                        j += 1
+                    inner = self.expr_bits(toks[i + 3:j - 1])
+                    if inner is None: return None
+                    out.extend(inner * _int(toks[i + 1]))
+                    i = j + 1
+                    continue
+                i += 1
+            elif c.isdigit() or c == "'":
+                out.extend([-1] * _width(t))
+                i += 1
+            elif c.isalpha() or c in "_\\$":
+                name = _name(t)
+                if i + 1 < n and toks[i + 1] == "[":
+                    j = toks.index("]", i)
+                    sel = toks[i + 2:j]
+                    if len(sel) == 1 and _int(sel[0]) is not None:
+                        out.append(self.net(f"{name}[{_int(sel[0])}]"))
+                    elif len(sel) == 3 and sel[1] == ":" and _int(sel[0]) is not None and _int(sel[2]) is not None:
+                        msb, lsb = _int(sel[0]), _int(sel[2])
+                        step = -1 if msb >= lsb else 1
+                        out.extend(self.net(f"{name}[{k}]") for k in range(msb, lsb + step, step))
+                    else:
+                        return None
+                    i = j + 1
+                else:
+                    out.extend(self.net(b) for b in self.expand(name))
+                    i += 1
+            else:
+                return None
+        return out
+
+    def alias(self, lhs: List[str], rhs: List[str]):
+        bits = self.expr_bits(rhs)
+        if bits is None: return
+        left = [self.net(b) for b in lhs]
+        for a, b in zip(reversed(left), reversed(bits)):
+            if b >= 0:
+                self.assigns.append(a)
+                self.assigns.append(b)
+
+    def assign(self, st: List[str]):
+        i, n = 1, len(st)
+        while i < n:
+            eq = st.index("=", i)
+            j = eq + 1
+            depth = 0
+            while j < n and (st[j] != "," or depth):
+                depth += {"{": 1, "}": -1, "(": 1, ")": -1}.get(st[j], 0)
+                j += 1
+            lhs = self.expr_bits(st[i:eq])
+            rhs = self.expr_bits(st[eq + 1:j])
+            if lhs is not None and rhs is not None:
+                for a, b in zip(reversed(lhs), reversed(rhs)):
+                    if a >= 0 and b >= 0:
+                        self.assigns.append(a)
+                        self.assigns.append(b)
+            i = j + 1
+
+    def instance(self, st: List[str]):
+        """`TYPE [#(...)] NAME (conns) [, NAME (conns)]*`."""
+        mod = st[0]
+        i = 1
+        n = len(st)
+        if st[i] == "#":
+            depth, i = 0, i + 1
+            while True:
+                depth += {"(": 1, ")": -1}.get(st[i], 0)
+                i += 1
+                if not depth: break
+        while i < n:
+            name = _name(st[i])
+            i += 1
+            while st[i] == "[":
+                i = st.index("]", i) + 1
+            # st[i] == "("
+            i += 1
+            pos = 0
+            while st[i] != ")":
+                if st[i] == ",":
+                    i += 1
+                    continue
+                if st[i] == ".":
+                    pin = self.pins.setdefault(st[i + 1], len(self.pins))
+                    j = i + 3
+                    depth = 1
+                    while True:
+                        t = st[j]
+                        if t == "(": depth += 1
+                        elif t == ")":
+                            depth -= 1
+                            if not depth: break
+                        j += 1
+                    expr = st[i + 3:j]
+                    i = j + 1
+                else:
+                    pin = -(pos + 1)
+                    j = i
+                    depth = 0
+                    while depth or st[j] not in (",", ")"):
+                        depth += {"(": 1, ")": -1, "{": 1, "}": -1}.get(st[j], 0)
+                        j += 1
+                    expr = st[i:j]
+                    i = j
+                pos += 1
+                bits = self.expr_bits(expr) if expr else []
+                self.bits.extend(bits or [])
+                self.bit_offsets.append(len(self.bits))
+                self.conn_pins.append(pin)
+            i += 1
+            self.types.append(self.type_ids.setdefault(mod, len(self.type_ids)))
+            self.inst_names.append(name)
+            self.conn_offsets.append(len(self.conn_pins))
+            if i < n and st[i] == ",":
+                i += 1
+
+    def port_bits(self) -> List[List[int]]:
+        return [[self.net(b) for b in self.expand(p)] for p in self.ports]
+
+def _parse_module_header(mod: _Module, st: List[str]):
+    i = 2
+    if i < len(st) and st[i] == "#":
+        depth, i = 0, i + 1
+        while True:
+            depth += {"(": 1, ")": -1}.get(st[i], 0)
+            i += 1
+            if not depth: break
+    if i >= len(st) or st[i] != "(":
+        return
+    body = st[i + 1:len(st) - 1]
+    # ANSI headers carry directions; each declaration runs up to the next direction keyword
+    if any(t in DIRECTIONS for t in body):
+        k = 0
+        while k < len(body):
+            j = k + 1
+            while j < len(body) and body[j] not in DIRECTIONS:
+                j += 1
+            direction = body[k] if body[k] in DIRECTIONS else "inout"
+            for p in mod.declare(body[k:j], 0):
+                mod.ports.append(p)
+                mod.directions[p] = direction
+            k = j
+    else:
+        mod.ports.extend(_name(t) for t in body if t != ",")
+
+def _parse(file_path: str) -> Tuple[Dict[str, _Module], List[str], List[str]]:
+    """Modules of the file by name, the pin names indexed by pin id and the instance type names by type id."""
+    modules: Dict[str, _Module] = {}
+    pins: Dict[str, int] = {}
+    type_ids: Dict[str, int] = {}
+    mod: Optional[_Module] = None
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        for st in _statements(f):
+            if not st: continue
+            head = st[0]
+            if head in ("module", "macromodule"):
+                mod = modules[_name(st[1])] = _Module(_name(st[1]), pins, type_ids)
+                _parse_module_header(mod, st)
+            elif mod is None or head in BLOCK_WORDS:
+                if head == "endmodule": mod = None
+            elif head in DIRECTIONS:
+                for p in mod.declare(st, 1):
+                    mod.directions[p] = head
+                    if p not in mod.ports: mod.ports.append(p)
+            elif head in NET_TYPES:
+                mod.declare(st, 1)
+            elif head == "assign":
+                mod.assign(st)
+            elif head in SKIPPED:
+                continue
+            elif len(st) > 2 and (st[1] == "#" or st[2] == "(" or st[2] == "[") and head[0] not in "@#(":
+                mod.instance(st)
+    return modules, sorted(pins, key=pins.get), sorted(type_ids, key=type_ids.get)
+
+def _top(modules: Dict[str, _Module], type_names: List[str]) -> _Module:
+    """The last module no other module instantiates."""
+    used = set()
+    for m in modules.values():
+        used.update(type_names[t] for t in set(m.types))
+    tops = [m for name, m in modules.items() if name not in used]
+    return tops[-1] if tops else list(modules.values())[-1]
+
+def _find(parent: np.ndarray) -> np.ndarray:
+    """Root of every union-find node, by pointer jumping."""
+    while True:
+        nxt = parent[parent]
+        if np.array_equal(nxt, parent): return parent
+        parent = nxt
+
+def parse_verilog_netlist(file_path: str) -> Netlist:
+    """
+    Streaming structural Verilog/SystemVerilog parser. The file is
+    tokenized in chunks; escaped identifiers, buses (ranges, bit and part
+    selects, concatenations), `assign` aliases and multiple modules are
+    supported. The hierarchy below the top module (the last one nobody
+    instantiates) is flattened with `/`-separated names.
+
+    Leaf instances become INSTANCE_SIZE cells with their module name as
+    macro, top-level port bits become fixed PAD_SIZE pads named
+    `PAD_<port>` (macro PAD_MACRO), and every net connecting at least two
+    cells becomes a net. The netlist is built directly into
+    arrays.
+
+    Only reading and tokenization stream; memory is not bounded. Instance
+    names, types, connections and the flattened names and pins go into
+    packed buffers (NameTableBuilder, `array`) rather than Python lists,
+    but each module's local net name index and the flattened netlist are
+    held in memory and grow with the design.
+    """
+    modules, pin_names, type_names = _parse(file_path)
+    if not modules:
+        raise ValueError(f"No module found in {file_path}")
+    top = _top(modules, type_names)
+    ports = {m.name: m.port_bits() for m in modules.values()}
+    is_leaf = np.array([t not in modules for t in type_names], dtype=bool)
+
+    cell_names = NameTableBuilder()
+    cell_types = array("i")
+    macro_ids: Dict[str, int] = {}
+    net_names = NameTableBuilder()
+    parent = array("q")
+    # (net, cell) pairs of the flattened pins
+    pin_nets, pin_cells = array("q"), array("q")
+
+    def new_nets(names: Iterator[str]) -> np.ndarray:
+        start = len(net_names)
+        net_names.extend(names)
+        parent.extend(range(start, len(net_names)))
+        return np.arange(start, len(net_names), dtype=np.int64)
+
+    def union(a: int, b: int):
+        # Path halving; the older (outer) net stays the root
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    def instantiate(m: _Module, prefix: str, bound: Dict[int, int]):
+        gid = new_nets(prefix + s for s in m.nets)
+        for local, outer in bound.items():
+            union(int(gid[local]), outer)
+        assigns = m.assigns
+        for k in range(0, len(assigns), 2):
+            union(int(gid[assigns[k]]), int(gid[assigns[k + 1]]))
+
+        bits = np.frombuffer(m.bits, dtype=np.int32) if len(m.bits) else np.zeros(0, dtype=np.int32)
+        conn_off = np.frombuffer(m.conn_offsets, dtype=np.int64)
+        bit_off = np.frombuffer(m.bit_offsets, dtype=np.int64)
+        inst_bits = bit_off[conn_off]
+        types = np.frombuffer(m.types, dtype=np.int32) if len(m.types) else np.zeros(0, dtype=np.int32)
+        leaf = is_leaf[types]
+        inst_names = m.inst_names.build()
+
+        # Leaf instances: one cell each, connected to the nets of all their bits
+        first = len(cell_names)
+        cell_names.extend(prefix + name for name, ok in zip(inst_names, leaf.tolist()) if ok)
+        cell_types.extend(macro_ids.setdefault(type_names[t], len(macro_ids)) for t in types[leaf].tolist())
+        counts = np.diff(inst_bits)
+        ids = np.full(len(types), -1, dtype=np.int64)
+        ids[leaf] = np.arange(first, len(cell_names))
+        owner = np.repeat(ids, counts)
+        keep = (owner >= 0) & (bits >= 0)
+        pin_nets.frombytes(gid[bits[keep]].tobytes())
+        pin_cells.frombytes(owner[keep].tobytes())
+
+        # Submodule instances: bind their port bits to our nets, then recurse
+        for k in np.flatnonzero(~leaf).tolist():
+            child = modules[type_names[types[k]]]
+            index = {p: n for n, p in enumerate(child.ports)}
+            binding: Dict[int, int] = {}
+            for c in range(conn_off[k], conn_off[k + 1]):
+                pin = m.conn_pins[c]
+                p = -pin - 1 if pin < 0 else index.get(pin_names[pin])
+                if p is None or p >= len(child.ports): continue
+                conn = bits[bit_off[c]:bit_off[c + 1]].tolist()
+                for local, outer in zip(reversed(ports[child.name][p]), reversed(conn)):
+                    if outer >= 0:
+                        binding[local] = int(gid[outer])
+            instantiate(child, f"{prefix}{inst_names[k]}/", binding)
+
+    instantiate(top, "", {})
+
+    # Top-level ports: one fixed pad per bit. The top module was
+    # instantiated first, so its local net ids are global ids.
+    num_instances = len(cell_names)
+    for p, bits in zip(top.ports, ports[top.name]):
+        cell_names.extend(f"PAD_{b}" for b in top.expand(p))
+        cell_types.extend([macro_ids.setdefault(PAD_MACRO, len(macro_ids))] * len(bits))
+        pin_nets.extend(bits)
+    pin_cells.extend(range(num_instances, len(cell_names)))
+    n = len(cell_names)
+
+    root = _find(np.frombuffer(parent, dtype=np.int64).copy())
+    nets = root[np.frombuffer(pin_nets, dtype=np.int64)]
+    cells = np.frombuffer(pin_cells, dtype=np.int64)
+    # Distinct (net, cell) pairs grouped by net; nets reaching fewer than two cells are dropped
+    key = np.unique(nets * n + cells)
+    del nets, cells
+    nets, cells = np.divmod(key, max(1, n))
+    starts = np.flatnonzero(np.concatenate([[True], nets[1:] != nets[:-1]])) if len(nets) else np.zeros(0, dtype=np.int64)
+    degree = np.diff(np.append(starts, len(nets)))
+    multi = degree > 1
+    keep = np.repeat(multi, degree)
+    offsets = np.zeros(int(multi.sum()) + 1, dtype=np.int64)
+    np.cumsum(degree[multi], out=offsets[1:])
+    # Kept roots are ascending, so their names are selected in one pass
+    named = np.zeros(len(net_names), dtype=bool)
+    named[nets[starts[multi]]] = True
+
+    w = np.full(n, INSTANCE_SIZE)
+    w[num_instances:] = PAD_SIZE
+    fixed = np.zeros(n, dtype=bool)
+    fixed[num_instances:] = True
+    return Netlist(cell_names.build(), w, w.copy(), fixed, np.zeros(n), np.zeros(n),
+                   NameTable.from_list(name for name, ok in zip(net_names.build(), named.tolist()) if ok),
+                   offsets, cells[keep].astype(np.int32),
+                   np.frombuffer(cell_types, dtype=np.int32).copy(), NameTable.from_list(macro_ids))
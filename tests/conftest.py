@@ -0,0 +1,48 @@
+import random
+import numpy as np
+import pytest
+from models import PlacementParams
+from utils.generators import create_systolic_array
+from utils.parser import parse_netlist, init_placement
+
+CHIP = 1000.0
+BLOCKAGES = [(100.0, 100.0, 300.0, 250.0), (600.0, 500.0, 700.0, 900.0)]
+
+def placed_systolic(rows: int = 6, cols: int = 6, seed: int = 1):
+    """A small systolic netlist at a random initial placement."""
+    nl = parse_netlist(create_systolic_array(rows, cols))
+    init_placement(nl, CHIP, CHIP, None, random.Random(seed))
+    return nl
+
+def annotated_systolic(seed: int = 1):
+    """A placed systolic netlist with macro names on most cells and pin offsets."""
+    data = create_systolic_array(4, 4)
+    for k, attr in enumerate(data["cells"].values()):
+        if k % 4:
+            attr["macro"] = f"M{k % 3}"
+    nl = parse_netlist(data)
+    init_placement(nl, CHIP, CHIP, None, random.Random(seed))
+    rng = np.random.default_rng(seed)
+    nl.pin_dx = rng.uniform(-10, 10, nl.num_pins)
+    nl.pin_dy = rng.uniform(-10, 10, nl.num_pins)
+    return nl
+
+def assert_same_netlist(a, b):
+    """Every array of `b` equals that of `a`."""
+    assert list(a.names) == list(b.names) and list(a.net_names) == list(b.net_names)
+    for key in ("w", "h", "fixed", "x", "y", "net_offsets", "net_pins"):
+        assert np.array_equal(getattr(a, key), getattr(b, key)), key
+    assert a.macros(0, a.num_cells) == b.macros(0, b.num_cells)
+    for key in ("pin_dx", "pin_dy"):
+        if getattr(a, key) is None:
+            assert getattr(b, key) is None
+        else:
+            assert np.array_equal(getattr(a, key), getattr(b, key)), key
+
+@pytest.fixture
+def params():
+    return PlacementParams(chip_w=CHIP, chip_h=CHIP, blockages=list(BLOCKAGES), anneal_iters=500)
+
+@pytest.fixture
+def systolic():
+    return placed_systolic()
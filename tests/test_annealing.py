@@ -0,0 +1,25 @@
+import numpy as np
+from conftest import annotated_systolic, placed_systolic
+from algorithms.annealing import multi_start_anneal
+from algorithms.detailed import placement_cost
+
+def test_multi_start_independent_of_workers(params):
+    results = []
+    for workers in (1, 2):
+        nl = placed_systolic()
+        cost, _, stats = multi_start_anneal(nl, params, runs=3, workers=workers, seed=7)
+        results.append((cost, nl.x.copy(), nl.y.copy(), [s["cost"] for s in stats]))
+    (c1, x1, y1, s1), (c2, x2, y2, s2) = results
+    assert c1 == c2 and s1 == s2
+    assert np.array_equal(x1, x2) and np.array_equal(y1, y2)
+
+def test_multi_start_keeps_best_run(params):
+    nl = placed_systolic()
+    cost, _, stats = multi_start_anneal(nl, params, runs=3, workers=1, seed=7)
+    assert cost == min(s["cost"] for s in stats)
+    assert abs(placement_cost(nl, params) - cost) < 1e-6 * max(1.0, cost)
+
+def test_multi_start_cost_includes_pin_offsets(params):
+    nl = annotated_systolic()
+    cost, _, stats = multi_start_anneal(nl, params, runs=2, workers=2, seed=7)
+    assert abs(placement_cost(nl, params) - cost) < 1e-6 * max(1.0, cost)
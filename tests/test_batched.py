@@ -0,0 +1,57 @@
+import random
+import numpy as np
+import pytest
+from dataclasses import replace
+from conftest import annotated_systolic
+from algorithms.annealing import anneal
+from algorithms.batched import BatchMoves
+from algorithms.detailed import placement_cost
+
+def test_single_move_deltas_match_full_recompute(systolic, params):
+    moves = BatchMoves(systolic, systolic.movable().tolist(), params, random.Random(0), 8)
+    assert moves.cost == pytest.approx(placement_cost(systolic, params))
+    before = placement_cost(systolic, params)
+    cells = moves.select(8)
+    nx, ny = moves.propose(cells, 200.0)
+    delta, _ = moves.deltas(cells, nx, ny)
+    for c, x, y, d in zip(cells, nx, ny, delta):
+        old = systolic.x[c], systolic.y[c]
+        systolic.x[c], systolic.y[c] = x, y
+        assert d == pytest.approx(placement_cost(systolic, params) - before, abs=1e-6)
+        systolic.x[c], systolic.y[c] = old
+
+def test_batches_share_no_net(systolic, params):
+    moves = BatchMoves(systolic, systolic.movable().tolist(), params, random.Random(0), 16)
+    off, ids = systolic.cell_nets()
+    for _ in range(20):
+        cells = moves.select(16)
+        seen = np.concatenate([ids[off[c]:off[c + 1]] for c in cells])
+        assert len(np.unique(seen)) == len(seen)
+
+def test_tracked_cost_stays_exact(systolic, params):
+    moves = BatchMoves(systolic, systolic.movable().tolist(), params, random.Random(0), 8)
+    for T in (500.0, 50.0, 5.0):
+        moves.run(T, 100.0, 200)
+        assert moves.cost == pytest.approx(placement_cost(systolic, params), abs=1e-6)
+
+def test_batch_requires_random_moves(systolic, params):
+    with pytest.raises(ValueError):
+        anneal(systolic, replace(params, anneal_batch=8), random.Random(0))
+    cost, _, _ = anneal(systolic, replace(params, anneal_batch=8, anneal_moves="random"), random.Random(0))
+    assert cost == pytest.approx(placement_cost(systolic, params), abs=1e-6)
+
+def test_pin_offsets_are_part_of_the_cost(params):
+    nl = annotated_systolic()
+    moves = BatchMoves(nl, nl.movable().tolist(), params, random.Random(2), 8)
+    assert moves.cost == pytest.approx(placement_cost(nl, params))
+    before = placement_cost(nl, params)
+    cells = moves.select(8)
+    nx, ny = moves.propose(cells, 200.0)
+    delta, _ = moves.deltas(cells, nx, ny)
+    for c, x, y, d in zip(cells, nx, ny, delta):
+        old = nl.x[c], nl.y[c]
+        nl.x[c], nl.y[c] = x, y
+        assert d == pytest.approx(placement_cost(nl, params) - before, abs=1e-6)
+        nl.x[c], nl.y[c] = old
+    moves.run(100.0, 100.0, 200)
+    assert moves.cost == pytest.approx(placement_cost(nl, params), abs=1e-6)
@@ -0,0 +1,73 @@
+import pytest
+from models import PlacementParams
+from engine import PlacementEngine
+from utils.bookshelf import read_bookshelf
+from utils.def_reader import read_def_placement
+from utils.placement_io import read_placement_npz, read_placement_jsonl
+
+def _write_design(tmp_path):
+    """Two movable nodes and two terminals on two rows at (50, 100), 40 sites of width 1 each."""
+    files = {
+        "d.aux": "RowBasedPlacement : d.nodes d.nets d.wts d.pl d.scl\n",
+        "d.nodes": "UCLA nodes 1.0\n# comment\nNumNodes : 4\nNumTerminals : 2\n"
+                   "a 4 10\nb 6 10\nt1 2 2 terminal\nt2 2 2 terminal_NI\n",
+        "d.nets": "UCLA nets 1.0\nNumNets : 2\nNumPins : 5\n"
+                  "NetDegree : 3 n0\n a O : 1.5 -2\n b I : -1 0.5\n t1 I\n"
+                  "NetDegree : 2\n b O\n t2 I : 0 1\n",
+        "d.pl": "UCLA pl 1.0\na 60 100 : N\nb 70 110 : N\nt1 50 100 : N /FIXED\nt2 88 118 : N /FIXED_NI\n",
+        "d.scl": "UCLA scl 1.0\nNumRows : 2\n" + "".join(
+            f"CoreRow Horizontal\n Coordinate : {y}\n Height : 10\n Sitewidth : 1\n Sitespacing : 1\n"
+            f" Siteorient : 1\n Sitesymmetry : 1\n SubrowOrigin : 50 NumSites : 40\nEnd\n" for y in (100, 110)),
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    return str(tmp_path / "d.aux")
+
+def test_read_bookshelf(tmp_path):
+    nl, layout = read_bookshelf(_write_design(tmp_path))
+    assert list(nl.names) == ["a", "b", "t1", "t2"]
+    assert nl.w.tolist() == [4, 6, 2, 2] and nl.h.tolist() == [10, 10, 2, 2]
+    assert nl.fixed.tolist() == [False, False, True, True]
+    assert layout == {"die": (40.0, 20.0), "rows": 2, "row_height": 10.0, "site_width": 1.0, "origin": (50.0, 100.0)}
+    # Shifted so the core starts at (0, 0)
+    assert nl.x.tolist() == [10, 20, 0, 38] and nl.y.tolist() == [0, 10, 0, 18]
+    assert list(nl.net_names) == ["n0", "net_1"]
+    assert nl.net_offsets.tolist() == [0, 3, 5] and nl.net_pins.tolist() == [0, 1, 2, 1, 3]
+    assert nl.pin_dx.tolist() == [1.5, -1, 0, 0, 0] and nl.pin_dy.tolist() == [-2, 0.5, 0, 0, 1]
+
+def test_engine_keeps_the_origin(tmp_path):
+    engine = PlacementEngine(PlacementParams(chip_w=1, chip_h=1, anneal_iters=50, visualize=False))
+    engine.load_bookshelf(_write_design(tmp_path))
+    assert engine.origin == (50.0, 100.0)
+    assert (engine.params.chip_w, engine.params.chip_h) == (40.0, 20.0)
+
+    nl = engine.netlist
+    nl.x[:2], nl.y[:2] = [3.0, 9.0], [0.0, 10.0]
+    out = tmp_path / "out"
+    engine.save_results(str(out), "d", jsonl=True)
+    coords, die = read_def_placement(str(out / "d.def"))
+    assert die == (50.0, 100.0, 90.0, 120.0)
+    assert coords["a"] == (53.0, 100.0) and coords["t2"] == (88.0, 118.0)
+    assert read_placement_npz(str(out / "d_placement.npz"))["b"] == (59.0, 110.0)
+    assert read_placement_jsonl(str(out / "d_placement.jsonl"))["b"] == (59.0, 110.0)
+
+    # Reading back subtracts the origin again
+    nl.x[:2] = nl.y[:2] = -5.0
+    report = engine.check_placement(coords, die)
+    assert nl.x[:2].tolist() == [3.0, 9.0] and nl.y[:2].tolist() == [0.0, 10.0]
+    assert report["out_of_die"] == 0
+    engine.check_placement(read_placement_npz(str(out / "d_placement.npz")))
+    assert nl.x[:2].tolist() == [3.0, 9.0]
+
+def test_init_placement_is_shifted_by_the_origin(tmp_path, monkeypatch):
+    import engine as engine_module
+    seen = {}
+    def stop(nl, w, h, init_coords, rng):
+        seen.update(init_coords)
+        raise StopIteration
+    monkeypatch.setattr(engine_module, "init_placement", stop)
+    engine = PlacementEngine(PlacementParams(chip_w=1, chip_h=1, visualize=False))
+    engine.load_bookshelf(_write_design(tmp_path))
+    with pytest.raises(StopIteration):
+        engine.run({"a": (53.0, 100.0), "b": (59.0, 110.0)})
+    assert seen == {"a": (3.0, 0.0), "b": (9.0, 10.0)}
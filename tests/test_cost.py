@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+from netlist import NetlistBuilder
+from algorithms.cost import (net_bboxes, bin_utilization, blockage_hits, rect_coverage, rudy_map,
+                             netlist_wirelength, netlist_density, netlist_blockage_penalty, BLOCKAGE_PENALTY)
+
+CHIP = 100.0
+GRID = 10
+
+def _random_netlist(rng, n=40, nets=30):
+    """Random cells (some zero-size, some straddling bin edges) and nets of 0-5 pins."""
+    b = NetlistBuilder()
+    for i in range(n):
+        w, h = (0.0, 0.0) if i % 7 == 0 else rng.uniform(1, 25, 2)
+        b.add_cell(f"c{i}", w, h, fixed=i % 5 == 0, x=rng.uniform(-10, CHIP), y=rng.uniform(-10, CHIP))
+    # A cell exactly covering the corner of four bins
+    b.add_cell("straddle", 10.0, 10.0, x=15.0, y=25.0)
+    for k in range(nets):
+        deg = int(rng.integers(0, 6))
+        b.add_net(f"n{k}", [f"c{i}" for i in rng.integers(0, n, deg)])
+    b.add_net("single", ["straddle"])
+    nl = b.build()
+    nl.pin_dx = rng.uniform(-3, 3, nl.num_pins)
+    nl.pin_dy = rng.uniform(-3, 3, nl.num_pins)
+    return nl
+
+def _brute_bboxes(nl):
+    boxes = []
+    for k in range(nl.num_nets):
+        a, b = nl.net_offsets[k], nl.net_offsets[k + 1]
+        xs = [nl.x[p] + nl.w[p] / 2 + nl.pin_dx[q] for q, p in zip(range(a, b), nl.net_pins[a:b])]
+        ys = [nl.y[p] + nl.h[p] / 2 + nl.pin_dy[q] for q, p in zip(range(a, b), nl.net_pins[a:b])]
+        boxes.append((min(xs), max(xs), min(ys), max(ys)) if xs else None)
+    return boxes
+
+def _brute_utilization(nl):
+    gx = CHIP / GRID
+    util = np.zeros((GRID, GRID))
+    for c in range(nl.num_cells):
+        x0, x1 = max(0, nl.x[c]), min(CHIP, nl.x[c] + nl.w[c])
+        y0, y1 = max(0, nl.y[c]), min(CHIP, nl.y[c] + nl.h[c])
+        for j in range(GRID):
+            for i in range(GRID):
+                ox = min(x1, (i + 1) * gx) - max(x0, i * gx)
+                oy = min(y1, (j + 1) * gx) - max(y0, j * gx)
+                util[j, i] += max(0, ox) * max(0, oy) / (gx * gx)
+    return util
+
+@pytest.mark.parametrize("seed", range(5))
+def test_net_bboxes_match_brute_force(seed):
+    nl = _random_netlist(np.random.default_rng(seed))
+    px, py = nl.pin_coords()
+    xmin, xmax, ymin, ymax, nonempty = net_bboxes(px, py, nl.net_offsets)
+    for k, box in enumerate(_brute_bboxes(nl)):
+        if box is None:
+            assert not nonempty[k] and xmin[k] == xmax[k] == ymin[k] == ymax[k] == 0
+        else:
+            assert nonempty[k]
+            assert np.allclose((xmin[k], xmax[k], ymin[k], ymax[k]), box)
+    # The single-pin net has a zero-size box at its offset pin
+    assert xmax[-1] == xmin[-1] == 20.0 + nl.pin_dx[-1]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_wirelength_matches_brute_force(seed):
+    nl = _random_netlist(np.random.default_rng(seed))
+    expected = sum(b[1] - b[0] + b[3] - b[2] for b in _brute_bboxes(nl) if b is not None)
+    assert netlist_wirelength(nl) == pytest.approx(expected)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bin_utilization_matches_brute_force(seed):
+    nl = _random_netlist(np.random.default_rng(seed))
+    util = bin_utilization(nl.x, nl.y, nl.w, nl.h, CHIP, CHIP, GRID)
+    assert np.allclose(util, _brute_utilization(nl))
+    _, dense = netlist_density(nl, CHIP, CHIP, GRID)
+    assert np.allclose(dense, util)
+
+def test_bin_utilization_splits_straddling_cell():
+    one = np.ones(1)
+    util = bin_utilization(one * 15, one * 25, one * 10, one * 10, CHIP, CHIP, GRID)
+    assert np.count_nonzero(util) == 4
+    assert np.allclose(util[2:4, 1:3], 0.25)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_blockage_hits_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    # Integer coordinates, so points on blockage edges are common
+    cx, cy = rng.integers(0, 50, 400).astype(float), rng.integers(0, 50, 400).astype(float)
+    blockages = []
+    for _ in range(4):
+        x0, y0 = rng.integers(0, 40, 2)
+        blockages.append((float(x0), float(y0), float(x0 + rng.integers(0, 15)), float(y0 + rng.integers(1, 15))))
+    expected = [sum(bx0 < x < bx1 and by0 < y < by1 for bx0, by0, bx1, by1 in blockages) for x, y in zip(cx, cy)]
+    assert blockage_hits(cx, cy, blockages).tolist() == expected
+    assert blockage_hits(cx, cy, []).tolist() == [0] * len(cx)
+
+def test_blockage_penalty_skips_fixed_cells():
+    nl = _random_netlist(np.random.default_rng(0))
+    blockages = [(0.0, 0.0, 60.0, 60.0)]
+    cx, cy = nl.x + nl.w / 2, nl.y + nl.h / 2
+    hits = sum(0 < x < 60 and 0 < y < 60 for x, y, f in zip(cx, cy, nl.fixed) if not f)
+    assert netlist_blockage_penalty(nl, blockages) == hits * BLOCKAGE_PENALTY
+
+def _brute_coverage(x0, y0, x1, y1, weight, gx_n, gy_n):
+    gx, gy = CHIP / gx_n, CHIP / gy_n
+    cover = np.zeros((gy_n, gx_n))
+    for r in range(len(x0)):
+        for j in range(gy_n):
+            for i in range(gx_n):
+                ox = min(x1[r], (i + 1) * gx, CHIP) - max(x0[r], i * gx, 0)
+                oy = min(y1[r], (j + 1) * gy, CHIP) - max(y0[r], j * gy, 0)
+                cover[j, i] += weight[r] * max(0, ox) * max(0, oy) / (gx * gy)
+    return cover
+
+def _random_rects(rng, n=60):
+    """Rectangles inside, across and outside the die edges, including zero-width/height ones."""
+    x0, y0 = rng.uniform(-30, CHIP + 10, n), rng.uniform(-30, CHIP + 10, n)
+    w, h = rng.uniform(0, 50, n), rng.uniform(0, 50, n)
+    w[::6], h[1::6] = 0, 0
+    return x0, y0, x0 + w, y0 + h, rng.uniform(0.5, 2, n)
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("grid", [(GRID, GRID), (7, 13)])
+def test_rect_coverage_matches_brute_force(seed, grid):
+    x0, y0, x1, y1, weight = _random_rects(np.random.default_rng(seed))
+    cover = rect_coverage(x0, y0, x1, y1, weight, CHIP, CHIP, *grid)
+    assert np.allclose(cover, _brute_coverage(x0, y0, x1, y1, weight, *grid))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rudy_map_matches_brute_force(seed):
+    x0, y0, x1, y1, _ = _random_rects(np.random.default_rng(seed))
+    pitch = CHIP / GRID
+    # Brute force: widen each box to a bin pitch about its center, then spread its HPWL
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    w, h = np.maximum(x1 - x0, pitch), np.maximum(y1 - y0, pitch)
+    demand = (w + h) / (w * h) * pitch * pitch
+    expected = _brute_coverage(cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2, demand, GRID, GRID)
+    assert np.allclose(rudy_map(x0, x1, y0, y1, CHIP, CHIP, GRID), expected)
+
+def test_rudy_map_conserves_wirelength_inside_die():
+    # A net well inside the die deposits exactly its (widened) HPWL
+    one = np.ones(1)
+    demand = rudy_map(one * 20, one * 55, one * 30, one * 30, CHIP, CHIP, GRID)
+    assert demand.sum() == pytest.approx(35 + CHIP / GRID)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from conftest import annotated_systolic, CHIP
+from utils import def_reader
+from utils.def_reader import read_def_placement
+from utils.def_writer import write_def
+
+@pytest.mark.parametrize("name", ["out.def", "out.def.gz"])
+@pytest.mark.parametrize("chunk", [def_reader.CHUNK_SIZE, 7])
+def test_def_round_trip(tmp_path, monkeypatch, name, chunk):
+    monkeypatch.setattr(def_reader, "CHUNK_SIZE", chunk)
+    nl = annotated_systolic()
+    path = str(tmp_path / name)
+    write_def(nl, CHIP, CHIP, path)
+    coords, die = read_def_placement(path)
+    assert die == (0.0, 0.0, CHIP, CHIP)
+    assert list(coords) == list(nl.names)
+    assert np.array_equal([c[0] for c in coords.values()], nl.x.astype(np.int64))
+    assert np.array_equal([c[1] for c in coords.values()], nl.y.astype(np.int64))
+
+@pytest.mark.parametrize("chunk", [def_reader.CHUNK_SIZE, 5])
+def test_components_on_the_header_line(tmp_path, monkeypatch, chunk):
+    monkeypatch.setattr(def_reader, "CHUNK_SIZE", chunk)
+    path = tmp_path / "one_line.def"
+    path.write_text("DESIGN top ; DIEAREA ( 0 0 ) ( 500 400 ) ; COMPONENTS 3 ; - a NAND2 + PLACED ( 10 20 ) N ; "
+                    "- b NAND2 ; - c INV + FIXED ( 30 40 ) N ; END COMPONENTS END DESIGN\n")
+    coords, die = read_def_placement(str(path))
+    assert die == (0.0, 0.0, 500.0, 400.0)
+    # b is unplaced
+    assert coords == {"a": (10.0, 20.0), "c": (30.0, 40.0)}
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from conftest import annotated_systolic, placed_systolic
+from algorithms.cost import net_bboxes, netlist_wirelength
+from algorithms.detailed import placement_cost, window_detailed_placement, tile_windows, _window_netlist
+from algorithms.fm import csr_rows
+
+def test_window_detailed_independent_of_workers(params):
+    results = []
+    for workers in (1, 2):
+        nl = placed_systolic(8, 8)
+        cost, info = window_detailed_placement(nl, params, rounds=2, window_cells=10, workers=workers, seed=3)
+        results.append((cost, nl.x.copy(), nl.y.copy(), info))
+    (c1, x1, y1, i1), (c2, x2, y2, i2) = results
+    assert i1["windows"] > 1 and i2["parallel_windows"] > 0
+    assert c1 == c2 and i1["accepted"] == i2["accepted"]
+    assert np.array_equal(x1, x2) and np.array_equal(y1, y2)
+
+def test_window_detailed_does_not_increase_cost(params):
+    nl = placed_systolic(8, 8)
+    start = placement_cost(nl, params)
+    cost, info = window_detailed_placement(nl, params, rounds=3, window_cells=10, workers=1, seed=3)
+    assert cost <= start and info["accepted"] > 0
+    assert abs(placement_cost(nl, params) - cost) < 1e-6 * max(1.0, cost)
+
+def test_window_netlist_keeps_pin_offsets(params):
+    nl = annotated_systolic()
+    px, py = nl.pin_coords()
+    xmin, xmax, ymin, ymax, _ = net_bboxes(px, py, nl.net_offsets)
+    hpwl = (xmax - xmin) + (ymax - ymin)
+    phases = tile_windows(nl, params, (params.chip_w / 2, params.chip_h / 2), (0.0, 0.0), np.random.SeedSequence(0))
+    deg = nl.net_degree()
+    for win in (w for windows in phases for w in windows):
+        local = _window_netlist(nl, win, params.max_net_fanout)
+        # Each local net spans exactly the bounding box of the global one
+        nets = np.unique(csr_rows(*nl.cell_nets(), win[4])[1])
+        nets = nets[(deg[nets] >= 2) & (deg[nets] <= params.max_net_fanout)]
+        assert netlist_wirelength(local) == pytest.approx(hpwl[nets].sum())
+
+def test_window_detailed_cost_includes_pin_offsets(params):
+    results = []
+    for workers in (1, 2):
+        nl = annotated_systolic()
+        start = placement_cost(nl, params)
+        cost, info = window_detailed_placement(nl, params, rounds=2, window_cells=4, workers=workers, seed=3)
+        assert cost <= start and info["accepted"] > 0
+        assert abs(placement_cost(nl, params) - cost) < 1e-6 * max(1.0, cost)
+        results.append((cost, nl.x.copy()))
+    assert results[0][0] == results[1][0] and np.array_equal(results[0][1], results[1][1])
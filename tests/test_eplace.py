@@ -0,0 +1,40 @@
+import random
+import time
+from conftest import placed_systolic, CHIP, BLOCKAGES
+from algorithms.cost import netlist_density
+from algorithms.eplace import eplace_global_placement
+from algorithms.global_placer import quadratic_global_placement
+from utils.timing import TimeBudget
+
+def _quadratic_start(seed=2):
+    nl = placed_systolic(12, 12, seed=seed)
+    quadratic_global_placement(nl, CHIP, CHIP, random.Random(seed))
+    return nl
+
+def test_eplace_reduces_overflow_of_quadratic_start():
+    nl = _quadratic_start()
+    before, _ = netlist_density(nl, CHIP, CHIP)
+    info = eplace_global_placement(nl, CHIP, CHIP, random.Random(0), BLOCKAGES, target_overflow=0.1)
+    after, _ = netlist_density(nl, CHIP, CHIP)
+    assert info["stop_reason"] == "converged"
+    assert after < 0.5 * before
+    m = nl.movable()
+    assert (nl.x[m] >= 0).all() and (nl.x[m] + nl.w[m] <= CHIP + 1e-9).all()
+    assert (nl.y[m] >= 0).all() and (nl.y[m] + nl.h[m] <= CHIP + 1e-9).all()
+
+def test_eplace_stops_at_time_budget_deadline():
+    nl = _quadratic_start()
+    budget = TimeBudget(0.2, {"global": 1.0, "anneal": 1.0})
+    deadline = budget.stage("global")
+    start = time.monotonic()
+    # An unreachable overflow target, so only the deadline can stop it
+    info = eplace_global_placement(nl, CHIP, CHIP, random.Random(0), BLOCKAGES, target_overflow=0.0,
+                                   max_iters=10 ** 6, deadline=deadline)
+    assert info["stop_reason"] == "time_budget"
+    assert time.monotonic() - start < 1.0
+    assert 0 < info["iterations"] < 10 ** 6
+
+def test_eplace_without_deadline_runs_iteration_budget():
+    nl = _quadratic_start()
+    info = eplace_global_placement(nl, CHIP, CHIP, random.Random(0), BLOCKAGES, target_overflow=0.0, max_iters=5)
+    assert info["stop_reason"] == "iteration_budget" and info["iterations"] == 5
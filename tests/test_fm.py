@@ -0,0 +1,30 @@
+import random
+import numpy as np
+from conftest import placed_systolic, CHIP
+from algorithms.fm import fm_bipartition, _Hypergraph
+
+def _median_side(nl, cells, axis):
+    area = nl.w[cells] * nl.h[cells]
+    order = np.argsort((nl.x, nl.y)[axis][cells], kind="stable")
+    side = np.zeros(len(cells), dtype=np.int64)
+    side[order[np.cumsum(area[order]) - area[order] >= area.sum() / 2]] = 1
+    return side
+
+def test_fm_cut_not_worse_than_median_split():
+    nl = placed_systolic(12, 12)
+    cells = nl.movable()
+    for axis in (0, 1):
+        hg = _Hypergraph(nl, cells, axis, CHIP / 2, 1000)
+        side, cut, passes = fm_bipartition(nl, cells, axis, CHIP / 2, 0.1, random.Random(0))
+        assert cut == hg.cut(side)
+        assert cut <= hg.cut(_median_side(nl, cells, axis))
+        assert 1 <= passes <= 10
+
+def test_fm_respects_balance():
+    nl = placed_systolic(12, 12)
+    cells = nl.movable()
+    tol = 0.05
+    side, _, _ = fm_bipartition(nl, cells, 0, CHIP / 2, tol, random.Random(1))
+    area = nl.w[cells] * nl.h[cells]
+    share = area[side == 1].sum() / area.sum()
+    assert 0.5 - tol <= share <= 0.5 + tol
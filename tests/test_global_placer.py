@@ -0,0 +1,120 @@
+import random
+import numpy as np
+import pytest
+from netlist import NetlistBuilder
+from algorithms.global_placer import (_clique_edges, _star_edges, _laplacian, _regularize,
+                                      quadratic_global_placement)
+
+CHIP = 100.0
+
+def _small_netlist(seed=0, n=12, nets=10, fixed=(0, 5), extra=()):
+    rng = np.random.default_rng(seed)
+    b = NetlistBuilder()
+    for i in range(n):
+        b.add_cell(f"c{i}", 2.0, 2.0, fixed=i in fixed, x=rng.uniform(0, CHIP), y=rng.uniform(0, CHIP))
+    for k in range(nets):
+        pins = rng.choice(n, int(rng.integers(2, 7)), replace=False)
+        b.add_net(f"n{k}", [f"c{i}" for i in pins])
+    for k, pins in enumerate(extra):
+        b.add_net(f"x{k}", pins)
+    return b.build()
+
+def _variables(nl, extra=0):
+    var = np.full(nl.num_cells + extra, -1, dtype=np.int64)
+    movable = nl.movable()
+    var[movable] = np.arange(len(movable))
+    var[nl.num_cells:] = len(movable) + np.arange(extra)
+    return var, len(movable) + extra
+
+def _dense_reference(edges, var, nvars, fx):
+    """Entry-by-entry assembly of the quadratic system for weighted two-pin edges."""
+    A, rhs = np.zeros((nvars, nvars)), np.zeros(nvars)
+    for a, b, w in edges:
+        for u, v in ((a, b), (b, a)):
+            if var[u] < 0: continue
+            A[var[u], var[u]] += w
+            if var[v] >= 0:
+                A[var[u], var[v]] -= w
+            else:
+                rhs[var[u]] += w * fx[v]
+    return A, rhs
+
+def _net_cells(nl, k):
+    return nl.net_pins[nl.net_offsets[k]:nl.net_offsets[k + 1]].tolist()
+
+def test_clique_laplacian_matches_dense_reference():
+    nl = _small_netlist()
+    nets = np.arange(nl.num_nets)
+    var, nvars = _variables(nl)
+    a, b, w = (np.concatenate(p) for p in _clique_edges(nl, nets))
+    A, bx, by = _laplacian(a.astype(np.int64), b.astype(np.int64), w, var, nvars, nl.x, nl.y)
+
+    edges = []
+    for k in nets:
+        pins = _net_cells(nl, k)
+        edges += [(pins[i], pins[j], 1 / (len(pins) - 1)) for i in range(len(pins)) for j in range(i + 1, len(pins))]
+    ref, rx = _dense_reference(edges, var, nvars, nl.x)
+    _, ry = _dense_reference(edges, var, nvars, nl.y)
+    assert np.allclose(A.toarray(), ref)
+    assert np.allclose(bx, rx) and np.allclose(by, ry)
+
+def test_star_laplacian_matches_dense_reference_and_clique():
+    nl = _small_netlist(seed=1)
+    nets = np.arange(nl.num_nets)
+    var, nvars = _variables(nl, len(nets))
+    fx = np.concatenate([nl.x, np.zeros(len(nets))])
+    a, b, w = (np.concatenate(p) for p in _star_edges(nl, nets, nl.num_cells))
+    A, bx, _ = _laplacian(a.astype(np.int64), b.astype(np.int64), w, var, nvars, fx, fx)
+
+    edges = []
+    for k in nets:
+        pins = _net_cells(nl, k)
+        edges += [(p, nl.num_cells + k, len(pins) / (len(pins) - 1)) for p in pins]
+    ref, rx = _dense_reference(edges, var, nvars, fx)
+    assert np.allclose(A.toarray(), ref)
+    assert np.allclose(bx, rx)
+
+    # Eliminating the star nodes (Schur complement) gives the clique system
+    n = nvars - len(nets)
+    A = A.toarray()
+    Ass_inv = np.linalg.inv(A[n:, n:])
+    schur = A[:n, :n] - A[:n, n:] @ Ass_inv @ A[n:, :n]
+    ca, cb, cw = (np.concatenate(p) for p in _clique_edges(nl, nets))
+    clique, cx = _laplacian(ca.astype(np.int64), cb.astype(np.int64), cw, var[:nl.num_cells], n, nl.x, nl.y)[:2]
+    assert np.allclose(schur, clique.toarray())
+    assert np.allclose(bx[:n] - A[:n, n:] @ Ass_inv @ bx[n:], cx)
+
+@pytest.mark.parametrize("net_model", ["star", "b2b"])
+def test_nets_above_max_fanout_are_ignored(net_model):
+    # A 12-pin net over every cell; once dropped it must not change the result
+    every = [f"c{i}" for i in range(12)]
+    plain = _small_netlist(seed=2)
+    wide = _small_netlist(seed=2, extra=[every])
+    kwargs = dict(net_model=net_model, fanout_threshold=4, max_fanout=11)
+    quadratic_global_placement(plain, CHIP, CHIP, random.Random(0), **kwargs)
+    quadratic_global_placement(wide, CHIP, CHIP, random.Random(0), **kwargs)
+    assert np.allclose(plain.x, wide.x) and np.allclose(plain.y, wide.y)
+    # With the net kept, cells are pulled together
+    kept = _small_netlist(seed=2, extra=[every])
+    quadratic_global_placement(kept, CHIP, CHIP, random.Random(0), **dict(kwargs, max_fanout=12))
+    assert not np.allclose(kept.x, wide.x)
+
+def test_regularize_keeps_system_spd_without_fixed_cells():
+    nl = _small_netlist(seed=3, fixed=())
+    var, nvars = _variables(nl)
+    a, b, w = (np.concatenate(p) for p in _clique_edges(nl, np.arange(nl.num_nets)))
+    A, bx, _ = _laplacian(a.astype(np.int64), b.astype(np.int64), w, var, nvars, nl.x, nl.y)
+    assert not bx.any()
+    # The pure Laplacian is singular (constant vectors are in its null space)
+    assert np.linalg.eigvalsh(A.toarray()).min() == pytest.approx(0, abs=1e-9)
+    R, eps = _regularize(A)
+    assert eps > 0
+    assert np.allclose(R.toarray(), R.toarray().T)
+    assert np.linalg.eigvalsh(R.toarray()).min() >= eps * (1 - 1e-6)
+    np.linalg.cholesky(R.toarray())
+
+@pytest.mark.parametrize("solver", ["direct", "cg"])
+def test_placement_without_fixed_cells_is_finite(solver):
+    nl = _small_netlist(seed=3, fixed=())
+    quadratic_global_placement(nl, CHIP, CHIP, random.Random(0), solver=solver)
+    assert np.isfinite(nl.x).all() and np.isfinite(nl.y).all()
@@ -0,0 +1,52 @@
+import random
+import pytest
+from conftest import annotated_systolic
+from algorithms.incremental import IncrementalCost
+from algorithms.detailed import placement_cost
+
+def test_move_and_swap_deltas_match_full_recompute(systolic, params):
+    model = IncrementalCost(systolic, params)
+    assert model.cost == pytest.approx(placement_cost(systolic, params))
+    rng = random.Random(0)
+    cells = systolic.movable().tolist()
+    for step in range(200):
+        before = placement_cost(systolic, params)
+        if step % 3 == 0:
+            delta = model.swap(*rng.sample(cells, 2))
+        else:
+            i = rng.choice(cells)
+            delta = model.move(i, rng.uniform(0, params.chip_w - systolic.w[i]), rng.uniform(0, params.chip_h - systolic.h[i]))
+        assert delta == pytest.approx(placement_cost(systolic, params) - before, abs=1e-6)
+        if rng.random() < 0.5:
+            model.commit()
+        else:
+            model.rollback()
+            assert placement_cost(systolic, params) == pytest.approx(before)
+        assert model.cost == pytest.approx(placement_cost(systolic, params), abs=1e-6)
+
+def test_rollback_restores_coordinates(systolic, params):
+    model = IncrementalCost(systolic, params)
+    x, y = systolic.x.copy(), systolic.y.copy()
+    i, j = systolic.movable()[:2].tolist()
+    model.swap(i, j)
+    model.rollback()
+    assert (systolic.x == x).all() and (systolic.y == y).all()
+
+def test_uncommitted_move_is_rejected(systolic, params):
+    model = IncrementalCost(systolic, params)
+    model.move(0, 10.0, 10.0)
+    with pytest.raises(RuntimeError):
+        model.move(1, 20.0, 20.0)
+
+def test_pin_offsets_are_part_of_the_cost(params):
+    nl = annotated_systolic()
+    model = IncrementalCost(nl, params)
+    assert model.cost == pytest.approx(placement_cost(nl, params))
+    rng = random.Random(1)
+    cells = nl.movable().tolist()
+    for _ in range(50):
+        before = placement_cost(nl, params)
+        i = rng.choice(cells)
+        delta = model.move(i, rng.uniform(0, params.chip_w - nl.w[i]), rng.uniform(0, params.chip_h - nl.h[i]))
+        assert delta == pytest.approx(placement_cost(nl, params) - before, abs=1e-6)
+        model.commit()
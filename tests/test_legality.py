@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from conftest import placed_systolic, CHIP, BLOCKAGES
+from algorithms.legality import check_legality, overlapping_pairs
+
+def _brute_pairs(x0, y0, x1, y1):
+    """Pairs whose interiors intersect; zero-area rectangles have none."""
+    live = [i for i in range(len(x0)) if x1[i] > x0[i] and y1[i] > y0[i]]
+    return {(i, j) for i in live for j in live
+            if i < j and x0[i] < x1[j] and x0[j] < x1[i] and y0[i] < y1[j] and y0[j] < y1[i]}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_overlapping_pairs_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = 300
+    # Integer coordinates, so touching edges are common; mixed sizes span several bands
+    x0, y0 = rng.integers(0, 200, n).astype(float), rng.integers(0, 200, n).astype(float)
+    w = rng.choice([0, 1, 5, 10, 40], n).astype(float)
+    h = rng.choice([0, 2, 5, 10, 60], n).astype(float)
+    i, j = overlapping_pairs(x0, y0, x0 + w, y0 + h)
+    found = set(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist()))
+    assert len(found) == len(i)
+    assert found == _brute_pairs(x0, y0, x0 + w, y0 + h)
+
+def test_check_legality_matches_brute_force():
+    nl = placed_systolic(10, 10, seed=4)
+    rng = np.random.default_rng(4)
+    nl.x[:] = rng.uniform(-20, CHIP - 20, nl.num_cells)
+    nl.fixed[:] = rng.random(nl.num_cells) < 0.2
+    report = check_legality(nl, CHIP, CHIP, BLOCKAGES)
+
+    x0, y0, x1, y1 = nl.x, nl.y, nl.x + nl.w, nl.y + nl.h
+    pairs = [(i, j) for i, j in _brute_pairs(x0, y0, x1, y1) if not (nl.fixed[i] and nl.fixed[j])]
+    area = sum((min(x1[i], x1[j]) - max(x0[i], x0[j])) * (min(y1[i], y1[j]) - max(y0[i], y0[j])) for i, j in pairs)
+    blocked = sum(1 for c in np.flatnonzero(~nl.fixed) for bx0, by0, bx1, by1 in BLOCKAGES
+                  if x0[c] < bx1 and bx0 < x1[c] and y0[c] < by1 and by0 < y1[c])
+    outside = sum(1 for c in np.flatnonzero(~nl.fixed)
+                  if x0[c] < 0 or y0[c] < 0 or x1[c] > CHIP or y1[c] > CHIP)
+    assert report["overlap_pairs"] == len(pairs) > 0
+    assert report["overlap_area"] == pytest.approx(area)
+    assert report["overlapping_cells"] == len({c for p in pairs for c in p})
+    assert report["blockage_overlaps"] == blocked
+    assert report["out_of_die"] == outside > 0
+    assert not report["legal"]
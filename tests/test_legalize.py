@@ -0,0 +1,60 @@
+import random
+import numpy as np
+import pytest
+from models import PlacementParams
+from utils.generators import create_systolic_array, create_modern_soc
+from utils.parser import parse_netlist, init_placement
+from utils.samples import CHIP_W, CHIP_H, create_cpu_like_blockages
+from algorithms.legalize import legalize_rows, _place_macros
+from algorithms.legality import check_legality
+
+EXAMPLES = {"systolic": lambda: create_systolic_array(10, 10), "soc": create_modern_soc}
+
+@pytest.mark.parametrize("example", sorted(EXAMPLES))
+@pytest.mark.parametrize("row_height", [0.0, 20.0, 40.0])
+@pytest.mark.parametrize("seed", range(2))
+def test_legalized_examples_are_legal(example, row_height, seed):
+    nl = parse_netlist(EXAMPLES[example]())
+    params = PlacementParams(chip_w=CHIP_W, chip_h=CHIP_H, blockages=create_cpu_like_blockages(nl.cells))
+    init_placement(nl, CHIP_W, CHIP_H, None, random.Random(seed))
+    info = legalize_rows(nl, params, row_height, site_width=2.0)
+    assert info["failed"] == 0
+
+    report = check_legality(nl, CHIP_W, CHIP_H, params.blockages)
+    assert report["overlap_pairs"] == 0 and report["blockage_overlaps"] == 0 and report["out_of_die"] == 0
+    m = nl.movable()
+    rows, sites = nl.y[m] / info["row_height"], nl.x[m] / 2.0
+    assert np.allclose(rows, np.round(rows)) and np.allclose(sites, np.round(sites))
+    # From a spread-out start, no cell travels far (rows are coarse when cells are tall)
+    die, row = max(CHIP_W, CHIP_H), info["row_height"]
+    assert info["max_displacement"] <= 0.2 * die + 2 * row
+    assert info["total_displacement"] / len(m) <= 0.05 * die + row
+
+def _full_search(x, y, wr, hr, obs, num_rows, num_sites, row_h, site):
+    """Nearest free position over the whole lattice, largest cell first."""
+    out = np.full((len(x), 2), -1, dtype=np.int64)
+    step = max(1, int(round(row_h / site)))
+    for k in np.argsort(-(wr * hr), kind="stable"):
+        cx, cy = np.meshgrid(np.arange(0, num_sites - wr[k] + 1, step), np.arange(0, num_rows - hr[k] + 1))
+        cx, cy = cx.ravel(), cy.ravel()
+        for i in np.argsort(np.abs(cx * site - x[k]) + np.abs(cy * row_h - y[k]), kind="stable"):
+            x0, y0 = cx[i] * site, cy[i] * row_h
+            x1, y1 = x0 + wr[k] * site, y0 + hr[k] * row_h
+            if not ((x0 < obs[:, 2]) & (x1 > obs[:, 0]) & (y0 < obs[:, 3]) & (y1 > obs[:, 1])).any():
+                out[k] = cx[i], cy[i]
+                obs = np.vstack([obs, [[x0, y0, x1, y1]]])
+                break
+    return out
+
+@pytest.mark.parametrize("seed", range(20))
+def test_windowed_macro_search_matches_full_lattice(seed):
+    rng = np.random.default_rng(seed)
+    n, num_rows, num_sites = int(rng.integers(1, 15)), int(rng.integers(3, 30)), int(rng.integers(10, 200))
+    row_h, site = float(rng.choice([1.0, 8.0])), float(rng.choice([0.5, 1.0, 2.0]))
+    # Targets partly outside the lattice; crowded obstacles force the window to widen
+    x, y = rng.uniform(-50, num_sites * site + 50, n), rng.uniform(-50, num_rows * row_h + 50, n)
+    wr, hr = rng.integers(1, 30, n), rng.integers(2, 6, n)
+    a, b = rng.uniform(0, num_sites * site, 8), rng.uniform(0, num_rows * row_h, 8)
+    obs = np.stack([a, b, a + rng.uniform(0, 60, 8), b + rng.uniform(0, 40, 8)], axis=1)
+    expected = _full_search(x, y, wr, hr, obs, num_rows, num_sites, row_h, site)
+    assert np.array_equal(_place_macros(x, y, wr, hr, [obs], num_rows, num_sites, row_h, site), expected)
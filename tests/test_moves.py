@@ -0,0 +1,43 @@
+import random
+import pytest
+from algorithms.incremental import IncrementalCost
+from algorithms.moves import MoveGenerator
+from algorithms.detailed import placement_cost
+
+def _generator(nl, params, seed=0):
+    return MoveGenerator(IncrementalCost(nl, params), nl.movable().tolist(), params, random.Random(seed))
+
+def test_every_move_type_reports_the_true_delta(systolic, params):
+    gen = _generator(systolic, params)
+    for kind in ("swap", "centroid", "free"):
+        for _ in range(50):
+            before = placement_cost(systolic, params)
+            out = gen._propose[kind](80.0)
+            if out is None: continue
+            assert out[0] == pytest.approx(placement_cost(systolic, params) - before, abs=1e-6)
+            gen.model.rollback()
+
+def test_free_move_lands_outside_a_nearby_blockage_edge(systolic, params):
+    gen = _generator(systolic, params)
+    bx0, by0, bx1, by1 = params.blockages[0]
+    c = gen.cells[0]
+    w, h = systolic.w[c], systolic.h[c]
+    # Center 30 left of the blockage's left edge, level with its middle
+    gen.cells = [c]
+    systolic.x[c], systolic.y[c] = bx0 - 30 - w / 2, (by0 + by1) / 2 - h / 2
+    gen._free(50.0)
+    assert systolic.x[c] + w / 2 == pytest.approx(bx0 - w / 2)
+    assert by0 - h / 2 <= systolic.y[c] + h / 2 <= by1 + h / 2
+
+def test_swap_partner_stays_near_the_window(systolic, params):
+    gen = _generator(systolic, params)
+    window = 100.0
+    # Partners come from the grid bins overlapping the window
+    r = max(window, gen.grid.bw, gen.grid.bh) + max(gen.grid.bw, gen.grid.bh)
+    for _ in range(100):
+        x, y = systolic.x.copy(), systolic.y.copy()
+        out = gen._swap(window)
+        if out is None: continue
+        c, other = out[1]
+        assert max(abs(x[other] - x[c]), abs(y[other] - y[c])) <= r
+        gen.model.rollback()
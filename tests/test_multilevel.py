@@ -0,0 +1,30 @@
+import numpy as np
+from netlist import NetlistBuilder
+from algorithms.multilevel import cluster_cells, coarsen, CLUSTER_AREA_LIMIT
+
+def _star(leaves: int = 20, leaf_size: float = 1.0):
+    """Cells a and b tied by three nets, and `leaves` cells each tied to a only."""
+    b = NetlistBuilder()
+    b.add_cell("a", 1.0, 1.0, x=10.0, y=10.0)
+    b.add_cell("b", 1.0, 1.0, x=12.0, y=10.0)
+    for k in range(3):
+        b.add_net(f"ab{k}", ["a", "b"])
+    for k in range(leaves):
+        b.add_cell(f"l{k}", leaf_size, leaf_size, x=float(k), y=0.0)
+        b.add_net(f"al{k}", ["a", f"l{k}"])
+    return b.build()
+
+def test_clusters_stay_under_area_limit():
+    nl = _star()
+    rep = cluster_cells(nl)
+    area = nl.w * nl.h
+    cluster_area = np.bincount(rep, weights=area, minlength=nl.num_cells)
+    assert cluster_area.max() <= CLUSTER_AREA_LIMIT * area.mean()
+    # The pair did absorb leftovers, up to the limit
+    assert cluster_area[rep[0]] > 2.0
+
+def test_zero_area_clusters_get_finite_centers():
+    nl = _star(leaf_size=0.0)
+    nl.w[:2] = nl.h[:2] = 0.0
+    coarse = coarsen(nl).coarse
+    assert np.isfinite(coarse.x).all() and np.isfinite(coarse.y).all()
@@ -0,0 +1,61 @@
+import os
+from conftest import annotated_systolic, placed_systolic, assert_same_netlist
+from utils.netlist_cache import NetlistCache, save_netlist, load_netlist, source_key
+
+def test_save_load_round_trip(tmp_path):
+    for nl in (placed_systolic(), annotated_systolic()):
+        path = str(tmp_path / "nl.npz")
+        save_netlist(nl, path)
+        assert_same_netlist(nl, load_netlist(path))
+
+def test_cache_hits_until_the_source_changes(tmp_path):
+    src = tmp_path / "design.v"
+    src.write_text("module top; endmodule\n")
+    calls = []
+    def parse(path):
+        calls.append(path)
+        return annotated_systolic()
+
+    cache = NetlistCache(str(tmp_path / "cache"))
+    first, hit = cache.load(str(src), parse, "v1")
+    assert not hit
+    second, hit = cache.load(str(src), parse, "v1")
+    assert hit and len(calls) == 1
+    assert_same_netlist(first, second)
+
+    # A new parser version or new content is a different key
+    assert not cache.load(str(src), parse, "v2")[1]
+    src.write_text("module top; wire a; endmodule\n")
+    assert not cache.load(str(src), parse, "v1")[1]
+    assert len(calls) == 3
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = NetlistCache(str(tmp_path), max_mb=0)
+    nl = placed_systolic()
+    cache.put("a", nl)
+    cache.put("b", nl)
+    # Over the cap, every entry but the one just stored goes
+    assert not os.path.exists(cache.path("a")) and os.path.exists(cache.path("b"))
+    assert cache.get("a") is None
+
+def test_source_key_depends_on_content_and_version(tmp_path):
+    f = tmp_path / "x.v"
+    f.write_bytes(b"abc")
+    k = source_key(str(f), "v1")
+    assert k == source_key(str(f), "v1") != source_key(str(f), "v2")
+    f.write_bytes(b"abd")
+    assert source_key(str(f), "v1") != k
+
+def test_corrupt_entry_is_a_miss_and_dropped(tmp_path):
+    cache = NetlistCache(str(tmp_path))
+    nl = placed_systolic()
+    cache.put("a", nl)
+    size = os.path.getsize(cache.path("a"))
+    # Garbage, and a truncated archive
+    for data in (b"not a netlist" * 10, open(cache.path("a"), "rb").read()[:size // 2]):
+        with open(cache.path("a"), "wb") as f:
+            f.write(data)
+        assert cache.get("a") is None
+        assert not os.path.exists(cache.path("a"))
+        cache.put("a", nl)
+        assert_same_netlist(nl, cache.get("a"))
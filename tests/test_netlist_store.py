@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from conftest import annotated_systolic, placed_systolic, assert_same_netlist
+from utils.netlist_store import save_netlist_store, open_netlist_store, is_netlist_store
+
+def test_store_round_trip(tmp_path):
+    for nl in (placed_systolic(), annotated_systolic()):
+        path = str(tmp_path / "store")
+        save_netlist_store(nl, path)
+        assert is_netlist_store(path)
+        assert_same_netlist(nl, open_netlist_store(path))
+
+def test_resaving_drops_stale_optional_arrays(tmp_path):
+    path = str(tmp_path / "store")
+    save_netlist_store(annotated_systolic(), path)
+    plain = placed_systolic()
+    save_netlist_store(plain, path)
+    stored = open_netlist_store(path)
+    assert stored.cell_types is None and stored.pin_dx is None
+    assert_same_netlist(plain, stored)
+
+def test_coordinates_write_back_only_when_writable(tmp_path):
+    nl = annotated_systolic()
+    path = str(tmp_path / "store")
+    save_netlist_store(nl, path)
+
+    private = open_netlist_store(path, writable=False)
+    private.x[:] += 5.0
+    assert np.array_equal(open_netlist_store(path).x, nl.x)
+
+    shared = open_netlist_store(path)
+    shared.x[:] += 5.0
+    assert np.array_equal(open_netlist_store(path).x, nl.x + 5.0)
+
+def test_geometry_is_read_only(tmp_path):
+    path = str(tmp_path / "store")
+    save_netlist_store(annotated_systolic(), path)
+    nl = open_netlist_store(path)
+    with pytest.raises(ValueError):
+        nl.w[0] = 1.0
+    with pytest.raises(ValueError):
+        nl.pin_dx[0] = 1.0
@@ -0,0 +1,24 @@
+import pytest
+from models import PlacementParams, EFFORT_PRESETS
+
+def test_effort_preset_fills_defaults():
+    p = PlacementParams(chip_w=100, chip_h=100, effort="fast")
+    assert p.anneal_iters == EFFORT_PRESETS["fast"]["anneal_iters"]
+    assert p.solver_tol == EFFORT_PRESETS["fast"]["solver_tol"]
+
+def test_explicit_values_win_over_preset():
+    p = PlacementParams(chip_w=100, chip_h=100, effort="fast", anneal_iters=50_000)
+    assert p.anneal_iters == 50_000
+    q = PlacementParams(chip_w=100, chip_h=100, effort="quality", detailed_rounds=5)
+    assert q.detailed_rounds == 5 and q.legalize
+
+def test_unknown_effort():
+    with pytest.raises(ValueError):
+        PlacementParams(chip_w=100, chip_h=100, effort="extreme")
+
+@pytest.mark.parametrize("effort", [None, "fast", "balanced", "quality"])
+def test_stage_weights_cover_enabled_stages(effort):
+    p = PlacementParams(chip_w=100, chip_h=100, effort=effort, detailed_rounds=1, legalize=True)
+    assert set(p.stage_weights()) == {"global", "bisection", "anneal", "detailed", "legalize"}
+    p = PlacementParams(chip_w=100, chip_h=100, effort=effort, global_engine="eplace")
+    assert set(p.stage_weights()) >= {"global", "anneal"} and "bisection" not in p.stage_weights()
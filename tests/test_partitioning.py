@@ -0,0 +1,22 @@
+import random
+import numpy as np
+import pytest
+from conftest import placed_systolic, CHIP
+from algorithms import partitioning
+from algorithms.partitioning import recursive_bipartition_place
+
+@pytest.mark.parametrize("method", ["fm", "median"])
+def test_bisection_independent_of_workers(monkeypatch, method):
+    # Small regions would stay in-process; lower the threshold so the pool is used
+    monkeypatch.setattr(partitioning, "PARALLEL_MIN_CELLS", 8)
+    results = []
+    for workers in (1, 2):
+        nl = placed_systolic(10, 10, seed=3)
+        stats = recursive_bipartition_place(nl, CHIP, CHIP, 4, 0.1, random.Random(7), method=method, workers=workers)
+        results.append((nl.x.copy(), nl.y.copy(), stats))
+    (x1, y1, s1), (x2, y2, s2) = results
+    assert np.array_equal(x1, x2) and np.array_equal(y1, y2)
+    assert s1["cut_nets"] == s2["cut_nets"] and s1["splits"] == s2["splits"]
+    assert s1["parallel_splits"] == 0
+    if method == "fm":
+        assert s2["parallel_splits"] > 0
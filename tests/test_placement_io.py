@@ -0,0 +1,46 @@
+import json
+import numpy as np
+import pytest
+from conftest import annotated_systolic
+from netlist import NetlistBuilder
+from utils.placement_io import (save_placement_npz, read_placement_npz, write_placement_jsonl,
+                                read_placement_jsonl)
+
+def _odd_names():
+    """Names that need escaping in JSON, with fractional coordinates."""
+    b = NetlistBuilder()
+    for k, name in enumerate(['u"q"', "a\\b", "bus[3]", "ünï", "top/u1"]):
+        b.add_cell(name, 10.0, 10.0, k == 0, k * 1.25 + 0.1, 1e-7 * k)
+    return b.build()
+
+@pytest.mark.parametrize("make", [annotated_systolic, _odd_names])
+def test_npz_round_trip(tmp_path, make):
+    nl = make()
+    path = str(tmp_path / "p.npz")
+    save_placement_npz(nl, path)
+    coords = read_placement_npz(path)
+    assert list(coords) == list(nl.names)
+    assert [c[0] for c in coords.values()] == nl.x.tolist()
+    assert [c[1] for c in coords.values()] == nl.y.tolist()
+    with np.load(path) as z:
+        assert np.array_equal(z["fixed"], nl.fixed)
+
+@pytest.mark.parametrize("make", [annotated_systolic, _odd_names])
+@pytest.mark.parametrize("name", ["p.jsonl", "p.jsonl.gz"])
+def test_jsonl_round_trip(tmp_path, make, name):
+    nl = make()
+    path = str(tmp_path / name)
+    write_placement_jsonl(nl, path)
+    coords = read_placement_jsonl(path)
+    assert list(coords) == list(nl.names)
+    # repr() floats read back exactly
+    assert [c[0] for c in coords.values()] == nl.x.tolist()
+    assert [c[1] for c in coords.values()] == nl.y.tolist()
+
+def test_jsonl_lines_are_plain_json(tmp_path):
+    nl = _odd_names()
+    path = tmp_path / "p.jsonl"
+    write_placement_jsonl(nl, str(path))
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["fixed"] for r in rows] == nl.fixed.tolist()
+    assert {r["orient"] for r in rows} == {"N"}
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from algorithms.solvers import _dic, _levels, pcg
+
+def _laplacian(n: int, m: int, seed: int = 0) -> sparse.csr_matrix:
+    rng = np.random.default_rng(seed)
+    i, j = rng.integers(0, n, m), rng.integers(0, n, m)
+    keep = i != j
+    W = sparse.coo_matrix((rng.random(keep.sum()) + 0.1, (i[keep], j[keep])), shape=(n, n)).tocsr()
+    W = W + W.T
+    return (sparse.diags(np.asarray(W.sum(axis=1)).ravel() + 1e-2) - W).tocsr()
+
+def _dic_diagonal(A: sparse.csr_matrix) -> np.ndarray:
+    """The row-by-row recurrence d_i = a_ii - sum_k a_ik^2 / d_k."""
+    L = sparse.tril(A, k=-1, format="csr")
+    d = A.diagonal().copy()
+    for i in range(A.shape[0]):
+        a, b = L.indptr[i], L.indptr[i + 1]
+        d[i] -= np.sum(L.data[a:b] ** 2 / d[L.indices[a:b]])
+    return d
+
+def test_levels_respect_dependencies():
+    L = sparse.tril(_laplacian(300, 900), k=-1, format="csr")
+    level = _levels(L)
+    rows = np.repeat(np.arange(300), np.diff(L.indptr))
+    assert (level[rows] > level[L.indices]).all()
+
+def test_dic_matches_sequential_recurrence():
+    A = _laplacian(300, 900)
+    d = _dic_diagonal(A)
+    L = sparse.tril(A, k=-1, format="csr")
+    M = (L + sparse.diags(d)) @ sparse.diags(1 / d) @ (L + sparse.diags(d)).T
+    r = np.random.default_rng(1).random(300)
+    assert M @ _dic(A)(r) == pytest.approx(r)
+
+def test_ichol_pcg_solves_system():
+    A = _laplacian(500, 1500)
+    b = np.random.default_rng(2).random(500)
+    x, _, res = pcg(A, b, np.zeros(500), _dic(A), 1e-10, 1000)
+    assert res <= 1e-10
+    assert A @ x == pytest.approx(b, abs=1e-8)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from conftest import annotated_systolic, placed_systolic
+from algorithms.detailed import placement_cost
+from algorithms.tempering import parallel_tempering, calibrated_ladder, PT_COLD_RATIO
+
+def test_tempering_independent_of_workers(params):
+    results = []
+    for workers in (1, 2):
+        nl = placed_systolic()
+        cost, _, info = parallel_tempering(nl, params, replicas=3, swap_interval=50, workers=workers, seed=5)
+        results.append((cost, nl.x.copy(), nl.y.copy(), info["replica_best_costs"]))
+    (c1, x1, y1, b1), (c2, x2, y2, b2) = results
+    assert c1 == c2 and b1 == b2
+    assert np.array_equal(x1, x2) and np.array_equal(y1, y2)
+
+def test_ladder_follows_cost_scale(params):
+    nl = placed_systolic()
+    ladder = calibrated_ladder(nl, params, 4, seed=0)
+    assert ladder == sorted(ladder)
+    assert ladder[0] / ladder[-1] == pytest.approx(PT_COLD_RATIO)
+    # Heavier penalties raise every temperature
+    params.blockages = params.blockages * 10
+    assert calibrated_ladder(nl, params, 4, seed=0)[-1] > ladder[-1]
+
+def test_tempering_rejects_batched_moves(params):
+    params.anneal_batch, params.anneal_moves = 16, "random"
+    with pytest.raises(ValueError, match="anneal_batch"):
+        parallel_tempering(placed_systolic(), params, replicas=2)
+
+def test_tempering_cost_includes_pin_offsets(params):
+    nl = annotated_systolic()
+    cost, _, _ = parallel_tempering(nl, params, replicas=2, swap_interval=50, workers=2, seed=5)
+    assert abs(placement_cost(nl, params) - cost) < 1e-6 * max(1.0, cost)
+    # The ladder is calibrated on the cost with offsets
+    plain = annotated_systolic()
+    plain.pin_dx = plain.pin_dy = None
+    assert calibrated_ladder(nl, params, 3, seed=0) != calibrated_ladder(plain, params, 3, seed=0)
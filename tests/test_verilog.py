@@ -0,0 +1,146 @@
+import random
+import re
+import pytest
+from utils.verilog_parser import parse_verilog_netlist
+
+def _baseline_parse(path):
+    """The original regex parser: flat netlists, scalar nets and named connections only."""
+    content = open(path).read()
+    content = re.sub(r'//.*', '', content)
+    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+    cells, nets = {}, {}
+    for mod, inst, conns in re.findall(r'(\w+)\s+(\w+)\s*\((.*?)\);', content, re.DOTALL):
+        if mod in ['module', 'endmodule', 'wire', 'reg', 'input', 'output']:
+            continue
+        cells[inst] = (50.0, 50.0, False)
+        for wire in re.findall(r'\.\w+\s*\(\s*(\w+)\s*\)', conns):
+            nets.setdefault(wire, []).append(inst)
+    for _, port in re.findall(r'(input|output)\s+(?:wire\s+|reg\s+)?(\w+)', content):
+        cells[f"PAD_{port}"] = (30.0, 30.0, True)
+        nets.setdefault(port, []).append(f"PAD_{port}")
+    return cells, {name: frozenset(pins) for name, pins in nets.items() if len(pins) > 1}
+
+def _summary(nl):
+    cells = {c.name: (c.w, c.h, c.fixed) for c in nl.cells.values()}
+    return cells, {net.name: frozenset(net.pins) for net in nl.nets}
+
+def _nets(nl):
+    return {frozenset(net.pins) for net in nl.nets}
+
+def _write(tmp_path, text):
+    path = tmp_path / "design.v"
+    path.write_text(text)
+    return str(path)
+
+FLAT = """
+// A flat netlist the original parser understands
+module top (a, b, y);
+  input a;
+  input b;
+  output y;
+  wire n1, n2;
+  NAND2 u1 (.A(a), .B(b), .Y(n1));
+  INV u2 (.A(n1), .Y(n2));
+  /* INV fake (.A(n1), .Y(n2)); */
+  BUF u3 (.A(n2), .Y(y));
+  BUF u4 (.A(n2), .Y());
+endmodule
+"""
+
+def test_flat_netlist_matches_baseline(tmp_path):
+    path = _write(tmp_path, FLAT)
+    assert _summary(parse_verilog_netlist(path)) == _baseline_parse(path)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_flat_netlist_matches_baseline(tmp_path, seed):
+    rng = random.Random(seed)
+    wires = [f"w{k}" for k in range(60)]
+    lines = ["module chip (" + ", ".join(f"p{k}" for k in range(6)) + ");"]
+    lines += [f"  {'input' if k % 2 else 'output'} p{k};" for k in range(6)]
+    lines.append("  wire " + ", ".join(wires) + ";")
+    for i in range(300):
+        conns = ", ".join(f".{pin}({rng.choice(wires + ['p0', 'p1', 'p2', 'p3', 'p4', 'p5'])})"
+                          for pin in rng.sample(["A", "B", "C", "Y", "Z"], rng.randint(1, 4)))
+        lines.append(f"  CELL{i % 7} i{i} ({conns});")
+    lines.append("endmodule")
+    path = _write(tmp_path, "\n".join(lines))
+    assert _summary(parse_verilog_netlist(path)) == _baseline_parse(path)
+
+def test_escaped_identifiers(tmp_path):
+    path = _write(tmp_path, r"""
+module top (input \in[0] , output y);
+  wire \n/1 ;
+  INV \u1$x  (.A(\in[0] ), .Y(\n/1 ));
+  INV \u2.y  (.A(\n/1 ), .Y(y));
+endmodule
+""")
+    nl = parse_verilog_netlist(path)
+    assert set(nl.cells) == {"u1$x", "u2.y", "PAD_in[0]", "PAD_y"}
+    assert {net.name: frozenset(net.pins) for net in nl.nets} == {
+        "in[0]": {"PAD_in[0]", "u1$x"}, "n/1": {"u1$x", "u2.y"}, "y": {"u2.y", "PAD_y"}}
+
+def test_bus_ranges_and_selects(tmp_path):
+    path = _write(tmp_path, """
+module top (input [3:0] d, output [1:0] q);
+  wire [0:1] s;
+  DFF r0 (.D(d[0]), .Q(s[0]));
+  DFF r1 (.D(d[3]), .Q(s[1]));
+  AND2 a (.A(d[2:1]), .Y(q[0]));
+  BUS2 b (.A(s), .Y({q[1], d[3]}));
+  REP r (.A({2{d[0]}}), .B(4'b1010));
+endmodule
+""")
+    nl = parse_verilog_netlist(path)
+    assert {n for n in nl.cells if n.startswith("PAD_")} == {f"PAD_d[{i}]" for i in range(4)} | {"PAD_q[0]", "PAD_q[1]"}
+    assert {net.name: frozenset(net.pins) for net in nl.nets} == {
+        "d[0]": {"PAD_d[0]", "r0", "r"}, "d[1]": {"PAD_d[1]", "a"}, "d[2]": {"PAD_d[2]", "a"},
+        "d[3]": {"PAD_d[3]", "r1", "b"}, "q[0]": {"a", "PAD_q[0]"}, "q[1]": {"b", "PAD_q[1]"},
+        "s[0]": {"r0", "b"}, "s[1]": {"r1", "b"}}
+
+def test_assign_merges_nets(tmp_path):
+    path = _write(tmp_path, """
+module top (input a, output y);
+  wire n1, n2, n3;
+  wire n4 = n3;
+  INV u1 (.A(a), .Y(n1));
+  assign n2 = n1, y = n4;
+  INV u2 (.A(n2), .Y(n3));
+  INV u3 (.A(n4));
+endmodule
+""")
+    nl = parse_verilog_netlist(path)
+    assert _nets(nl) == {frozenset({"PAD_a", "u1"}), frozenset({"u1", "u2"}), frozenset({"u2", "u3", "PAD_y"})}
+    # Merged nets keep the name of the first declared one
+    assert {net.name for net in nl.nets} == {"a", "y", "n1"}
+
+def test_multiple_modules_flatten_hierarchy(tmp_path):
+    path = _write(tmp_path, """
+module leaf_pair (i, o);
+  input i;
+  output o;
+  wire m;
+  INV x (.A(i), .Y(m));
+  INV z (.A(m), .Y(o));
+endmodule
+
+module stage (input i, output o);
+  wire t;
+  leaf_pair p (.i(i), .o(t));
+  BUF b (t, o);
+endmodule
+
+module top (input a, output y);
+  wire m;
+  stage s1 (.i(a), .o(m));
+  stage s2 (.i(m), .o(y));
+endmodule
+""")
+    nl = parse_verilog_netlist(path)
+    inner = {"s1/p/x", "s1/p/z", "s1/b", "s2/p/x", "s2/p/z", "s2/b"}
+    assert set(nl.cells) == inner | {"PAD_a", "PAD_y"}
+    assert {n: m for n, m in zip(nl.names, nl.macros(0, nl.num_cells))} == {
+        **{n: "INV" for n in inner if n[-1] in "xz"}, "s1/b": "BUF", "s2/b": "BUF", "PAD_a": "PAD", "PAD_y": "PAD"}
+    assert _nets(nl) == {frozenset(p) for p in (
+        {"PAD_a", "s1/p/x"}, {"s1/p/x", "s1/p/z"}, {"s1/p/z", "s1/b"}, {"s1/b", "s2/p/x"},
+        {"s2/p/x", "s2/p/z"}, {"s2/p/z", "s2/b"}, {"s2/b", "PAD_y"})}
+    assert {net.name for net in nl.nets} >= {"a", "m", "y", "s1/p/m", "s1/t"}